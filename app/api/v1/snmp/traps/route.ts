@@ -1,10 +1,24 @@
 import { NextResponse } from "next/server"
 
+// HTTP API of the trap receiver (python3 -m trapreceiver), e.g. http://localhost:16180
+const TRAP_API_URL = process.env.TRAP_API_URL
+
 export async function GET() {
   try {
-    // Mock SNMP traps/alerts - in real implementation, this would fetch from trap receiver
     const currentTime = new Date()
 
+    if (TRAP_API_URL) {
+      // Only return recent traps (last 30 minutes)
+      const since = (currentTime.getTime() - 30 * 60 * 1000) / 1000
+      const response = await fetch(`${TRAP_API_URL}/traps?since=${since}&limit=100`, { cache: "no-store" })
+      if (!response.ok) {
+        throw new Error(`trap receiver returned ${response.status}`)
+      }
+      return NextResponse.json(await response.json())
+    }
+
+    // Mock SNMP traps/alerts when no trap receiver is configured
+
     const traps = [
       {
         id: "trap-001",
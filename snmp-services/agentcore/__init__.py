@@ -0,0 +1,33 @@
+"""
+Shared engine for the snmp-services agents
+
+Each service's snmp-agent.py only defines a BaseSNMPAgent subclass with its
+profile and calls run_agent(); everything else lives here.
+"""
+
+from .agent import BaseSNMPAgent
+from .mib import MIB, load_mib
+from .oids import ENTERPRISE_OID, OIDS, OidIndex, oid_key
+from .passproto import pass_persist, run_agent
+from .sampler import CPUSampler, get_cpu_sampler
+from .services import SERVICES, load_profile
+from .traps import DEFAULT_THRESHOLDS, Threshold, configure_thresholds
+
+__all__ = [
+    "BaseSNMPAgent",
+    "CPUSampler",
+    "DEFAULT_THRESHOLDS",
+    "ENTERPRISE_OID",
+    "MIB",
+    "OIDS",
+    "OidIndex",
+    "SERVICES",
+    "Threshold",
+    "configure_thresholds",
+    "get_cpu_sampler",
+    "load_mib",
+    "load_profile",
+    "oid_key",
+    "pass_persist",
+    "run_agent",
+]
@@ -0,0 +1,469 @@
+"""
+Shared SNMP agent engine
+
+BaseSNMPAgent owns the OID registry, walk index, request handling and
+psutil sampling. Each service subclasses it with a small profile: its
+name, the ranges used to simulate service load and the few getters that
+are specific to it.
+
+The OID registry and walk index are built once per class and shared by
+all of its instances. Handlers take the agent as their argument, and
+per-agent state is kept in __slots__, so a process can host thousands of
+agents (see agentcore.fleet).
+"""
+
+import time
+import itertools
+from functools import partial
+
+from .cache import FOREVER, METRIC_CACHE_TTL_MS, MetricCache
+from .encoding import ValueEncoder, encoder_for
+from .history import HISTORY_WINDOWS, MetricHistory, get_history_recorder
+from .mib import MIB
+from .netrate import get_net_sampler
+from .oids import (HISTORY_COLUMNS, HISTORY_ENTRY, IF_RATE_COLUMNS, IF_RATE_ENTRY, OIDS, SELF_OID_COLUMNS,
+                   SELF_OID_ENTRY, WRITABLE_OIDS, OidIndex)
+from .profiling import get_profiler
+from .sampler import PSUTIL_TIMER, get_cpu_sampler, memory_used
+from .selfstats import AGENT_STATS, EMPTY_OID_STATS, AgentStats, get_stats_writer
+from .simulation import Simulator, agent_seed
+from .traps import DEFAULT_THRESHOLDS, configure_thresholds, get_threshold_monitor
+from .passproto import parse_pass_set_value
+
+class BaseSNMPAgent:
+    # Profile: overridden by each service
+    service_name = "SNMP Service"
+    cpu_load = (0, 0)             # extra simulated CPU %, uniform range
+    memory_overhead = (0, 0)      # extra simulated memory MB, uniform range
+    network_in_extra = (0, 0)     # extra simulated KB in, randint range
+    network_out_extra = (0, 0)    # extra simulated KB out, randint range
+    latency = (8.0, -2.0, 5.0)    # base latency ms, min and max variation
+    request_rate = (1, 5)         # simulated requests per step, at no load and at full load
+    backend_servers = 0           # simulated backends behind the service
+    hit_ratio = 0.0               # simulated share of requests that are cache hits
+    random_walks = {}             # extra simulated gauges: name -> (low, high)
+    if_number = 2
+    service_count = 3
+    active_services = 2
+    # OIDs whose value never changes for the life of the agent (cached forever)
+    constant_oids = ("sysName", "sysStatus", "ifNumber", "serviceCount", "activeServices")
+    # Gauges served from the metric cache for METRIC_CACHE_TTL_MS
+    cached_gauges = ("cpuUsage", "memoryUsage", "avgLatency", "networkInBytes", "networkOutBytes")
+    # Gauges recorded into the history ring buffers
+    history_metrics = ("cpuUsage", "memoryUsage", "avgLatency", "networkInBytes", "networkOutBytes")
+    # Levels that raise enterpriseTraps notifications when TRAP_RECEIVER is set
+    trap_thresholds = configure_thresholds(DEFAULT_THRESHOLDS)
+
+    # Profiles that keep extra state declare it in their own __slots__
+    __slots__ = ("start_time", "cpu_sampler", "net_sampler", "request_count", "error_count",
+                 "log_level", "metric_cache", "history", "seed", "simulator", "stats", "batch", "encoded",
+                 "__weakref__")
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.cpu_sampler = get_cpu_sampler()
+        self.net_sampler = get_net_sampler()
+        self.request_count = 0
+        self.error_count = 0
+        self.log_level = "INFO"
+        self.seed = agent_seed(type(self).__name__, next(self.instance_numbers()))
+        self.simulator = None
+        self.stats = AgentStats()
+        self.batch = None  # per-batch memo of shared data sources, see get_many
+        self.encoded = {}  # (form, oid) -> encoded value of a constant OID, see encode_value
+        self.build_shared_tables()
+        self.metric_cache = MetricCache(self.cache_policies)
+        self.history = None
+        if self.history_metrics:
+            self.history = MetricHistory({name: partial(self.oid_handlers[OIDS[name]], self)
+                                          for name in self.history_metrics})
+            get_history_recorder().register(self.history)
+        monitor = get_threshold_monitor()
+        if monitor is not None:
+            monitor.register(self)
+        writer = get_stats_writer()
+        if writer is not None:
+            writer.register(self)
+
+    @classmethod
+    def instance_numbers(cls):
+        """Per-class instance counter, so each instance gets its own SIMULATION_SEED stream"""
+        if "_instance_numbers" not in cls.__dict__:
+            cls._instance_numbers = itertools.count()
+        return cls._instance_numbers
+
+    def simulated(self, signal):
+        """Current value of one of this agent's simulated signals (see agentcore.simulation)"""
+        if self.simulator is None:
+            self.simulator = Simulator(type(self), self.seed, self.start_time)
+        return self.simulator.value(signal)
+
+    @classmethod
+    def build_shared_tables(cls):
+        """Build the OID registry, walk index and cache policies once per class"""
+        if "oid_handlers" in cls.__dict__:
+            return
+        handlers = cls.build_oid_handlers()
+        handlers.update(cls.build_nic_handlers())
+        handlers.update(cls.build_history_handlers())
+        handlers.update(cls.build_self_handlers(OidIndex(handlers).oids))
+        cls.cache_policies = cls.build_cache_policies()
+        cls.preencoded_oids = frozenset(OIDS[name] for name in cls.constant_oids)
+        cls.oid_index = OidIndex(handlers)
+        cls.oid_handlers = handlers
+        cls.set_handlers = cls.build_set_handlers()
+        cls.set_checks = cls.build_set_checks()
+
+    def get_system_uptime(self):
+        """Time since the agent started, in TimeTicks (hundredths of a second)"""
+        return int((time.time() - self.start_time) * 100)
+
+    def get_cpu_usage(self):
+        """Get current CPU usage percentage"""
+        base_cpu = self.cpu_sampler.latest()[0]
+        service_load = self.simulated("cpu")
+        return round(min(base_cpu + service_load, 100), 1)
+
+    def get_cpu_sample_age(self):
+        """Get age of the CPU sample behind cpuUsage in milliseconds"""
+        return int(self.cpu_sampler.latest()[1] * 1000)
+
+    def shared(self, key, compute):
+        """compute(), called once per batch when several getters read the same source"""
+        batch = self.batch
+        if batch is None:
+            return compute()
+        if key not in batch:
+            batch[key] = compute()
+        return batch[key]
+
+    def get_memory_usage(self):
+        """Get current memory usage in MB"""
+        base_memory = self.shared("memory_used", memory_used) / 1024 / 1024
+        service_memory = self.simulated("memory")
+        return round(base_memory + service_memory, 1)
+
+    def get_network_io(self):
+        """Get network throughput in KB/s; networkIn and networkOut share one read per batch"""
+        return self.shared("network_io", self.read_network_io)
+
+    def read_network_io(self):
+        rate_in, rate_out = self.net_sampler.totals()
+        return {
+            'in': int(rate_in // 1024) + int(self.simulated("netIn")),  # KB/s
+            'out': int(rate_out // 1024) + int(self.simulated("netOut"))  # KB/s
+        }
+
+    def get_nic_rate(self, nic):
+        """Get (in, out) KB/s for one network interface"""
+        rate_in, rate_out = self.net_sampler.latest()[0].get(nic, (0.0, 0.0))
+        return int(rate_in // 1024), int(rate_out // 1024)
+
+    def get_latency(self):
+        """Simulated average response latency"""
+        return round(self.simulated("latency"), 1)
+
+    def get_requests_processed(self):
+        """Requests processed; services with their own counter override this"""
+        return self.request_count
+
+    def get_active_services(self):
+        """Active service count; services that simulate failures override this"""
+        return self.active_services
+
+    @classmethod
+    def build_oid_handlers(cls):
+        """Map each supported OID to the handler(agent) that produces its value"""
+        return {
+            OIDS["sysName"]: lambda agent: agent.service_name,
+            OIDS["sysStatus"]: lambda agent: "UP",
+            OIDS["cpuUsage"]: cls.get_cpu_usage,
+            OIDS["memoryUsage"]: cls.get_memory_usage,
+            OIDS["avgLatency"]: cls.get_latency,
+            OIDS["totalErrors"]: lambda agent: agent.error_count,
+            OIDS["logLevel"]: lambda agent: agent.log_level,
+            OIDS["uptime"]: cls.get_system_uptime,
+            OIDS["requestsProcessed"]: cls.get_requests_processed,
+            OIDS["networkInBytes"]: lambda agent: agent.get_network_io()['in'],
+            OIDS["networkOutBytes"]: lambda agent: agent.get_network_io()['out'],
+            OIDS["cpuSampleAge"]: cls.get_cpu_sample_age,
+            OIDS["ifNumber"]: lambda agent: agent.if_number,
+            OIDS["serviceCount"]: lambda agent: agent.service_count,
+            OIDS["activeServices"]: cls.get_active_services,
+            OIDS["cacheHits"]: lambda agent: agent.metric_cache.hits,
+            OIDS["cacheMisses"]: lambda agent: agent.metric_cache.misses,
+            OIDS["cacheEntries"]: lambda agent: len(agent.metric_cache.entries),
+            OIDS["cacheEvictions"]: lambda agent: agent.metric_cache.evictions,
+            OIDS["cacheStaleServed"]: lambda agent: agent.metric_cache.stale_served,
+            OIDS["selfRequests"]: lambda agent: agent.request_count,
+            OIDS["selfParseMicros"]: lambda agent: agent.stats.parse.total_ns // 1000,
+            OIDS["selfSerializeMicros"]: lambda agent: agent.stats.serialize.total_ns // 1000,
+            OIDS["selfPsutilCalls"]: lambda agent: PSUTIL_TIMER.calls,
+            OIDS["selfPsutilMicros"]: lambda agent: PSUTIL_TIMER.total_ns // 1000,
+            OIDS["selfProfile"]: lambda agent: get_profiler().mode,
+            OIDS["selfProfileOutput"]: lambda agent: get_profiler().output,
+        }
+
+    @classmethod
+    def build_set_handlers(cls):
+        """Map each writable OID to the setter(agent, value) that applies a SET already checked against the MIB"""
+        return {
+            OIDS["logLevel"]: cls.set_log_level,
+            # Starts a window of AGENT_PROFILE_SECONDS
+            OIDS["selfProfile"]: lambda agent, mode: get_profiler().start(mode),
+        }
+
+    @classmethod
+    def build_set_checks(cls):
+        """Map writable OIDs to check(agent, value), False when the setter would refuse a value the MIB allows"""
+        return {
+            OIDS["selfProfile"]: lambda agent, mode: get_profiler().can_start(mode),
+        }
+
+    @classmethod
+    def build_nic_handlers(cls):
+        """Rows of the per-interface rate table for the NICs present at startup"""
+        handlers = {}
+        for index, nic in enumerate(get_net_sampler().nics, start=1):
+            handlers[f"{IF_RATE_ENTRY}.{IF_RATE_COLUMNS['ifRateName']}.{index}"] = lambda agent, nic=nic: nic
+            handlers[f"{IF_RATE_ENTRY}.{IF_RATE_COLUMNS['ifRateInBytes']}.{index}"] = \
+                lambda agent, nic=nic: agent.get_nic_rate(nic)[0]
+            handlers[f"{IF_RATE_ENTRY}.{IF_RATE_COLUMNS['ifRateOutBytes']}.{index}"] = \
+                lambda agent, nic=nic: agent.get_nic_rate(nic)[1]
+        return handlers
+
+    @classmethod
+    def build_history_handlers(cls):
+        """Summary rows of the history table: one per gauge and window"""
+        handlers = {}
+        columns = ("historyMin", "historyMax", "historyAvg", "historyP95", "historySamples")
+        for name in cls.history_metrics:
+            metric_arc = OIDS[name].split(".")[-2]
+            for minutes in HISTORY_WINDOWS:
+                for position, column in enumerate(columns):
+                    oid = f"{HISTORY_ENTRY}.{HISTORY_COLUMNS[column]}.{metric_arc}.{minutes}"
+                    handlers[oid] = lambda agent, name=name, seconds=minutes * 60, position=position: \
+                        agent.history.summary(name, seconds)[position]
+        return handlers
+
+    @classmethod
+    def build_self_handlers(cls, served_oids):
+        """Rows of the per-OID stats table, one per served OID in walk order"""
+        columns = {
+            "selfOidRequests": lambda stats: stats.requests,
+            "selfOidErrors": lambda stats: stats.errors,
+            "selfOidTotalMicros": lambda stats: stats.total_ns // 1000,
+            "selfOidMaxMicros": lambda stats: stats.max_ns // 1000,
+            "selfOidP50Micros": lambda stats: stats.percentile_us(50),
+            "selfOidP99Micros": lambda stats: stats.percentile_us(99),
+        }
+        handlers = {}
+        for index, oid in enumerate(served_oids, start=1):
+            handlers[f"{SELF_OID_ENTRY}.{SELF_OID_COLUMNS['selfOidName']}.{index}"] = lambda agent, oid=oid: oid
+            for column, read in columns.items():
+                handlers[f"{SELF_OID_ENTRY}.{SELF_OID_COLUMNS[column]}.{index}"] = \
+                    lambda agent, oid=oid, read=read: read(agent.stats.oids.get(oid, EMPTY_OID_STATS))
+        return handlers
+
+    @classmethod
+    def build_cache_policies(cls):
+        """Map OIDs to metric cache TTLs; OIDs not listed are never cached"""
+        policies = {OIDS[name]: FOREVER for name in cls.constant_oids}
+        policies.update({OIDS[name]: METRIC_CACHE_TTL_MS for name in cls.cached_gauges})
+        return policies
+
+    def get_oid_value(self, oid):
+        """Get value for specific OID, calling only that OID's handler"""
+        handler = self.oid_handlers.get(oid)
+        if handler is None:
+            return "No Such Instance"
+        if not AGENT_STATS:
+            return self.metric_cache.get(oid, handler, self)
+        stats = self.stats.oid(oid)
+        started = time.perf_counter_ns()
+        try:
+            value = self.metric_cache.get(oid, handler, self)
+        except Exception:
+            stats.errors += 1
+            raise
+        stats.record(time.perf_counter_ns() - started)
+        return value
+
+    def get_next_oid(self, oid):
+        """Return the first supported OID after oid in numeric order, or None"""
+        return self.oid_index.next(oid)
+
+    def get_bulk(self, oid, max_repetitions):
+        """Return [(oid, value), ...] for up to max_repetitions OIDs after oid"""
+        oids = self.oid_index.bulk(oid, max_repetitions)
+        return list(zip(oids, self.get_many(oids)))
+
+    def encode_value(self, oid, form):
+        """An OID's current value encoded by form: ValueEncoder.varbind, .pass_lines or .text
+
+        Values of constant_oids are encoded once per form and reused. The
+        encoding time is counted as serialization in the agent's stats.
+        """
+        constant = oid in self.preencoded_oids
+        if constant:
+            data = self.encoded.get((form, oid))
+            if data is not None:
+                if AGENT_STATS:
+                    self.stats.oid(oid).record(0)
+                return data
+        value = self.get_oid_value(oid)
+        if AGENT_STATS:
+            started = time.perf_counter_ns()
+            data = form(encoder_for(oid), value)
+            self.stats.serialize.add(time.perf_counter_ns() - started)
+        else:
+            data = form(encoder_for(oid), value)
+        if constant:
+            self.encoded[(form, oid)] = data
+        return data
+
+    def encode_many(self, oids, form):
+        """encode_value for several OIDs, reading each shared data source once (see get_many)"""
+        if self.batch is not None:
+            return [self.encode_value(oid, form) for oid in oids]
+        self.batch = {}
+        try:
+            return [self.encode_value(oid, form) for oid in oids]
+        finally:
+            self.batch = None
+
+    def get_many(self, oids):
+        """Values of several supported OIDs, reading each shared data source once"""
+        if self.batch is not None:
+            return [self.get_oid_value(oid) for oid in oids]
+        self.batch = {}
+        try:
+            return [self.get_oid_value(oid) for oid in oids]
+        finally:
+            self.batch = None
+
+    def set_many(self, pairs):
+        """Apply [(oid, value), ...] all or nothing; 0 on success, else the 1-based index that failed
+
+        Every pair is checked before any setter runs, so a rejected batch
+        changes nothing and no setter has to be undone.
+        """
+        checked = []
+        for index, (oid, value) in enumerate(pairs, start=1):
+            try:
+                checked.append((oid, self.check_set(oid, value)))
+            except ValueError:
+                return index
+        for index, (oid, value) in enumerate(checked, start=1):
+            if not self.set_handlers[oid](self, value):
+                return index
+        return 0
+
+    def check_set(self, oid, value):
+        """The value a SET of oid would apply, checked against the MIB; ValueError if it would be refused
+
+        An enumeration can be set by number or label ("2", "debug").
+        """
+        node = MIB.object_at(oid)
+        if oid not in self.set_handlers or node is None or not node.writable:
+            raise ValueError(f"{oid} is not writable")
+        value = node.coerce(value)
+        check = self.set_checks.get(oid)
+        if check is not None and not check(self, value):
+            raise ValueError(f"{value!r} cannot be set on {oid} now")
+        return value
+
+    def set_oid_value(self, oid, value):
+        """Set value for specific OID (only writable OIDs)"""
+        try:
+            value = self.check_set(oid, value)
+        except ValueError:
+            return False
+        return self.set_handlers[oid](self, value)
+
+    def set_log_level(self, level):
+        self.log_level = level.upper()
+        self.metric_cache.invalidate(OIDS["logLevel"])
+        return True
+
+    def process_request(self, request_type, oid, value=None):
+        """Process SNMP request"""
+        self.request_count += 1
+
+        try:
+            if request_type == "GET":
+                if oid not in self.oid_handlers:
+                    return f"{oid} = No Such Instance"
+                return self.encode_value(oid, ValueEncoder.text)
+            elif request_type == "SET" and value is not None:
+                if self.set_oid_value(oid, value):
+                    return self.encode_value(oid, ValueEncoder.text)
+                else:
+                    return "Error: OID is read-only or invalid value"
+            else:
+                return "Error: Invalid request"
+        except Exception as e:
+            self.error_count += 1
+            return f"Error: {str(e)}"
+
+    def process_pass(self, command, oid, value=None):
+        """Process a net-snmp pass/pass_persist request, returning response lines"""
+        self.request_count += 1
+        oid = oid.strip(".")
+
+        try:
+            if command == "getnext":
+                oid = self.get_next_oid(oid)
+            elif command == "getbulk":
+                oids = self.oid_index.bulk(oid, int(value))
+                return self.encode_many(oids, ValueEncoder.pass_lines) + ["END"]
+            elif command == "set":
+                set_type, _, raw = (value or "").partition(" ")
+                try:
+                    new_value = parse_pass_set_value(set_type, raw)
+                except ValueError:
+                    return ["wrong-type"]
+                if self.set_oid_value(oid, new_value):
+                    return ["DONE"]
+                return ["wrong-value" if oid in WRITABLE_OIDS else "not-writable"]
+            elif command != "get":
+                return ["NONE"]
+
+            if oid is None or oid not in self.oid_handlers:
+                return ["NONE"]
+            return [self.encode_value(oid, ValueEncoder.pass_lines)]
+        except Exception:
+            self.error_count += 1
+            return ["NONE"]
+
+    def process_pass_batch(self, command, requests):
+        """Process a batched getmulti/setmulti request (see agentcore.passproto)
+
+        getmulti takes OID lines and answers each with an OID/type/value
+        triple, or NONE, then END. setmulti takes (OID, TYPE VALUE) pairs,
+        applies all of them or none, and answers DONE or "<error> <index>".
+        """
+        self.request_count += 1
+        try:
+            if command == "getmulti":
+                oids = [oid.strip(".") for oid in requests]
+                served = [oid for oid in oids if oid in self.oid_handlers]
+                lines = dict(zip(served, self.encode_many(served, ValueEncoder.pass_lines)))
+                return [lines.get(oid, "NONE") for oid in oids] + ["END"]
+            if command == "setmulti":
+                pairs = []
+                for index, (oid, value) in enumerate(requests, start=1):
+                    set_type, _, raw = value.partition(" ")
+                    try:
+                        pairs.append((oid.strip("."), parse_pass_set_value(set_type, raw)))
+                    except ValueError:
+                        return [f"wrong-type {index}"]
+                failed = self.set_many(pairs)
+                if not failed:
+                    return ["DONE"]
+                oid = pairs[failed - 1][0]
+                return [f"{'wrong-value' if oid in WRITABLE_OIDS else 'not-writable'} {failed}"]
+            return ["NONE"]
+        except Exception:
+            self.error_count += 1
+            return ["NONE"]
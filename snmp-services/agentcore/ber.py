@@ -0,0 +1,217 @@
+"""
+Minimal BER encoder/decoder for SNMPv2c messages
+
+Covers exactly what the agents and collectors exchange: the message and
+PDU envelopes, INTEGER, OCTET STRING, NULL, OBJECT IDENTIFIER, the
+SNMPv2-SMI application types and the v2 varbind exceptions.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+# Universal and SNMPv2-SMI application tags
+INTEGER = 0x02
+OCTET_STRING = 0x04
+NULL = 0x05
+OBJECT_IDENTIFIER = 0x06
+SEQUENCE = 0x30
+IP_ADDRESS = 0x40
+COUNTER32 = 0x41
+GAUGE32 = 0x42
+TIMETICKS = 0x43
+OPAQUE = 0x44
+COUNTER64 = 0x46
+
+# Varbind exceptions (SNMPv2)
+NO_SUCH_OBJECT = 0x80
+NO_SUCH_INSTANCE = 0x81
+END_OF_MIB_VIEW = 0x82
+
+# PDU tags
+GET_REQUEST = 0xA0
+GET_NEXT_REQUEST = 0xA1
+GET_RESPONSE = 0xA2
+SET_REQUEST = 0xA3
+GET_BULK_REQUEST = 0xA5
+INFORM_REQUEST = 0xA6
+SNMPV2_TRAP = 0xA7
+
+# Extension PDU tags for agentcore.subscription, outside SNMPv2
+SUBSCRIBE_REQUEST = 0xAA
+SUBSCRIBE_UPDATE = 0xAB
+
+# Error status values used in responses
+NO_ERROR = 0
+TOO_BIG = 1
+GEN_ERR = 5
+NO_ACCESS = 6
+WRONG_TYPE = 7
+WRONG_VALUE = 10
+RESOURCE_UNAVAILABLE = 13
+AUTHORIZATION_ERROR = 16
+NOT_WRITABLE = 17
+
+SNMP_VERSION_2C = 1
+
+UNSIGNED_TAGS = (COUNTER32, GAUGE32, TIMETICKS, COUNTER64)
+
+# pass_persist type names -> BER tags
+TYPE_TAGS = {
+    "string": OCTET_STRING,
+    "integer": INTEGER,
+    "gauge": GAUGE32,
+    "counter": COUNTER32,
+    "timeticks": TIMETICKS,
+    "objectid": OBJECT_IDENTIFIER,
+}
+
+# For GETBULK, error_status/error_index carry non-repeaters/max-repetitions
+Message = namedtuple("Message", "version community pdu_type request_id error_status error_index varbinds")
+
+def encode_length(length):
+    if length < 0x80:
+        return bytes((length,))
+    payload = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes((0x80 | len(payload),)) + payload
+
+def encode_tlv(tag, payload):
+    return bytes((tag,)) + encode_length(len(payload)) + payload
+
+def encode_integer(value, tag=INTEGER):
+    """Minimal two's-complement INTEGER (or unsigned application type)"""
+    size = ((value if value >= 0 else ~value).bit_length() + 8) // 8
+    return encode_tlv(tag, value.to_bytes(size, "big", signed=value < 0))
+
+@lru_cache(maxsize=4096)
+def encode_oid(oid):
+    """Encode a dotted OID; cached because agents answer the same OIDs repeatedly"""
+    arcs = [int(arc) for arc in oid.strip(".").split(".")]
+    body = bytearray()
+    # The first two arcs share one subidentifier, which outgrows a byte under 2.48 and up
+    for arc in [arcs[0] * 40 + arcs[1]] + arcs[2:]:
+        if arc < 0x80:
+            body.append(arc)
+            continue
+        chunk = bytearray()
+        while arc:
+            chunk.append((arc & 0x7F) | 0x80)
+            arc >>= 7
+        chunk[0] &= 0x7F
+        chunk.reverse()
+        body += chunk
+    return encode_tlv(OBJECT_IDENTIFIER, bytes(body))
+
+def encode_value(tag, value):
+    """Encode one varbind value of the given tag"""
+    if tag == INTEGER or tag in UNSIGNED_TAGS:
+        return encode_integer(int(value), tag)
+    if tag == OCTET_STRING:
+        return encode_tlv(OCTET_STRING, value if isinstance(value, bytes) else str(value).encode())
+    if tag == OBJECT_IDENTIFIER:
+        return encode_oid(value)
+    if tag == IP_ADDRESS:
+        return encode_tlv(IP_ADDRESS, bytes(int(octet) for octet in value.split(".")))
+    # NULL and the v2 exceptions carry no content
+    return bytes((tag, 0))
+
+def encode_varbind(oid, tag, value):
+    return encode_tlv(SEQUENCE, encode_oid(oid) + encode_value(tag, value))
+
+def encode_varbinds(varbinds):
+    """varbinds: iterable of (oid, tag, value)"""
+    return encode_tlv(SEQUENCE, b"".join(encode_varbind(oid, tag, value) for oid, tag, value in varbinds))
+
+def encode_message(community, pdu_type, request_id, varbinds, error_status=0, error_index=0,
+                   version=SNMP_VERSION_2C):
+    """Encode a complete SNMP message; community is bytes"""
+    pdu = encode_tlv(pdu_type,
+                     encode_integer(request_id) + encode_integer(error_status)
+                     + encode_integer(error_index) + encode_varbinds(varbinds))
+    return encode_tlv(SEQUENCE, encode_integer(version) + encode_tlv(OCTET_STRING, community) + pdu)
+
+def encode_response(community, request_id, encoded_varbinds, error_status=0, error_index=0,
+                    version=SNMP_VERSION_2C, pdu_type=GET_RESPONSE):
+    """Encode a GetResponse (or pdu_type) around already encoded varbind SEQUENCEs
+
+    The headers are sized from the parts and everything is joined into
+    the output buffer once, instead of re-copying the body at each level
+    of nesting as encode_message does.
+    """
+    varbinds = b"".join(encoded_varbinds)
+    fields = encode_integer(request_id) + encode_integer(error_status) + encode_integer(error_index)
+    varbinds_header = bytes((SEQUENCE,)) + encode_length(len(varbinds))
+    pdu_length = len(fields) + len(varbinds_header) + len(varbinds)
+    pdu_header = bytes((pdu_type,)) + encode_length(pdu_length)
+    envelope = encode_integer(version) + encode_tlv(OCTET_STRING, community)
+    message_header = bytes((SEQUENCE,)) + encode_length(len(envelope) + len(pdu_header) + pdu_length)
+    return b"".join((message_header, envelope, pdu_header, fields, varbinds_header, varbinds))
+
+def decode_header(data, pos):
+    """Return (tag, value start, value end) of the TLV at pos"""
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+    end = pos + length
+    if end > len(data):
+        raise ValueError("truncated BER value")
+    return tag, pos, end
+
+@lru_cache(maxsize=4096)
+def decode_oid(data):
+    """Decode OID content bytes; cached like encode_oid since the same OIDs recur"""
+    arcs = []
+    arc = 0
+    for byte in data:
+        arc = (arc << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(arc)
+            arc = 0
+    first = arcs[0]
+    arcs[:1] = (first // 40, first % 40) if first < 80 else (2, first - 80)
+    return ".".join(map(str, arcs))
+
+def decode_value(tag, data):
+    """Decode a varbind value to a Python value"""
+    if tag == INTEGER:
+        return int.from_bytes(data, "big", signed=True)
+    if tag in UNSIGNED_TAGS:
+        return int.from_bytes(data, "big")
+    if tag == OCTET_STRING or tag == OPAQUE:
+        return bytes(data)
+    if tag == OBJECT_IDENTIFIER:
+        return decode_oid(data)
+    if tag == IP_ADDRESS:
+        return ".".join(str(octet) for octet in data)
+    return None
+
+def decode_message(data):
+    """Decode an SNMP message into a Message; raises ValueError/IndexError if malformed"""
+    data = bytes(data)
+    tag, pos, end = decode_header(data, 0)
+    if tag != SEQUENCE:
+        raise ValueError("not an SNMP message")
+    _, start, pos = decode_header(data, pos)
+    version = int.from_bytes(data[start:pos], "big", signed=True)
+    _, start, pos = decode_header(data, pos)
+    community = bytes(data[start:pos])
+    pdu_type, pos, pdu_end = decode_header(data, pos)
+
+    fields = []
+    for _ in range(3):
+        _, start, pos = decode_header(data, pos)
+        fields.append(int.from_bytes(data[start:pos], "big", signed=True))
+
+    _, pos, list_end = decode_header(data, pos)
+    varbinds = []
+    while pos < list_end:
+        _, pos, varbind_end = decode_header(data, pos)
+        _, start, pos = decode_header(data, pos)
+        oid = decode_oid(data[start:pos])
+        value_tag, start, pos = decode_header(data, pos)
+        varbinds.append((oid, value_tag, decode_value(value_tag, data[start:pos])))
+        pos = varbind_end
+    return Message(version, community, pdu_type, fields[0], fields[1], fields[2], varbinds)
@@ -0,0 +1,95 @@
+"""
+Per-OID TTL cache for metric values
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# TTL policy values: FOREVER never expires, 0 bypasses the cache
+FOREVER = None
+
+# Gauge TTL, cache bound and stale-while-revalidate window (0 disables it)
+METRIC_CACHE_TTL_MS = int(os.environ.get("METRIC_CACHE_TTL_MS", "1000"))
+METRIC_CACHE_SIZE = int(os.environ.get("METRIC_CACHE_SIZE", "256"))
+METRIC_CACHE_SWR_MS = int(os.environ.get("METRIC_CACHE_SWR_MS", "0"))
+
+class MetricCache:
+    """Bounded LRU cache of OID values with per-OID freshness policies
+
+    policies maps an OID to its TTL in milliseconds, FOREVER or 0. With a
+    stale-while-revalidate window an expired value is still served for up
+    to stale_ms while a background thread recomputes it.
+    """
+
+    __slots__ = ("policies", "default_ttl_ms", "max_entries", "stale_ms", "entries", "hits", "misses",
+                 "evictions", "stale_served", "_lock", "_refreshing")
+
+    def __init__(self, policies, default_ttl_ms=0, max_entries=METRIC_CACHE_SIZE,
+                 stale_ms=METRIC_CACHE_SWR_MS):
+        self.policies = policies
+        self.default_ttl_ms = default_ttl_ms
+        self.max_entries = max(1, max_entries)
+        self.stale_ms = stale_ms
+        self.entries = OrderedDict()  # oid -> (value, expires_at or None)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_served = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def get(self, oid, compute, *args):
+        """Return the cached value for oid, calling compute(*args) when it is not fresh"""
+        ttl_ms = self.policies.get(oid, self.default_ttl_ms)
+        if ttl_ms == 0:
+            return compute(*args)
+
+        now = time.monotonic()
+        entry = self.entries.get(oid)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or now < expires_at:
+                self.hits += 1
+                with self._lock:
+                    if oid in self.entries:
+                        self.entries.move_to_end(oid)
+                return value
+            if self.stale_ms and now < expires_at + self.stale_ms / 1000.0:
+                self.stale_served += 1
+                self._refresh_async(oid, compute, args, ttl_ms)
+                return value
+
+        self.misses += 1
+        value = compute(*args)
+        self._store(oid, value, ttl_ms)
+        return value
+
+    def invalidate(self, oid):
+        with self._lock:
+            self.entries.pop(oid, None)
+
+    def _store(self, oid, value, ttl_ms):
+        expires_at = None if ttl_ms is FOREVER else time.monotonic() + ttl_ms / 1000.0
+        with self._lock:
+            self.entries[oid] = (value, expires_at)
+            self.entries.move_to_end(oid)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def _refresh_async(self, oid, compute, args, ttl_ms):
+        with self._lock:
+            if oid in self._refreshing:
+                return
+            self._refreshing.add(oid)
+
+        def refresh():
+            try:
+                self._store(oid, compute(*args), ttl_ms)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(oid)
+
+        threading.Thread(target=refresh, name="metric-cache-refresh", daemon=True).start()
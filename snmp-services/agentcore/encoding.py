@@ -0,0 +1,105 @@
+"""
+Typed value encoders, one per served OID
+
+Each encoder is built once from the OID's SYNTAX in the MIB. It holds
+the pass type, the BER tag and the OID's own BER bytes. It turns a
+handler's value into the three forms an agent sends:
+
+  varbind     the BER SEQUENCE { OID, value } of a GetResponse
+  pass_lines  the ".OID\\nTYPE\\nVALUE" lines of a pass/pass_persist reply
+  text        "OID = Gauge32: 17", the reply to one-line "GET oid" requests
+
+Enumerations are sent as their number, counters wrap at 2**32, gauges
+and TimeTicks are clamped to their unsigned range. Per-tag value
+encoding is chosen when the encoder is built, not on every call.
+
+Values that never change (an agent's constant_oids) are encoded once
+per agent and reused; see BaseSNMPAgent.encoded.
+"""
+
+from . import ber
+from .mib import MIB
+
+# Type names printed in front of values in the one-line text replies, as snmpget does
+TEXT_TYPES = {
+    "string": "STRING",
+    "integer": "INTEGER",
+    "gauge": "Gauge32",
+    "counter": "Counter32",
+    "timeticks": "Timeticks",
+    "objectid": "OID",
+}
+
+UINT32_MAX = 2 ** 32 - 1
+
+def encode_string(value):
+    data = value if isinstance(value, bytes) else str(value).encode()
+    return ber.encode_tlv(ber.OCTET_STRING, data)
+
+def integer_encoder(tag):
+    """ber.encode_integer for one tag; an integer's content is at most 9 bytes, so its length is one byte"""
+    def encode(number):
+        size = ((number if number >= 0 else ~number).bit_length() + 8) // 8
+        return bytes((tag, size)) + number.to_bytes(size, "big", signed=number < 0)
+    return encode
+
+class ValueEncoder:
+    """Encoder of one OID's values, from its SYNTAX"""
+
+    __slots__ = ("oid", "pass_type", "tag", "enum_number", "oid_tlv", "pass_prefix", "text_prefix", "_encode_value")
+
+    def __init__(self, oid):
+        node = MIB.object_at(oid)
+        self.oid = oid
+        self.pass_type = node.pass_type if node is not None else "string"
+        self.tag = ber.TYPE_TAGS[self.pass_type]
+        self.enum_number = node.enum_number if node is not None and node.enums else None
+        self.oid_tlv = ber.encode_oid(oid)
+        self.pass_prefix = f".{oid}\n{self.pass_type}\n"
+        self.text_prefix = f"{oid} = {TEXT_TYPES[self.pass_type]}: "
+        if self.pass_type == "string":
+            self._encode_value = encode_string
+        elif self.pass_type == "objectid":
+            self._encode_value = ber.encode_oid
+        else:
+            self._encode_value = integer_encoder(self.tag)
+
+    def typed(self, value):
+        """The value as it goes on the wire: a string, or an int within the type's range"""
+        pass_type = self.pass_type
+        if pass_type == "string" or pass_type == "objectid":
+            return str(value)
+        if self.enum_number is not None:
+            # Handlers return enumeration labels ("UP", "INFO"); the wire carries the number
+            number = self.enum_number(value)
+            return number if number is not None else int(value)
+        number = value if type(value) is int else int(round(float(value)))
+        if pass_type == "counter":
+            return number % (UINT32_MAX + 1)
+        if pass_type == "gauge" or pass_type == "timeticks":
+            return min(max(number, 0), UINT32_MAX)
+        return number
+
+    def varbind(self, value):
+        """BER varbind SEQUENCE of the OID and value"""
+        value = self._encode_value(self.typed(value))
+        length = len(self.oid_tlv) + len(value)
+        if length < 0x80:
+            return b"".join((bytes((ber.SEQUENCE, length)), self.oid_tlv, value))
+        return ber.encode_tlv(ber.SEQUENCE, self.oid_tlv + value)
+
+    def pass_lines(self, value):
+        return f"{self.pass_prefix}{self.typed(value)}"
+
+    def text(self, value):
+        value = self.typed(value)
+        return f'{self.text_prefix}"{value}"' if self.pass_type == "string" else f"{self.text_prefix}{value}"
+
+_encoders = {}
+
+def encoder_for(oid):
+    """The shared encoder of an OID, built on first use"""
+    encoder = _encoders.get(oid)
+    if encoder is None:
+        encoder = _encoders[oid] = ValueEncoder(oid)
+    return encoder
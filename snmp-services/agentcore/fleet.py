@@ -0,0 +1,199 @@
+"""
+Fleet mode: thousands of virtual agents in one process
+
+    python3 -m agentcore.fleet --agents 5000 --first-port 20000 [--processes 4]
+    python3 -m agentcore.fleet --agents 5000 --first-port 20000 --communities
+
+Agents cycle through the five service profiles. By default each one
+listens on its own UDP port. With --communities they all share
+--first-port and are told apart by community string: public-N reads
+agent N and private-N writes it. --processes shards the fleet by agent
+index range across worker processes, each running its own event loop.
+
+Agents share their class's OID tables and keep their own state in
+__slots__. History ring buffers are most of an agent's remaining memory,
+so fleet agents skip them unless --history is given.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import queue
+import resource
+import sys
+import time
+
+from . import ber
+from .profiling import profile_from_environment
+from .sampler import psutil_call
+from .services import SERVICES, load_profile
+from .subscription import get_subscription_table
+from .udpagent import READ_COMMUNITY, WRITE_COMMUNITY, SNMPResponder, respond
+
+_fleet_classes = {}
+
+def fleet_classes(history=False):
+    """The five profile classes, without history ring buffers unless history is set"""
+    key = bool(history)
+    if key not in _fleet_classes:
+        classes = [load_profile(service) for service in SERVICES]
+        if not history:
+            classes = [type(cls.__name__, (cls,), {"__slots__": (), "history_metrics": ()}) for cls in classes]
+        _fleet_classes[key] = classes
+    return _fleet_classes[key]
+
+def build_fleet(count, start=0, history=False):
+    """Agents start..start+count-1; agent N runs profile N mod 5"""
+    classes = fleet_classes(history)
+    return [classes[index % len(classes)]() for index in range(start, start + count)]
+
+def agent_communities(index):
+    """(read, write) community strings of agent index in --communities mode"""
+    return READ_COMMUNITY + b"-%d" % index, WRITE_COMMUNITY + b"-%d" % index
+
+class CommunityResponder(asyncio.DatagramProtocol):
+    """Serves many agents on one port, selected by community string"""
+
+    def __init__(self, agents, start=0):
+        self.communities = {}  # community -> (agent, writable)
+        for index, agent in enumerate(agents, start=start):
+            read, write = agent_communities(index)
+            self.communities[read] = (agent, False)
+            self.communities[write] = (agent, True)
+        self.transport = None
+        self.dropped = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        started = time.perf_counter_ns()
+        try:
+            request = ber.decode_message(data)
+        except (IndexError, ValueError):
+            self.dropped += 1
+            return
+        target = self.communities.get(request.community)
+        if target is None:
+            self.dropped += 1
+            return
+        target[0].stats.parse.add(time.perf_counter_ns() - started)
+        if request.pdu_type == ber.SUBSCRIBE_REQUEST:
+            response = get_subscription_table().subscribe(target[0], self.transport, request, addr)
+        else:
+            response = respond(target[0], request, target[1])
+        if response is not None:
+            self.transport.sendto(response, addr)
+
+def raise_open_file_limit(needed):
+    """Lift the soft RLIMIT_NOFILE towards needed (one socket per agent)"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+async def serve_fleet(agents, host="127.0.0.1", first_port=20000, start=0, communities=False,
+                      ready=None):
+    """Serve agents until cancelled; agent start+i gets port first_port+start+i"""
+    loop = asyncio.get_running_loop()
+    transports = []
+    try:
+        if communities:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: CommunityResponder(agents, start), local_addr=(host, first_port))
+            transports.append(transport)
+        else:
+            raise_open_file_limit(len(agents) + 256)
+            for index, agent in enumerate(agents, start=first_port + start):
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda agent=agent: SNMPResponder(agent), local_addr=(host, index))
+                transports.append(transport)
+        if ready is not None:
+            ready()
+        await asyncio.Future()
+    finally:
+        for transport in transports:
+            transport.close()
+
+def run_shard(count, start, host, first_port, history, ready_queue=None):
+    """Worker process body: build and serve agents start..start+count-1"""
+    agents = build_fleet(count, start, history)
+    profile_from_environment()
+    ready = (lambda: ready_queue.put(start)) if ready_queue is not None else None
+    try:
+        asyncio.run(serve_fleet(agents, host, first_port, start, ready=ready))
+    except KeyboardInterrupt:
+        pass
+
+def shard_ranges(count, shards):
+    """Split count agents into (start, size) ranges, one per shard"""
+    size, extra = divmod(count, shards)
+    ranges, start = [], 0
+    for shard in range(shards):
+        length = size + (shard < extra)
+        if length:
+            ranges.append((start, length))
+        start += length
+    return ranges
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve many virtual SNMP agents from one process")
+    parser.add_argument("--agents", type=int, default=1000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--first-port", type=int, default=20000)
+    parser.add_argument("--communities", action="store_true",
+                        help="serve every agent on --first-port, selected by community public-N/private-N")
+    parser.add_argument("--processes", type=int, default=1, help="shard agents across worker processes")
+    parser.add_argument("--history", action="store_true", help="keep per-agent history ring buffers")
+    args = parser.parse_args()
+
+    if args.processes > 1 and args.communities:
+        parser.error("--communities serves one port from one process; drop --processes")
+
+    if args.processes <= 1:
+        agents = build_fleet(args.agents, history=args.history)
+        profile_from_environment()
+
+        def ready():
+            rss = psutil_call("Process").memory_info().rss / 1048576
+            print(f"{len(agents)} agents ready on {args.host}:{args.first_port}"
+                  f"{'' if args.communities else f'-{args.first_port + len(agents) - 1}'}, "
+                  f"RSS {rss:.0f} MB", file=sys.stderr, flush=True)
+
+        try:
+            asyncio.run(serve_fleet(agents, args.host, args.first_port,
+                                    communities=args.communities, ready=ready))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    ready_queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=run_shard, name=f"fleet-{start}",
+                                       args=(size, start, args.host, args.first_port, args.history, ready_queue))
+               for start, size in shard_ranges(args.agents, args.processes)]
+    for worker in workers:
+        worker.start()
+    try:
+        pending = len(workers)
+        while pending:
+            try:
+                ready_queue.get(timeout=1.0)
+                pending -= 1
+            except queue.Empty:
+                if any(not worker.is_alive() for worker in workers):
+                    sys.exit("a fleet worker exited during startup")
+        rss = sum(psutil_call("Process", worker.pid).memory_info().rss for worker in workers) / 1048576
+        print(f"{args.agents} agents ready on {args.host}:{args.first_port}-{args.first_port + args.agents - 1} "
+              f"in {len(workers)} processes, RSS {rss:.0f} MB", file=sys.stderr, flush=True)
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Fixed-memory history of each agent's gauges
+
+Every tracked metric keeps its recent samples in an array-backed ring
+buffer, so an agent's memory use stays flat no matter how long it runs.
+One process-wide recorder thread feeds every agent's history, and the
+agents serve min/max/avg/p95 over 1, 5 and 15 minute windows.
+"""
+
+import os
+import math
+import time
+import threading
+import weakref
+from array import array
+
+from .sampler import PeriodicSampler
+
+# Seconds between history samples and seconds of history kept
+HISTORY_SAMPLE_PERIOD = float(os.environ.get("HISTORY_SAMPLE_PERIOD", "5.0"))
+HISTORY_RETENTION = float(os.environ.get("HISTORY_RETENTION", "900"))
+
+# Summary windows served over SNMP, in minutes
+HISTORY_WINDOWS = (1, 5, 15)
+
+class MetricHistory:
+    """Ring buffers of samples for a fixed set of metrics, sharing one time column"""
+
+    def __init__(self, sources, period=HISTORY_SAMPLE_PERIOD, retention=HISTORY_RETENTION):
+        self.sources = dict(sources)  # metric name -> callable returning a number
+        self.capacity = max(1, int(retention / period) + 1)
+        self.times = array("d", bytes(8 * self.capacity))
+        self.values = {name: array("d", bytes(8 * self.capacity)) for name in self.sources}
+        self.head = 0
+        self.count = 0
+
+    def record(self, now=None):
+        """Append one sample of every metric"""
+        now = time.monotonic() if now is None else now
+        slot = self.head
+        for name, source in self.sources.items():
+            self.values[name][slot] = float(source())
+        # Publish the time last so readers never see a slot without its values
+        self.times[slot] = now
+        self.head = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def window(self, name, seconds, now=None):
+        """Samples of one metric from the last `seconds`, newest first"""
+        cutoff = (time.monotonic() if now is None else now) - seconds
+        values, times = self.values[name], self.times
+        head, count = self.head, self.count
+        samples = []
+        for i in range(1, count + 1):
+            slot = (head - i) % self.capacity
+            if times[slot] < cutoff:
+                break
+            samples.append(values[slot])
+        return samples
+
+    def summary(self, name, seconds, now=None):
+        """Return (min, max, avg, p95, samples) of one metric over a window"""
+        samples = self.window(name, seconds, now)
+        if not samples:
+            return 0.0, 0.0, 0.0, 0.0, 0
+        ordered = sorted(samples)
+        p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]  # nearest rank
+        return ordered[0], ordered[-1], sum(ordered) / len(ordered), p95, len(ordered)
+
+class HistoryRecorder(PeriodicSampler):
+    """Feeds every registered MetricHistory once per tick"""
+
+    thread_name = "history-recorder"
+
+    def __init__(self, period=HISTORY_SAMPLE_PERIOD):
+        super().__init__(period)
+        self.histories = weakref.WeakSet()
+        self.errors = 0
+        self.start()
+
+    def register(self, history):
+        self.histories.add(history)
+
+    def sample(self):
+        now = time.monotonic()
+        for history in list(self.histories):
+            try:
+                history.record(now)
+            except Exception:
+                self.errors += 1
+
+_shared_recorder = None
+_shared_lock = threading.Lock()
+
+def get_history_recorder():
+    """Return the process-wide HistoryRecorder, starting it on first use"""
+    global _shared_recorder
+    with _shared_lock:
+        if _shared_recorder is None:
+            _shared_recorder = HistoryRecorder()
+        return _shared_recorder
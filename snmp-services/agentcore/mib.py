@@ -0,0 +1,335 @@
+"""
+ENTERPRISE-MIB.txt loader and compiled OID trie
+
+The MIB is parsed once into a trie keyed by integer arcs. Each node
+carries its name, SYNTAX (base type, enumeration and range) and
+MAX-ACCESS. Resolving an instance OID such as 1.3.6.1.4.1.9999.1.7.0
+to its object (logLevel) walks one node per arc, so lookups cost
+O(depth) however large the MIB grows, and walks come out in numeric
+arc order.
+
+Parsing the text takes a few milliseconds. The result is cached as a
+marshal file in agentcore/__pycache__, keyed on the MIB's size and
+mtime, and later loads read that instead. The cache is skipped when the
+directory is read-only.
+
+The MIB is found at $ENTERPRISE_MIB, then at mibs/ENTERPRISE-MIB.txt
+beside agentcore, then in /usr/share/snmp/mibs (where docker-compose
+mounts it).
+
+The compiled objects can be listed with agentcore.mibdump.
+"""
+
+import os
+import marshal
+
+MIB_CANDIDATES = [
+    os.environ.get("ENTERPRISE_MIB", ""),
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mibs", "ENTERPRISE-MIB.txt"),
+    "/usr/share/snmp/mibs/ENTERPRISE-MIB.txt",
+]
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+CACHE_VERSION = 1
+
+# net-snmp pass types (and agentcore.ber.TYPE_TAGS keys) of each SMI base type
+PASS_TYPES = {
+    "Gauge32": "gauge",
+    "Unsigned32": "gauge",
+    "Counter32": "counter",
+    "Integer32": "integer",
+    "INTEGER": "integer",
+    "TimeTicks": "timeticks",
+    "OBJECT IDENTIFIER": "objectid",
+}
+
+# Strings first, so "--" inside a DESCRIPTION is not taken for a comment
+TOKEN = r'"[^"]*"|--[^\n]*|::=|\.\.|[{}(),;|]|[A-Za-z0-9][A-Za-z0-9-]*'
+
+class MibNode:
+    """One arc of the trie; name, syntax and access are set for named MIB objects"""
+
+    __slots__ = ("arc", "oid", "dotted", "name", "kind", "syntax", "enums", "labels", "range",
+                 "access", "index", "description", "children")
+
+    def __init__(self, arc, oid):
+        self.arc = arc
+        self.oid = oid
+        self.dotted = ".".join(map(str, oid))
+        self.name = None
+        self.kind = None  # "identifier", "object" or "notification"
+        self.syntax = None
+        self.enums = {}  # number -> label
+        self.labels = {}  # lower-case label -> number
+        self.range = None
+        self.access = None
+        self.index = ()
+        self.description = ""
+        self.children = {}
+
+    @property
+    def pass_type(self):
+        return PASS_TYPES.get(self.syntax, "string")
+
+    @property
+    def writable(self):
+        return self.access == "read-write"
+
+    def coerce(self, value):
+        """Check a SET value against SYNTAX: the enum label for enumerations, else the value
+
+        Enumerations take the number or the label (any case). Raises
+        ValueError for a value the object's SYNTAX does not allow.
+        """
+        if self.enums:
+            if isinstance(value, int) and value in self.enums:
+                return self.enums[value]
+            number = self.labels.get(str(value).lower())
+            if number is None and str(value).isdigit():
+                number = int(value) if int(value) in self.enums else None
+            if number is None:
+                raise ValueError(f"{value!r} is not one of {self.name}'s values")
+            return self.enums[number]
+        if self.pass_type in ("integer", "gauge", "counter", "timeticks"):
+            number = int(value)
+            if self.range is not None and not self.range[0] <= number <= self.range[1]:
+                raise ValueError(f"{number} is outside {self.name}'s range")
+            return number
+        return value
+
+    def enum_number(self, value):
+        """Number of an enumeration value given as its label or number, or None"""
+        if isinstance(value, int):
+            return value if value in self.enums else None
+        return self.labels.get(str(value).lower())
+
+class Mib:
+    """The compiled trie, with a name index"""
+
+    def __init__(self, objects):
+        self.root = MibNode(None, ())
+        self.names = {}
+        for name, oid, kind, syntax, enums, value_range, access, index, description in objects:
+            node = self.root
+            for depth, arc in enumerate(oid, start=1):
+                child = node.children.get(arc)
+                if child is None:
+                    child = node.children[arc] = MibNode(arc, oid[:depth])
+                node = child
+            node.name, node.kind, node.syntax, node.access = name, kind, syntax, access
+            node.enums = dict(enums)
+            node.labels = {label.lower(): number for number, label in node.enums.items()}
+            node.range, node.index, node.description = value_range, tuple(index), description
+            self.names[name] = node
+        self._objects = {}  # instance OID string -> (object node or None), for lookups on the request path
+
+    def __getitem__(self, name):
+        return self.names[name]
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def walk(self, node=None):
+        """Named nodes under node (default: all), in walk order"""
+        stack = [node or self.root]
+        while stack:
+            node = stack.pop()
+            if node.name is not None:
+                yield node
+            stack.extend(node.children[arc] for arc in sorted(node.children, reverse=True))
+
+    def resolve(self, oid):
+        """(deepest named node on oid's path, remaining instance arcs); oid is dotted or a tuple"""
+        arcs = oid if isinstance(oid, tuple) else tuple(map(int, filter(None, oid.strip(".").split("."))))
+        node, found, depth = self.root, None, 0
+        for position, arc in enumerate(arcs):
+            node = node.children.get(arc)
+            if node is None:
+                break
+            if node.name is not None:
+                found, depth = node, position + 1
+        return found, arcs[depth:]
+
+    def object_at(self, oid):
+        """The OBJECT-TYPE an instance OID belongs to (scalar .0 or table column + index), or None"""
+        try:
+            return self._objects[oid]
+        except KeyError:
+            pass
+        try:
+            node, instance = self.resolve(oid)
+        except ValueError:
+            return None
+        if node is None or node.kind != "object" or not instance or node.access == "not-accessible":
+            node = None
+        if len(self._objects) < 65536:
+            self._objects[oid] = node
+        return node
+
+    def pass_type(self, oid):
+        """pass type of an instance OID: "gauge", "counter", "integer", "timeticks" or "string" """
+        node = self.object_at(oid)
+        return node.pass_type if node is not None else "string"
+
+    def display(self, oid, value):
+        """value as read, with an enumeration number replaced by its label"""
+        node = self.object_at(oid)
+        if node is not None and node.enums and isinstance(value, int):
+            return node.enums.get(value, value)
+        return value
+
+    def scalars(self):
+        """{name: instance OID} of every accessible scalar (an object whose parent is not a table entry)"""
+        scalars = {}
+        for node in self.walk():
+            if node.kind == "object" and node.access != "not-accessible" and node.syntax != "SEQUENCE OF":
+                parent, _ = self.resolve(node.oid[:-1])
+                if parent is None or not parent.index:
+                    scalars[node.name] = node.dotted + ".0"
+        return scalars
+
+    def columns(self, entry):
+        """{column name: arc} of a table entry's accessible columns"""
+        return {node.name: node.arc for node in self.names[entry].children.values()
+                if node.name is not None and node.access != "not-accessible"}
+
+    def writable(self):
+        """Instance OIDs of the read-write scalars"""
+        return frozenset(oid for name, oid in self.scalars().items() if self.names[name].writable)
+
+def tokenize(text):
+    import re  # only needed when the cache is stale, and costs more to import than a cached load
+    return [token for token in re.findall(TOKEN, text) if not token.startswith("--")]
+
+def braces(tokens, i, open_token="{", close_token="}"):
+    """Tokens between tokens[i] == open_token and its match, and the index after the match"""
+    depth, start = 0, i
+    while i < len(tokens):
+        if tokens[i] == open_token:
+            depth += 1
+        elif tokens[i] == close_token:
+            depth -= 1
+            if depth == 0:
+                return tokens[start + 1:i], i + 1
+        i += 1
+    raise ValueError(f"unbalanced {open_token}")
+
+def parse_syntax(tokens, i):
+    """(syntax, enums, range, next index) of the SYNTAX clause at tokens[i]"""
+    if tokens[i] == "SEQUENCE" and tokens[i + 1] == "OF":
+        return "SEQUENCE OF", (), None, i + 3
+    if tokens[i] in ("OCTET", "OBJECT"):
+        syntax, i = f"{tokens[i]} {tokens[i + 1]}", i + 2
+    else:
+        syntax, i = tokens[i], i + 1
+    enums, value_range = (), None
+    if i < len(tokens) and tokens[i] == "{":
+        inner, i = braces(tokens, i)
+        enums = tuple((int(inner[k + 2]), inner[k]) for k in range(0, len(inner), 5))  # label ( n ) ,
+    elif i < len(tokens) and tokens[i] == "(":
+        inner, i = braces(tokens, i, "(", ")")
+        if len(inner) == 3 and inner[1] == "..":
+            value_range = (int(inner[0]), int(inner[2]))
+    return syntax, enums, value_range, i
+
+def parse_oid_value(name, value):
+    """(parent name or None, arcs) of { parent 1 } or { iso(1) org(3) ... 9999 }"""
+    parent, arcs, k = None, [], 0
+    while k < len(value):
+        if value[k].isdigit():
+            arcs.append(int(value[k]))
+            k += 1
+        elif value[k + 1:k + 2] == ["("]:
+            arcs.append(int(value[k + 2]))
+            k += 4
+        elif parent is None and not arcs:
+            parent = value[k]
+            k += 1
+        else:
+            raise ValueError(f"{name}: cannot resolve {value[k]!r}")
+    return parent, tuple(arcs)
+
+def parse_mib(text):
+    """[(name, oid tuple, kind, syntax, enums, range, access, index, description)] in file order"""
+    tokens = tokenize(text)
+    parents = {}  # name -> (parent name or None, arcs after it)
+    clauses = {}  # name -> (kind, syntax, enums, range, access, index, description)
+    order = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "IMPORTS":
+            i = tokens.index(";", i) + 1
+            continue
+        follows = tokens[i + 1] if i + 1 < len(tokens) else ""
+        if follows in ("OBJECT-TYPE", "NOTIFICATION-TYPE", "MODULE-IDENTITY", "OBJECT-IDENTITY") or \
+                (follows == "OBJECT" and tokens[i + 2:i + 4] == ["IDENTIFIER", "::="]):
+            name, kind = token, {"OBJECT-TYPE": "object", "NOTIFICATION-TYPE": "notification"}.get(
+                follows, "identifier")
+            syntax, enums, value_range, access, index, description = None, (), None, None, (), ""
+            i += 2
+            while tokens[i] != "::=":
+                if tokens[i] == "SYNTAX":
+                    syntax, enums, value_range, i = parse_syntax(tokens, i + 1)
+                    continue
+                if tokens[i] in ("MAX-ACCESS", "ACCESS"):
+                    access = tokens[i + 1]
+                elif tokens[i] == "INDEX":
+                    index = tuple(token for token in braces(tokens, i + 1)[0] if token != ",")
+                elif tokens[i] == "DESCRIPTION" and kind != "identifier":
+                    description = tokens[i + 1].strip('"')
+                elif tokens[i] in ("{", "("):
+                    i = braces(tokens, i, tokens[i], "}" if tokens[i] == "{" else ")")[1]
+                    continue
+                i += 1
+            value, i = braces(tokens, i + 1)
+            parents[name] = parse_oid_value(name, value)
+            clauses[name] = (kind, syntax, enums, value_range, access, index, description)
+            order.append(name)
+            continue
+        i += 1
+
+    resolved = {}
+
+    def oid_of(name, seen=()):
+        if name not in resolved:
+            if name in seen or name not in parents:
+                raise ValueError(f"cannot resolve the OID of {name}")
+            parent, arcs = parents[name]
+            resolved[name] = (oid_of(parent, seen + (name,)) if parent else ()) + arcs
+        return resolved[name]
+
+    return [(name, oid_of(name)) + clauses[name] for name in order]
+
+def find_mib():
+    for path in MIB_CANDIDATES:
+        if path and os.path.exists(path):
+            return path
+    raise FileNotFoundError("ENTERPRISE-MIB.txt not found; set ENTERPRISE_MIB to its path")
+
+def load_mib(path=None, cache_dir=CACHE_DIR):
+    """Load the MIB from its compiled cache when current, else parse it and refresh the cache"""
+    path = path or find_mib()
+    stat = os.stat(path)
+    key = (CACHE_VERSION, os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    cache = os.path.join(cache_dir, f"{os.path.basename(path)}.{marshal.version}.mibc") if cache_dir else None
+    if cache:
+        try:
+            with open(cache, "rb") as f:
+                cached_key, objects = marshal.load(f)
+            if cached_key == key:
+                return Mib(objects)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+    with open(path) as f:
+        objects = parse_mib(f.read())
+    if cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(f"{cache}.{os.getpid()}.tmp", "wb") as f:
+                marshal.dump((key, objects), f)
+            os.replace(f"{cache}.{os.getpid()}.tmp", cache)
+        except OSError:
+            pass
+    return Mib(objects)
+
+MIB = load_mib()
@@ -0,0 +1,37 @@
+"""
+Print the compiled ENTERPRISE-MIB objects, or the objects that names and OIDs resolve to
+
+    python3 -m agentcore.mibdump                  # every object, in walk order
+    python3 -m agentcore.mibdump logLevel 1.3.6.1.4.1.9999.6.1.1.5.3.60
+"""
+
+import sys
+
+from .mib import MIB
+
+def describe(node):
+    syntax = node.syntax or ""
+    if node.enums:
+        syntax += " {" + ", ".join(f"{label}({number})" for number, label in sorted(node.enums.items())) + "}"
+    elif node.range:
+        syntax += f" ({node.range[0]}..{node.range[1]})"
+    return f"{node.dotted:<28} {node.name:<22} {node.kind:<12} {syntax:<40} {node.access or ''}"
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        for node in MIB.walk():
+            print(describe(node))
+        return
+    for query in argv:
+        if query in MIB:
+            print(describe(MIB[query]))
+            continue
+        node, instance = MIB.resolve(query)
+        if node is None:
+            print(f"{query}: not in the MIB")
+        else:
+            print(f"{describe(node)}  instance .{'.'.join(map(str, instance))}")
+
+if __name__ == "__main__":
+    main()
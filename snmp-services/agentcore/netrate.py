@@ -0,0 +1,104 @@
+"""
+Network throughput rates computed from psutil byte counters
+"""
+
+import os
+import time
+import threading
+from collections import deque
+
+from .sampler import PeriodicSampler, psutil_call
+
+# Seconds between counter snapshots and number of intervals in the rate window
+NET_SAMPLE_PERIOD = float(os.environ.get("NET_SAMPLE_PERIOD", "1.0"))
+NET_RATE_WINDOW = int(os.environ.get("NET_RATE_WINDOW", "5"))
+
+COUNTER32_MODULO = 2 ** 32
+# Largest increase read as a 32-bit wrap; a counter that fell further was reset
+MAX_WRAP_DELTA = 2 ** 31
+
+def counter_delta(previous, current):
+    """Increase of a byte counter between two reads, allowing for wraps
+
+    A counter that went backwards either wrapped at 32 bits (some NIC
+    drivers) or was reset, e.g. the interface was recreated. It is taken
+    as a wrap only if it was near 2**32 and the wrapped increase is
+    plausible; after a reset everything counted since is the increase.
+    """
+    if current >= previous:
+        return current - previous
+    wrapped = current + COUNTER32_MODULO - previous
+    if previous < COUNTER32_MODULO and wrapped <= MAX_WRAP_DELTA:
+        return wrapped
+    return current
+
+class NetRateSampler(PeriodicSampler):
+    """Per-NIC receive/send rates in bytes per second over a sliding window"""
+
+    thread_name = "net-sampler"
+
+    def __init__(self, period=NET_SAMPLE_PERIOD, window=NET_RATE_WINDOW):
+        super().__init__(period)
+        self.intervals = deque(maxlen=max(1, window))  # (seconds, {nic: (recv, sent)})
+        self._previous = None
+        self.nics = self._nic_names()
+        # ({nic: (in B/s, out B/s)}, monotonic timestamp) swapped as one tuple
+        self._latest = ({nic: (0.0, 0.0) for nic in self.nics}, time.monotonic())
+        self.start()
+
+    @classmethod
+    def _nic_names(cls):
+        """Interfaces present now; Linux lists them in /sys/class/net, without loading psutil"""
+        try:
+            return sorted(os.listdir("/sys/class/net"))
+        except OSError:
+            return sorted(cls._read_counters())
+
+    @staticmethod
+    def _read_counters():
+        return {nic: (io.bytes_recv, io.bytes_sent)
+                for nic, io in psutil_call("net_io_counters", pernic=True).items()}
+
+    def prepare(self):
+        self._previous = (time.monotonic(), self._read_counters())
+
+    def sample(self):
+        now, counters = time.monotonic(), self._read_counters()
+        then, previous = self._previous
+        self._previous = (now, counters)
+        deltas = {}
+        for nic, (recv, sent) in counters.items():
+            if nic in previous:
+                old_recv, old_sent = previous[nic]
+                deltas[nic] = (counter_delta(old_recv, recv), counter_delta(old_sent, sent))
+        self.intervals.append((now - then, deltas))
+
+        elapsed = sum(seconds for seconds, _ in self.intervals) or 1.0
+        rates = {}
+        for nic in self.nics:
+            recv = sum(delta[nic][0] for _, delta in self.intervals if nic in delta)
+            sent = sum(delta[nic][1] for _, delta in self.intervals if nic in delta)
+            rates[nic] = (recv / elapsed, sent / elapsed)
+        self._latest = (rates, now)
+
+    def latest(self):
+        """Return ({nic: (in B/s, out B/s)}, sample age in seconds) without blocking"""
+        rates, sampled_at = self._latest
+        return rates, time.monotonic() - sampled_at
+
+    def totals(self):
+        """Return (in B/s, out B/s) summed over all NICs"""
+        rates = self._latest[0]
+        return (sum(recv for recv, _ in rates.values()),
+                sum(sent for _, sent in rates.values()))
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+def get_net_sampler():
+    """Return the process-wide NetRateSampler, starting it on first use"""
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = NetRateSampler()
+        return _shared_sampler
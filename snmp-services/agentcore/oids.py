@@ -0,0 +1,54 @@
+"""
+Enterprise OID constants and the sorted OID index used for walks
+
+The constants are read from ENTERPRISE-MIB.txt through agentcore.mib,
+so an object added to the MIB is known to the agents by name.
+"""
+
+from bisect import bisect_right
+
+from .mib import MIB
+
+ENTERPRISE_OID = MIB["enterpriseMIB"].dotted
+
+# Scalar objects from ENTERPRISE-MIB.txt, by name
+OIDS = MIB.scalars()
+
+# Scalars that accept SETs (MAX-ACCESS read-write)
+WRITABLE_OIDS = MIB.writable()
+
+# Per-interface throughput table, indexed by ifRateIndex (1..n in NIC name order)
+IF_RATE_ENTRY = MIB["ifRateEntry"].dotted
+IF_RATE_COLUMNS = MIB.columns("ifRateEntry")
+
+# Gauge history table, indexed by the gauge's arc under system (e.g. 3 = cpuUsage)
+# and the summary window in minutes
+HISTORY_ENTRY = MIB["historyEntry"].dotted
+HISTORY_COLUMNS = MIB.columns("historyEntry")
+
+# Per-OID request statistics, indexed by selfOidIndex (the OID's position in walk order,
+# counting only OIDs outside agentSelf)
+SELF_SUBTREE = MIB["agentSelf"].dotted
+SELF_OID_ENTRY = MIB["selfOidEntry"].dotted
+SELF_OID_COLUMNS = MIB.columns("selfOidEntry")
+
+def oid_key(oid):
+    """Numeric sort key for a dotted OID (with or without leading dot)"""
+    return tuple(map(int, filter(None, oid.strip(".").split("."))))
+
+class OidIndex:
+    """Lexicographically sorted index of numeric OID tuples for GETNEXT/GETBULK"""
+
+    def __init__(self, oids):
+        self.keys = sorted(map(oid_key, oids))
+        self.oids = [".".join(map(str, key)) for key in self.keys]
+
+    def next(self, oid):
+        """First OID strictly after oid, or None at the end of the MIB view"""
+        i = bisect_right(self.keys, oid_key(oid))
+        return self.oids[i] if i < len(self.oids) else None
+
+    def bulk(self, oid, max_repetitions):
+        """Up to max_repetitions OIDs following oid, in walk order"""
+        i = bisect_right(self.keys, oid_key(oid))
+        return self.oids[i:i + max(0, max_repetitions)]
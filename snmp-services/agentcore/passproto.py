@@ -0,0 +1,116 @@
+"""
+net-snmp pass / pass_persist wire protocol and the agent entry point
+"""
+
+import sys
+import time
+
+from .oids import OIDS
+from .profiling import profile_from_environment
+from .snapshot import AGENT_SNAPSHOT_DIR, get_snapshot_writer, load_snapshot, save_snapshot
+
+# Command line flags snmpd uses when running the script via "pass"
+PASS_COMMANDS = {"-g": "get", "-n": "getnext", "-s": "set"}
+
+def parse_pass_set_value(set_type, raw):
+    """Convert the TYPE VALUE line of a pass SET into the agent's value"""
+    raw = raw.strip().strip('"')
+    if set_type == "integer":
+        return int(raw)
+    return raw
+
+def pass_persist(agent, stdin, stdout):
+    """Serve snmpd's pass_persist protocol until snmpd closes the pipe"""
+    stats = agent.stats
+    while True:
+        line = stdin.readline()
+        if not line:
+            break
+        command = line.strip()
+        if not command:
+            continue
+
+        # Parse time covers reading the request's argument lines, already buffered by snmpd
+        started = time.perf_counter_ns()
+        response = request = None
+        if command == "PING":
+            response = ["PONG"]
+        elif command in ("get", "getnext"):
+            request = (command, stdin.readline().strip())
+        elif command in ("set", "getbulk"):
+            # set carries a TYPE VALUE line, getbulk a max-repetitions line
+            oid = stdin.readline().strip()
+            request = (command, oid, stdin.readline().strip())
+        elif command in ("getmulti", "setmulti"):
+            # A count line, then that many OID lines (getmulti) or OID and TYPE VALUE line pairs
+            count = stdin.readline().strip()
+            count = int(count) if count.isdigit() else 0
+            lines = [stdin.readline().strip() for _ in range(count * (1 if command == "getmulti" else 2))]
+            batch = lines if command == "getmulti" else list(zip(lines[::2], lines[1::2]))
+            stats.parse.add(time.perf_counter_ns() - started)
+            response = agent.process_pass_batch(command, batch)
+        elif " " in command:
+            # One-line "GET oid" / "SET oid value" requests from older tooling
+            parts = command.split()
+            value = parts[2] if len(parts) > 2 else None
+            stats.parse.add(time.perf_counter_ns() - started)
+            response = [agent.process_request(parts[0], parts[1], value)]
+        else:
+            response = ["NONE"]
+        if request is not None:
+            stats.parse.add(time.perf_counter_ns() - started)
+            response = agent.process_pass(*request)
+
+        started = time.perf_counter_ns()
+        stdout.write("\n".join(response) + "\n")
+        stdout.flush()
+        stats.serialize.add(time.perf_counter_ns() - started)
+
+def run_agent(agent_class, argv=None):
+    """Command line entry point shared by every service's snmp-agent.py"""
+    argv = sys.argv[1:] if argv is None else argv
+    agent = agent_class()
+    if AGENT_SNAPSHOT_DIR:
+        load_snapshot(agent)
+    profile_from_environment()
+
+    # Resident agents (pass_persist and UDP) snapshot periodically and at exit
+    resident = not argv or argv[0] == "--udp"
+    writer = get_snapshot_writer() if resident else None
+    if writer is not None:
+        writer.register(agent)
+
+    # Standalone SNMPv2c over UDP, replacing snmpd: --udp [HOST:]PORT
+    if argv and argv[0] == "--udp":
+        import asyncio
+        from .udpagent import parse_address, serve_udp
+        host, port = parse_address(argv[1] if len(argv) > 1 else "161")
+        try:
+            asyncio.run(serve_udp(agent, host, port))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    # "pass": snmpd runs one process per request with -g/-n OID or -s OID TYPE VALUE
+    if len(argv) > 1 and argv[0] in PASS_COMMANDS:
+        command = PASS_COMMANDS[argv[0]]
+        value = " ".join(argv[2:4]) if command == "set" else None
+        response = agent.process_pass(command, argv[1], value)
+        if response != ["NONE"]:
+            print("\n".join(response), flush=True)
+        # One process per request: save a SET now rather than starting a writer thread.
+        # A GET/GETNEXT leaves the snapshot alone, so a walk is not one file write per OID.
+        if AGENT_SNAPSHOT_DIR and command == "set":
+            save_snapshot(agent)
+        return
+
+    # Called with a metric name, e.g. "snmp-agent.py cpuUsage"
+    if argv:
+        if argv[0] in OIDS:
+            print(agent.get_oid_value(OIDS[argv[0]]))
+        else:
+            print("Unknown metric")
+        return
+
+    # "pass_persist": stay resident and answer requests for the life of snmpd
+    pass_persist(agent, sys.stdin, sys.stdout)
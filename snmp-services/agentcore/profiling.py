@@ -0,0 +1,182 @@
+"""
+On-demand profiling of the agent process
+
+Profiling is off by default, and then nothing is hooked and no thread
+runs. A window starts with AGENT_PROFILE=cprofile|sampling at startup
+or with a SET of selfProfile (1.3.6.1.4.1.9999.7.7.0), and it ends by
+itself after AGENT_PROFILE_SECONDS. Each window writes to
+AGENT_PROFILE_DIR:
+
+  cprofile   agent-<pid>-<time>.pstats (for pstats or snakeviz) and a
+             .txt summary of the top functions by cumulative time
+  sampling   agent-<pid>-<time>.collapsed, one "frame;frame;... count"
+             line per distinct stack, for flamegraph.pl or speedscope
+
+cProfile traces every call on the main thread, where the protocol loop
+runs, and so slows it down. The sampler reads every thread's stack
+from its own thread every AGENT_PROFILE_INTERVAL_MS and is cheap enough
+to leave running under load.
+
+signal, cProfile, pstats and tempfile are imported when a window is
+started or written rather than at import, keeping them off the agent's
+startup path.
+"""
+
+import os
+import io
+import sys
+import time
+import atexit
+import threading
+from collections import Counter
+
+from .mib import MIB
+
+AGENT_PROFILE = os.environ.get("AGENT_PROFILE", "")
+AGENT_PROFILE_SECONDS = float(os.environ.get("AGENT_PROFILE_SECONDS", "30"))
+# Empty means the system temporary directory, looked up when a window is written
+AGENT_PROFILE_DIR = os.environ.get("AGENT_PROFILE_DIR", "")
+AGENT_PROFILE_INTERVAL_MS = float(os.environ.get("AGENT_PROFILE_INTERVAL_MS", "5"))
+
+# selfProfile enumeration from ENTERPRISE-MIB.txt, for SETs sent as integers
+PROFILE_MODES = MIB["selfProfile"].enums
+
+def frame_label(code):
+    """Collapsed-stack frame name; ';' separates frames, so it must not appear in one"""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+def collapsed_stack(frame):
+    """Root-first frame labels of a frame's stack"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+class Profiler:
+    """One profiling window at a time for the whole process"""
+
+    def __init__(self, directory=AGENT_PROFILE_DIR, seconds=AGENT_PROFILE_SECONDS,
+                 interval_ms=AGENT_PROFILE_INTERVAL_MS):
+        self.directory = directory
+        self.seconds = seconds
+        self.interval = interval_ms / 1000.0
+        self.mode = "off"
+        self.output = ""  # files written by the last finished window
+        self._profile = None
+        self._stop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def can_start(self, mode):
+        """Whether start(mode) would succeed now"""
+        mode = PROFILE_MODES.get(mode, mode)
+        if mode == "off":
+            return True
+        if mode not in ("cprofile", "sampling"):
+            return False
+        if mode == "cprofile" and threading.current_thread() is not threading.main_thread():
+            return False
+        return self.mode in ("off", mode)
+
+    def start(self, mode, seconds=None):
+        """Start a window; False if the mode is unknown or cProfile is off the main thread"""
+        mode = PROFILE_MODES.get(mode, mode)
+        if mode == "off":
+            self.stop()
+            return True
+        if mode not in ("cprofile", "sampling"):
+            return False
+        if mode == "cprofile" and threading.current_thread() is not threading.main_thread():
+            return False
+        seconds = self.seconds if seconds is None else seconds
+        with self._lock:
+            if self.mode != "off":
+                return self.mode == mode
+            self.mode = mode
+        if mode == "cprofile":
+            import signal
+            import cProfile
+            self._profile = cProfile.Profile()
+            # SIGALRM runs the stop on the main thread, the only thread that can disable the profile
+            signal.signal(signal.SIGALRM, lambda signum, frame: self.stop())
+            signal.setitimer(signal.ITIMER_REAL, seconds)
+            self._profile.enable()
+        else:
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._sample, args=(self._stop, time.monotonic() + seconds),
+                                            name="profile-sampler", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self):
+        """End the current window early; a no-op when none is running"""
+        with self._lock:
+            mode, self.mode = self.mode, "off"
+        if mode == "cprofile":
+            import signal
+            profile, self._profile = self._profile, None
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            profile.disable()
+            self._write_pstats(profile)
+        elif mode == "sampling":
+            self._stop.set()
+            self._thread.join(5.0)
+
+    def _sample(self, stop, deadline):
+        stacks = Counter()
+        me = threading.get_ident()
+        names = {}
+        while not stop.wait(self.interval) and time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stacks[";".join([names.get(ident, str(ident))] + collapsed_stack(frame))] += 1
+        with self._lock:
+            if self.mode == "sampling":
+                self.mode = "off"
+        self._write_collapsed(stacks)
+
+    def _path(self, suffix):
+        import tempfile
+        directory = self.directory or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"agent-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}{suffix}")
+
+    def _write_pstats(self, profile):
+        import pstats
+        path = self._path(".pstats")
+        profile.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(40)
+        with open(path[:-len(".pstats")] + ".txt", "w") as f:
+            f.write(summary.getvalue())
+        self.output = path
+
+    def _write_collapsed(self, stacks):
+        path = self._path(".collapsed")
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self.output = path
+
+_shared_profiler = None
+_shared_lock = threading.Lock()
+
+def get_profiler():
+    """Return the process-wide Profiler"""
+    global _shared_profiler
+    with _shared_lock:
+        if _shared_profiler is None:
+            _shared_profiler = Profiler()
+        return _shared_profiler
+
+def profile_from_environment():
+    """Start the AGENT_PROFILE window, if one is configured; call from the main thread"""
+    if AGENT_PROFILE and AGENT_PROFILE != "off":
+        if not get_profiler().start(AGENT_PROFILE):
+            print(f"AGENT_PROFILE={AGENT_PROFILE}: expected cprofile or sampling", file=sys.stderr)
@@ -0,0 +1,140 @@
+"""
+Background sampling threads shared by every agent in the process
+
+psutil is the slowest import on the agent's startup path, so it is
+imported on first use, by the sampler threads once they are running.
+The request path reads memory from /proc/meminfo and the CPU stand-in
+from the load average, so a one-shot `pass` request on Linux never
+loads psutil at all.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+
+# Background CPU sampling (seconds between samples, samples averaged)
+CPU_SAMPLE_PERIOD = float(os.environ.get("CPU_SAMPLE_PERIOD", "1.0"))
+CPU_SAMPLE_WINDOW = int(os.environ.get("CPU_SAMPLE_WINDOW", "5"))
+# Seconds a sampler thread waits before its first psutil call, so loading psutil
+# does not compete with a freshly started agent answering its first request
+SAMPLER_START_DELAY = float(os.environ.get("SAMPLER_START_DELAY", "0.1"))
+
+class CallTimer:
+    """Call count and cumulative nanoseconds of one kind of work"""
+
+    __slots__ = ("calls", "total_ns")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+
+    def add(self, elapsed_ns):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+
+# Time spent inside psutil by every agent and sampler in the process (see agentcore.selfstats)
+PSUTIL_TIMER = CallTimer()
+
+def psutil_call(name, *args, **kwargs):
+    """Call psutil.<name>, importing psutil on first use and adding the call's duration to PSUTIL_TIMER"""
+    import psutil
+    function = getattr(psutil, name)
+    started = time.perf_counter_ns()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        PSUTIL_TIMER.add(time.perf_counter_ns() - started)
+
+def load_estimate():
+    """CPU % implied by the 1 minute load average: a stand-in until the first real sample"""
+    try:
+        return round(min(100.0, os.getloadavg()[0] / (os.cpu_count() or 1) * 100), 1)
+    except OSError:
+        return 0.0
+
+def memory_used():
+    """Bytes of memory in use: MemTotal - MemAvailable from /proc/meminfo, as psutil computes
+    virtual_memory().used on Linux, read without loading psutil; psutil elsewhere"""
+    try:
+        with open("/proc/meminfo", "rb") as f:
+            fields = dict(line.split(None, 2)[:2] for line in f)
+        return (int(fields[b"MemTotal:"]) - int(fields[b"MemAvailable:"])) * 1024
+    except (OSError, KeyError, ValueError):
+        return psutil_call("virtual_memory").used
+
+class PeriodicSampler:
+    """Calls sample() every period seconds on a daemon thread"""
+
+    thread_name = "sampler"
+
+    def __init__(self, period):
+        self.period = period
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        if self._stop.wait(min(self.period, SAMPLER_START_DELAY)):
+            return
+        self.prepare()
+        while not self._stop.wait(self.period):
+            self.sample()
+
+    def prepare(self):
+        """Called on the sampler thread after SAMPLER_START_DELAY, before the first period"""
+
+    def sample(self):
+        raise NotImplementedError
+
+    def stop(self):
+        self._stop.set()
+
+class CPUSampler(PeriodicSampler):
+    """Keeps a rolling CPU percentage sampled off the request path"""
+
+    thread_name = "cpu-sampler"
+
+    def __init__(self, period=CPU_SAMPLE_PERIOD, window=CPU_SAMPLE_WINDOW):
+        super().__init__(period)
+        self.samples = deque(maxlen=max(1, window))
+        # (value, monotonic timestamp) swapped as one tuple so readers never see a torn pair.
+        # Until the first sample, the load average stands in (or a warm-start snapshot, see seed)
+        self._latest = (load_estimate(), time.monotonic())
+        self.start()
+
+    def prepare(self):
+        # Prime psutil so the first non-blocking reading covers one period
+        psutil_call("cpu_percent", interval=None)
+
+    def seed(self, value):
+        """Serve value until the first sample, e.g. the last reading before a restart"""
+        if not self.samples:
+            self._latest = (value, self._latest[1])
+
+    def sample(self):
+        self.samples.append(psutil_call("cpu_percent", interval=None))
+        self._latest = (sum(self.samples) / len(self.samples), time.monotonic())
+
+    def latest(self):
+        """Return (rolling CPU %, sample age in seconds) without blocking"""
+        value, sampled_at = self._latest
+        return value, time.monotonic() - sampled_at
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+def get_cpu_sampler():
+    """Return the process-wide CPUSampler, starting it on first use
+
+    psutil.cpu_percent(interval=None) measures from the previous call, so
+    two samplers in one process would reset each other's baseline.
+    """
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = CPUSampler()
+        return _shared_sampler
@@ -0,0 +1,154 @@
+"""
+Agent self-instrumentation
+
+Each agent counts and times the work on its request path:
+
+- per-OID values served, handler errors and a latency histogram (handler
+  plus metric cache)
+- time spent parsing requests and serializing responses
+- time spent inside psutil, process wide (the samplers are shared)
+
+The numbers are served under agentSelf (1.3.6.1.4.1.9999.7). With
+AGENT_STATS_FILE set, every agent in the process is also written to that
+file as JSON every AGENT_STATS_PERIOD seconds and at exit.
+AGENT_STATS=0 turns per-OID timing off.
+"""
+
+import os
+import time
+import atexit
+import threading
+import weakref
+from array import array
+
+from .oids import oid_key
+from .sampler import PSUTIL_TIMER, CallTimer, PeriodicSampler
+
+AGENT_STATS = os.environ.get("AGENT_STATS", "1") != "0"
+# "{pid}" in the path is replaced by the process id, for fleets sharded across processes
+AGENT_STATS_FILE = os.environ.get("AGENT_STATS_FILE", "")
+AGENT_STATS_PERIOD = float(os.environ.get("AGENT_STATS_PERIOD", "60"))
+
+# Histogram buckets: bucket k counts latencies under 2**k microseconds (found with
+# bit_length, which is cheaper than a search), and one more counts everything slower
+LATENCY_BOUNDS_US = tuple(2 ** k for k in range(18))
+OVERFLOW_BUCKET = len(LATENCY_BOUNDS_US)
+
+class OidStats:
+    """Request count, errors and latency histogram of one OID"""
+
+    __slots__ = ("requests", "errors", "total_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = array("Q", bytes(8 * (OVERFLOW_BUCKET + 1)))
+
+    def record(self, elapsed_ns):
+        self.requests += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        bucket = (elapsed_ns // 1000).bit_length()
+        self.buckets[bucket if bucket < OVERFLOW_BUCKET else OVERFLOW_BUCKET] += 1
+
+    def percentile_us(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, in microseconds"""
+        wanted = self.requests * pct / 100.0
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                if bucket < OVERFLOW_BUCKET:
+                    return LATENCY_BOUNDS_US[bucket]
+                break
+        return self.max_ns // 1000
+
+    def as_dict(self):
+        bounds = [str(bound) for bound in LATENCY_BOUNDS_US] + ["inf"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "totalMicros": self.total_ns // 1000,
+            "maxMicros": self.max_ns // 1000,
+            "p50Micros": self.percentile_us(50),
+            "p99Micros": self.percentile_us(99),
+            "histogramMicros": dict(zip(bounds, self.buckets)),
+        }
+
+# Read-only stand-in for OIDs that have not been served yet
+EMPTY_OID_STATS = OidStats()
+
+class AgentStats:
+    """One agent's parse/serialize timers and per-OID stats, created as OIDs are served"""
+
+    __slots__ = ("oids", "parse", "serialize")
+
+    def __init__(self):
+        self.oids = {}
+        self.parse = CallTimer()
+        self.serialize = CallTimer()
+
+    def oid(self, oid):
+        stats = self.oids.get(oid)
+        if stats is None:
+            stats = self.oids[oid] = OidStats()
+        return stats
+
+    def as_dict(self, agent):
+        return {
+            "service": agent.service_name,
+            "requests": agent.request_count,
+            "errors": agent.error_count,
+            "parseMicros": self.parse.total_ns // 1000,
+            "serializeMicros": self.serialize.total_ns // 1000,
+            "oids": {oid: self.oids[oid].as_dict() for oid in sorted(self.oids, key=oid_key)},
+        }
+
+def process_stats():
+    return {"psutilCalls": PSUTIL_TIMER.calls, "psutilMicros": PSUTIL_TIMER.total_ns // 1000}
+
+class StatsWriter(PeriodicSampler):
+    """Writes every registered agent's stats to one JSON file per tick"""
+
+    thread_name = "stats-writer"
+
+    def __init__(self, path, period=AGENT_STATS_PERIOD):
+        super().__init__(period)
+        self.path = path.replace("{pid}", str(os.getpid()))
+        self.agents = weakref.WeakSet()
+        self.errors = 0
+        self._lock = threading.Lock()
+        atexit.register(self.sample)
+        self.start()
+
+    def register(self, agent):
+        self.agents.add(agent)
+
+    def sample(self):
+        import json
+        report = {"written": time.time(), "pid": os.getpid(), **process_stats(),
+                  "agents": [agent.stats.as_dict(agent) for agent in list(self.agents)]}
+        # Write beside the target and rename, so readers never see a partial file
+        with self._lock:
+            try:
+                with open(self.path + ".tmp", "w") as f:
+                    json.dump(report, f, indent=1)
+                os.replace(self.path + ".tmp", self.path)
+            except OSError:
+                self.errors += 1
+
+_shared_writer = None
+_shared_lock = threading.Lock()
+
+def get_stats_writer():
+    """Return the process-wide StatsWriter, or None when AGENT_STATS_FILE is unset"""
+    global _shared_writer
+    if not AGENT_STATS_FILE:
+        return None
+    with _shared_lock:
+        if _shared_writer is None:
+            _shared_writer = StatsWriter(AGENT_STATS_FILE)
+        return _shared_writer
@@ -0,0 +1,30 @@
+"""
+Inventory of the service profiles shipped under snmp-services/
+"""
+
+import os
+import importlib.util
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# service directory -> (agent class name, host SNMP port from docker-compose.yml)
+SERVICES = {
+    "auth-service": ("AuthServiceSNMPAgent", 16101),
+    "db-service": ("DatabaseServiceSNMPAgent", 16102),
+    "web-server": ("WebServerSNMPAgent", 16103),
+    "load-balancer": ("LoadBalancerSNMPAgent", 16104),
+    "cache-service": ("CacheServiceSNMPAgent", 16105),
+}
+
+_profiles = {}
+
+def load_profile(service):
+    """Return the agent class defined by a service's snmp-agent.py"""
+    if service not in _profiles:
+        path = os.path.join(SERVICES_DIR, service, "snmp-agent.py")
+        name = "snmp_agent_" + service.replace("-", "_")
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _profiles[service] = getattr(module, SERVICES[service][0])
+    return _profiles[service]
@@ -0,0 +1,262 @@
+"""
+Seedable metric simulation
+
+Each agent owns a Simulator that computes its simulated signals on a
+fixed time step of SIMULATION_STEP seconds. The signals are generated
+ahead of time, SIMULATION_BLOCK steps at a time; a request only indexes
+into the current block:
+
+  cpu, netIn, netOut
+      scaled from a load level in 0..1. Load is a diurnal curve
+      (trough at 02:00, peak at 14:00 local time), plus random bursts
+      and noise.
+  memory and each profile random_walk
+      mean-reverting random walks within their ranges
+  backendsUp
+      an up/down Markov chain per backend. Failures are likelier under
+      load.
+  latency
+      the profile's range, rising with load and with every backend that
+      is down
+  requests, hits
+      counters whose per-step increments follow load
+
+Every block is drawn from the agent's seed and the block's index alone,
+so a request after a long idle spell (or a restart with an old
+start_time) generates only the block it falls in, not every block
+since start. The walks, backends and bursts a block starts with are
+drawn from their long-run distributions; each block's walks are bent
+to end where the next block's begin, and the counters follow the
+expected load integrated from start, with each block's increments
+scaled to meet it, so they never go backwards. The block being served
+is swapped in under a lock, as the request, recorder and monitor
+threads all read it.
+
+With SIMULATION_SEED set, each agent derives its own seed from it, its
+class and its instance number. The same seed then yields the same
+values at the same step. A block's random draws come from one NumPy
+call when NumPy is installed, and from the standard library otherwise.
+Both are reproducible, but they produce different sequences.
+"""
+
+import os
+import math
+import time
+import random
+import threading
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SIMULATION_SEED = os.environ.get("SIMULATION_SEED", "")
+SIMULATION_STEP = float(os.environ.get("SIMULATION_STEP", "1.0"))
+SIMULATION_BLOCK = int(os.environ.get("SIMULATION_BLOCK", "120"))
+
+# Bursts: chance one starts on a step, mean length in steps, added load
+BURST_PROBABILITY = 1 / 900
+BURST_STEPS = 60
+BURST_LEVEL = 0.4
+# Long-run share of steps spent in a burst
+BURST_SHARE = (1 + BURST_STEPS) * BURST_PROBABILITY / (1 + (1 + BURST_STEPS) * BURST_PROBABILITY)
+# Random walks: pull towards the middle of the range and step size, per step
+WALK_REVERSION = 0.01
+WALK_STEP = 0.02
+# Long-run standard deviation of a walk, as a share of its range
+WALK_SPREAD = WALK_STEP / math.sqrt(1 - (1 - WALK_REVERSION) ** 2)
+# Per-step backend failure chance at zero load (x5 at full load) and recovery chance
+BACKEND_FAILURE = 0.0005
+BACKEND_RECOVERY = 0.005
+# Extra latency, as a multiple of the base latency, with every backend down
+DEGRADED_LATENCY = 2.0
+
+GAUGES = ("cpu", "netIn", "netOut", "memory", "latency")
+COUNTERS = ("requests", "hits")
+
+def agent_seed(name, index, base=SIMULATION_SEED):
+    """Seed for instance `index` of agent class `name`; random when no base seed is set"""
+    if not base:
+        return random.getrandbits(63)
+    return random.Random(f"{base}/{name}/{index}").getrandbits(63)
+
+class Draws:
+    """Uniform and standard normal draws, a block at a time, from a seed and a key"""
+
+    def __init__(self, seed, *key):
+        if numpy is not None:
+            self.generator = numpy.random.default_rng([seed, *key])
+        else:
+            self.generator = random.Random("/".join(str(part) for part in (seed, *key)))
+
+    def uniform(self, n):
+        if numpy is not None:
+            return self.generator.random(n).tolist()
+        return [self.generator.random() for _ in range(n)]
+
+    def normal(self, n):
+        if numpy is not None:
+            return self.generator.standard_normal(n).tolist()
+        gauss = self.generator.gauss
+        return [gauss(0.0, 1.0) for _ in range(n)]
+
+def clamp(value, low, high):
+    return low if value < low else high if value > high else value
+
+def diurnal(timestamp):
+    """0 at 02:00, 1 at 14:00 local (standard) time"""
+    day_fraction = ((timestamp - time.timezone) % 86400) / 86400
+    return 0.5 - 0.5 * math.cos(2 * math.pi * (day_fraction - 2 / 24))
+
+def diurnal_integral(timestamp):
+    """Integral of diurnal() from an arbitrary origin up to timestamp, in seconds"""
+    return 0.5 * timestamp - 0.5 * 86400 / (2 * math.pi) * math.sin(
+        2 * math.pi * ((timestamp - time.timezone) / 86400 - 2 / 24))
+
+class Simulator:
+    """Block-generated simulated signals for one agent"""
+
+    __slots__ = ("profile", "seed", "start", "step", "block", "clock", "walk_ranges", "lock", "current", "edge")
+
+    def __init__(self, profile, seed, start, step=SIMULATION_STEP, block=SIMULATION_BLOCK, clock=time.time):
+        self.profile = profile  # the agent class, for its ranges
+        self.seed = seed
+        self.start = start
+        self.step = step
+        self.block = block
+        self.clock = clock
+        self.walk_ranges = dict(profile.random_walks, memory=profile.memory_overhead)
+        self.lock = threading.Lock()
+        # (first step, signals) of the block being served, swapped as one tuple so
+        # readers never see one block's start with another's values; none yet
+        self.current = (-block, None)
+        self.edge = (None, None)  # (block index, state) last drawn by state_at
+
+    def value(self, signal):
+        """Signal value at the current step"""
+        step = max(0, int((self.clock() - self.start) / self.step))
+        first, signals = self.current
+        if not first <= step < first + self.block:
+            first, signals = self.switch(step - step % self.block)
+        return signals[signal][step - first]
+
+    def switch(self, first):
+        """Make the block starting at step first the current one"""
+        with self.lock:
+            if self.current[0] != first:
+                self.current = (first, self.generate(first))
+            return self.current
+
+    def expected_requests(self, steps):
+        """Expected request counter after steps steps: the mean load integrated from start"""
+        rate_low, rate_high = self.profile.request_rate
+        diurnal_sum = (diurnal_integral(self.start + steps * self.step) - diurnal_integral(self.start)) / self.step
+        load_sum = (0.15 + BURST_LEVEL * BURST_SHARE) * steps + 0.6 * diurnal_sum
+        return rate_low * steps + (rate_high - rate_low) * (0.5 * load_sum + 0.25 * steps)
+
+    def state_at(self, index):
+        """
+        (walks, backends, burst steps left, request counter) at the start of
+        block index, drawn from the seed and the index alone
+        """
+        if self.edge[0] == index:
+            return self.edge[1]
+        draws, ranges = Draws(self.seed, index, 0), self.walk_ranges
+        uniforms = draws.uniform(2 + self.profile.backend_servers)
+        walks = {name: clamp((low + high) / 2 + WALK_SPREAD * (high - low) * noise, low, high)
+                 for (name, (low, high)), noise in zip(ranges.items(), draws.normal(len(ranges)))}
+        # Each backend is down with the chain's long-run share at the expected load
+        first = index * self.block
+        failure = BACKEND_FAILURE * (1 + 4 * (0.15 + 0.6 * diurnal(self.start + first * self.step)))
+        backends = [draw >= failure / (failure + BACKEND_RECOVERY) for draw in uniforms[2:]]
+        if backends and not any(backends):
+            backends[0] = True
+        burst_left = 1 + int(-BURST_STEPS * math.log(1 - uniforms[1])) if uniforms[0] < BURST_SHARE else 0
+        state = (walks, backends, burst_left, self.expected_requests(first))
+        self.edge = (index, state)
+        return state
+
+    def generate(self, first):
+        """
+        Compute steps first..first+block-1 of every signal. The block starts
+        from the state drawn for it and ends on the state drawn for the next
+        one: walks are bent and counter increments scaled to meet it.
+        """
+        profile, n = self.profile, self.block
+        index = first // n
+        walks, backends, burst_left, requests = self.state_at(index)
+        end_walks, _, _, end_requests = self.state_at(index + 1)
+        walks, backends = dict(walks), list(backends)
+        draws = Draws(self.seed, index, 1)
+        load_noise, burst_draws = draws.normal(n), draws.uniform(n)
+        net_draws, latency_draws, request_draws = draws.uniform(2 * n), draws.uniform(n), draws.uniform(n)
+        hit_noise = draws.normal(n)
+        walk_noise = {name: draws.normal(n) for name in walks}
+        backend_draws = draws.uniform(n * len(backends)) if backends else ()
+
+        signals = {name: array("f", bytes(4 * n)) for name in GAUGES + tuple(profile.random_walks)}
+        signals.update({name: array("d", bytes(8 * n)) for name in COUNTERS})
+        signals["backendsUp"] = array("B", bytes(n))
+        walk_ranges = self.walk_ranges
+        cpu_low, cpu_high = profile.cpu_load
+        in_low, in_high = profile.network_in_extra
+        out_low, out_high = profile.network_out_extra
+        base_latency, latency_low, latency_high = profile.latency
+        rate_low, rate_high = profile.request_rate
+        increments, hit_increments = signals["requests"], signals["hits"]
+
+        for i in range(n):
+            # Load: diurnal curve, bursts and noise
+            if burst_left:
+                burst_left -= 1
+            elif burst_draws[i] < BURST_PROBABILITY:
+                # burst_draws[i] / BURST_PROBABILITY is uniform in [0, 1): reuse it for the length
+                burst_left = 1 + int(-BURST_STEPS * math.log(1 - burst_draws[i] / BURST_PROBABILITY))
+            load = clamp(0.15 + 0.6 * diurnal(self.start + (first + i) * self.step)
+                         + (BURST_LEVEL if burst_left else 0.0) + 0.05 * load_noise[i], 0.0, 1.0)
+            signals["cpu"][i] = cpu_low + (cpu_high - cpu_low) * load
+            signals["netIn"][i] = in_low + (in_high - in_low) * (0.5 * load + 0.5 * net_draws[2 * i])
+            signals["netOut"][i] = out_low + (out_high - out_low) * (0.5 * load + 0.5 * net_draws[2 * i + 1])
+
+            for name, (low, high) in walk_ranges.items():
+                value = walks[name]
+                value += WALK_REVERSION * ((low + high) / 2 - value) + WALK_STEP * (high - low) * walk_noise[name][i]
+                walks[name] = signals[name][i] = clamp(value, low, high)
+
+            # Backends fail more often under load; at least one always stays up
+            for b, up in enumerate(backends):
+                draw = backend_draws[i * len(backends) + b]
+                if up and draw < BACKEND_FAILURE * (1 + 4 * load):
+                    backends[b] = False
+                elif not up and draw < BACKEND_RECOVERY:
+                    backends[b] = True
+            if backends and not any(backends):
+                backends[0] = True
+            up = sum(backends)
+            signals["backendsUp"][i] = up
+
+            degraded = (len(backends) - up) / len(backends) if backends else 0.0
+            signals["latency"][i] = (base_latency + latency_low
+                                     + (latency_high - latency_low) * (0.5 * load + 0.5 * latency_draws[i])
+                                     + base_latency * DEGRADED_LATENCY * degraded)
+
+            increments[i] = rate_low + (rate_high - rate_low) * (0.5 * load + 0.5 * request_draws[i])
+            hit_increments[i] = increments[i] * clamp(profile.hit_ratio + 0.05 * hit_noise[i], 0.0, 1.0)
+
+        # Bend each walk linearly onto the next block's starting value
+        for name, (low, high) in walk_ranges.items():
+            values, gap = signals[name], end_walks[name] - walks[name]
+            for i in range(n):
+                values[i] = clamp(values[i] + gap * (i + 1) / n, low, high)
+
+        # Accumulate the increments, scaled to end on the next block's expected counters
+        for name, base, total in (("requests", requests, end_requests - requests),
+                                  ("hits", profile.hit_ratio * requests, profile.hit_ratio * (end_requests - requests))):
+            values = signals[name]
+            scale = total / sum(values) if sum(values) else 0.0
+            counter = base
+            for i in range(n):
+                counter += values[i] * scale
+                values[i] = counter
+        return signals
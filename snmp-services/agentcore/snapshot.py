@@ -0,0 +1,123 @@
+"""
+Warm-start snapshots of agent state
+
+With AGENT_SNAPSHOT_DIR set, each agent's restart-relevant state is
+written to <dir>/<ClassName>.snapshot: start_time, the simulation
+seed, request and error counters, log_level and the last CPU reading. A
+restarted agent loads it before answering its first request, so
+sysUpTime, the counters and the simulated signals carry on where the
+previous process stopped, and cpuUsage is served from the last reading
+until the sampler has taken its own. The simulator is not replayed: its
+blocks follow from the seed and start_time alone, so only the current
+one is generated. The saved seed is only used when SIMULATION_SEED is
+unset, so setting one still makes a run reproducible.
+
+The file is written after each one-shot `pass` SET, every
+AGENT_SNAPSHOT_PERIOD seconds by resident agents, and at exit. A
+one-shot GET or GETNEXT does not write it, so a walk through `pass`
+costs no file write per OID. A snapshot older than
+AGENT_SNAPSHOT_MAX_AGE seconds is ignored: the agent was down long
+enough that it should count as a fresh start.
+"""
+
+import os
+import time
+import atexit
+import threading
+import weakref
+
+from .sampler import PeriodicSampler
+from .simulation import SIMULATION_SEED
+
+AGENT_SNAPSHOT_DIR = os.environ.get("AGENT_SNAPSHOT_DIR", "")
+AGENT_SNAPSHOT_PERIOD = float(os.environ.get("AGENT_SNAPSHOT_PERIOD", "10"))
+AGENT_SNAPSHOT_MAX_AGE = float(os.environ.get("AGENT_SNAPSHOT_MAX_AGE", "3600"))
+
+def snapshot_path(agent, directory=AGENT_SNAPSHOT_DIR):
+    return os.path.join(directory, f"{type(agent).__name__}.snapshot")
+
+def save_snapshot(agent, directory=AGENT_SNAPSHOT_DIR):
+    """Write the agent's snapshot atomically; False if it could not be written"""
+    path = snapshot_path(agent, directory)
+    state = {
+        "saved": time.time(),
+        "start_time": agent.start_time,
+        "seed": agent.seed,
+        "request_count": agent.request_count,
+        "error_count": agent.error_count,
+        "log_level": agent.log_level,
+    }
+    # Only a measured reading is worth carrying over, not the sampler's stand-in
+    if agent.cpu_sampler.samples:
+        state["cpu"] = agent.cpu_sampler.latest()[0]
+    # Write beside the target and rename, so a restart never reads a partial file
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{path}.{os.getpid()}.tmp", "w") as f:
+            f.writelines(f"{name} {value}\n" for name, value in state.items())
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+    except OSError:
+        return False
+    return True
+
+def load_snapshot(agent, directory=AGENT_SNAPSHOT_DIR, max_age=AGENT_SNAPSHOT_MAX_AGE):
+    """Restore the agent's state from its snapshot; False if there is none or it is unusable"""
+    # "name value" lines rather than JSON: importing json would cost more than the rest of a warm start
+    try:
+        with open(snapshot_path(agent, directory)) as f:
+            state = dict(line.split(None, 1) for line in f.read().splitlines() if line)
+        if not 0 <= time.time() - float(state["saved"]) <= max_age:
+            return False
+        start_time = float(state["start_time"])
+        seed = int(state["seed"]) if "seed" in state and not SIMULATION_SEED else None
+        request_count = int(state["request_count"])
+        error_count = int(state["error_count"])
+        log_level = state["log_level"]
+        cpu = float(state["cpu"]) if "cpu" in state else None
+    except (OSError, ValueError, KeyError):
+        return False
+    agent.start_time = start_time
+    if seed is not None:
+        agent.seed = seed
+    agent.request_count = request_count
+    agent.error_count = error_count
+    agent.log_level = log_level
+    if cpu is not None:
+        agent.cpu_sampler.seed(cpu)
+    return True
+
+class SnapshotWriter(PeriodicSampler):
+    """Saves every registered agent's snapshot once per tick and at exit"""
+
+    thread_name = "snapshot-writer"
+
+    def __init__(self, directory, period=AGENT_SNAPSHOT_PERIOD):
+        super().__init__(period)
+        self.directory = directory
+        self.agents = weakref.WeakSet()
+        self.errors = 0
+        self._lock = threading.Lock()
+        atexit.register(self.sample)
+        self.start()
+
+    def register(self, agent):
+        self.agents.add(agent)
+
+    def sample(self):
+        with self._lock:
+            for agent in list(self.agents):
+                if not save_snapshot(agent, self.directory):
+                    self.errors += 1
+
+_shared_writer = None
+_shared_lock = threading.Lock()
+
+def get_snapshot_writer():
+    """Return the process-wide SnapshotWriter, or None when AGENT_SNAPSHOT_DIR is unset"""
+    global _shared_writer
+    if not AGENT_SNAPSHOT_DIR:
+        return None
+    with _shared_lock:
+        if _shared_writer is None:
+            _shared_writer = SnapshotWriter(AGENT_SNAPSHOT_DIR)
+        return _shared_writer
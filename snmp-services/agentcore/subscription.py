@@ -0,0 +1,223 @@
+"""
+Changes-only subscriptions on the agent's UDP port
+
+Instead of GETting the same OIDs every cycle, a collector can subscribe
+to them. The agent then reads them every interval and sends only the
+values that changed, or that moved by more than the OID's deadband
+since the value it last sent. OIDs that never change, such as sysName
+and ifNumber, cost nothing after the first message.
+
+Messages are SNMPv2c encoded, with two extension PDU types that only
+agentcore agents and collector.subscriber use:
+
+  SUBSCRIBE_REQUEST  collector -> agent, with the read community
+      error-status   interval in milliseconds, at least MIN_INTERVAL
+      error-index    lease in seconds
+      varbinds       COOKIE_OID with the INTEGER cookie the agent
+                     issued, then the OIDs; an INTEGER value is that
+                     OID's deadband, NULL means any change. The cookie
+                     alone unsubscribes.
+  GetResponse        agent -> collector, same request-id: the current
+                     value of every OID (noSuchObject for OIDs the agent
+                     does not serve), or resourceUnavailable when
+                     SUBSCRIPTION_MAX subscriptions are already held or
+                     the collector's host holds SUBSCRIPTIONS_PER_HOST
+                     of this agent's. Without a valid cookie, it is
+                     authorizationError with the one varbind COOKIE_OID
+                     and a fresh cookie instead.
+  SUBSCRIBE_UPDATE   agent -> collector, request-id of the subscribe
+      error-status   sequence number, 1 for the first update after the
+                     GetResponse
+      varbinds       the changed values
+
+A subscription streams to the address the request came from, so a
+request with a forged source address could aim a stream, and a reply
+larger than the request, at someone else. The cookie closes that: it is
+a keyed hash of the source address and the current COOKIE_PERIOD, so
+only a collector that receives at that address can echo it back. A
+request without it is answered with the cookie alone, no bigger than
+the request, and subscribes or unsubscribes nothing, so a forged
+request cannot cancel a collector's subscription either. The collector
+resends with the cookie, and keeps using it for renewals until it goes stale (one to two
+periods), when it is challenged again.
+
+A collector address holds one subscription per agent. Subscribing again
+replaces it and renews its lease, and is answered with every value, so
+a collector that saw a gap in the sequence numbers renews at once to
+resynchronise. Renewals are also how a collector notices an agent that
+went away; the agent drops a subscription not renewed within its lease.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+
+from . import ber
+from .encoding import encoder_for
+from .oids import ENTERPRISE_OID
+
+SUBSCRIPTION_MAX = int(os.environ.get("SUBSCRIPTION_MAX", "4096"))  # per agent process
+SUBSCRIPTIONS_PER_HOST = int(os.environ.get("SUBSCRIPTIONS_PER_HOST", "16"))  # per agent and collector host
+MIN_INTERVAL = 1.0
+MAX_LEASE = 3600
+COOKIE_OID = ENTERPRISE_OID + ".0.1"  # outside the MIB: carries the cookie, never served
+COOKIE_PERIOD = 60.0
+
+class Subscription:
+    """One collector's subscription to one agent"""
+
+    __slots__ = ("agent", "transport", "addr", "community", "request_id", "encoders", "deadbands",
+                 "interval", "expires", "sent", "sequence", "handle")
+
+    def __init__(self, agent, transport, addr, request, oids, deadbands, now):
+        self.agent = agent
+        self.transport = transport
+        self.addr = addr
+        self.community = request.community
+        self.request_id = request.request_id
+        self.encoders = [encoder_for(oid) for oid in oids]
+        self.deadbands = deadbands
+        self.interval = max(MIN_INTERVAL, request.error_status / 1000.0)
+        self.expires = now + min(max(request.error_index, 1), MAX_LEASE)
+        self.sent = {}  # oid -> typed value last sent
+        self.sequence = 0
+        self.handle = None
+
+    def read(self):
+        """Typed values of the subscribed OIDs, in subscription order"""
+        values = self.agent.get_many([encoder.oid for encoder in self.encoders])
+        return [encoder.typed(value) for encoder, value in zip(self.encoders, values)]
+
+    def changes(self, values):
+        """(encoder, value) of each value that moved beyond its deadband from the one last sent"""
+        changed = []
+        for encoder, value, deadband in zip(self.encoders, values, self.deadbands):
+            sent = self.sent.get(encoder.oid)
+            if value == sent:
+                continue
+            if deadband and type(value) is int and type(sent) is int and abs(value - sent) <= deadband:
+                continue
+            changed.append((encoder, value))
+        return changed
+
+class SubscriptionTable:
+    """Every subscription held by this process's agents, checked on the event loop"""
+
+    def __init__(self, max_subscriptions=SUBSCRIPTION_MAX, per_host=SUBSCRIPTIONS_PER_HOST):
+        self.max_subscriptions = max_subscriptions
+        self.per_host = per_host
+        self.subscriptions = {}  # (agent, collector address) -> Subscription
+        self.hosts = {}          # (agent, collector host) -> subscriptions held
+        self.secret = os.urandom(16)
+        self.updates = 0
+        self.expired = 0
+        self.challenges = 0
+
+    def cookie(self, addr, period):
+        """The cookie for a collector address in one COOKIE_PERIOD"""
+        digest = hashlib.blake2b(f"{addr[0]}:{addr[1]}/{period}".encode(), key=self.secret, digest_size=4).digest()
+        return int.from_bytes(digest, "big") & 0x7FFFFFFF
+
+    def echoed(self, request, addr):
+        """Whether the request starts with a cookie issued to addr in this period or the last"""
+        if not request.varbinds:
+            return False
+        oid, tag, value = request.varbinds[0]
+        if oid != COOKIE_OID or tag != ber.INTEGER:
+            return False
+        period = int(time.time() // COOKIE_PERIOD)
+        return value in (self.cookie(addr, period), self.cookie(addr, period - 1))
+
+    def subscribe(self, agent, transport, request, addr):
+        """Apply a SUBSCRIBE_REQUEST and return the encoded GetResponse"""
+        agent.request_count += 1
+        loop = asyncio.get_running_loop()
+        key = (agent, addr)
+        if not self.echoed(request, addr):
+            # Leave any live subscription alone: this may not come from its collector
+            self.challenges += 1
+            cookie = self.cookie(addr, int(time.time() // COOKIE_PERIOD))
+            return self.response(request, [ber.encode_varbind(COOKIE_OID, ber.INTEGER, cookie)],
+                                 ber.AUTHORIZATION_ERROR, 0)
+        self.cancel(key)
+        if len(request.varbinds) == 1:
+            return self.response(request, [])  # the cookie alone: unsubscribe
+        host = (agent, addr[0])
+        if len(self.subscriptions) >= self.max_subscriptions or self.hosts.get(host, 0) >= self.per_host:
+            return self.response(request, [], ber.RESOURCE_UNAVAILABLE, 0)
+        oids, deadbands, missing = [], [], {}
+        for index, (oid, tag, value) in enumerate(request.varbinds[1:]):
+            if oid in agent.oid_handlers:
+                oids.append(oid)
+                deadbands.append(value if tag == ber.INTEGER else 0)
+            else:
+                missing[index] = ber.encode_varbind(oid, ber.NO_SUCH_OBJECT, None)
+        subscription = Subscription(agent, transport, addr, request, oids, deadbands, loop.time())
+        try:
+            values = subscription.read()
+        except Exception:
+            agent.error_count += 1
+            return self.response(request, [], ber.GEN_ERR, 0)
+        encoded = []
+        for encoder, value in zip(subscription.encoders, values):
+            subscription.sent[encoder.oid] = value
+            encoded.append(encoder.varbind(value))
+        for index in sorted(missing):
+            encoded.insert(index, missing[index])
+        if oids:
+            self.subscriptions[key] = subscription
+            self.hosts[host] = self.hosts.get(host, 0) + 1
+            subscription.handle = loop.call_later(subscription.interval, self.check, key)
+        return self.response(request, encoded)
+
+    def response(self, request, encoded, error_status=ber.NO_ERROR, error_index=0):
+        return ber.encode_response(request.community, request.request_id, encoded, error_status, error_index,
+                                   request.version)
+
+    def cancel(self, key):
+        subscription = self.subscriptions.pop(key, None)
+        if subscription is None:
+            return
+        if subscription.handle is not None:
+            subscription.handle.cancel()
+        host = (key[0], key[1][0])
+        self.hosts[host] -= 1
+        if not self.hosts[host]:
+            del self.hosts[host]
+
+    def check(self, key):
+        """Send one subscription's changes, if any, then schedule its next check"""
+        subscription = self.subscriptions.get(key)
+        if subscription is None:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if now >= subscription.expires or subscription.transport.is_closing():
+            self.expired += 1
+            self.cancel(key)
+            return
+        try:
+            changed = subscription.changes(subscription.read())
+        except Exception:
+            subscription.agent.error_count += 1
+            changed = []
+        if changed:
+            subscription.sequence += 1
+            for encoder, value in changed:
+                subscription.sent[encoder.oid] = value
+            data = ber.encode_response(subscription.community, subscription.request_id,
+                                       [encoder.varbind(value) for encoder, value in changed],
+                                       subscription.sequence, pdu_type=ber.SUBSCRIBE_UPDATE)
+            subscription.transport.sendto(data, subscription.addr)
+            self.updates += 1
+        subscription.handle = loop.call_later(subscription.interval, self.check, key)
+
+_shared_table = None
+
+def get_subscription_table():
+    """Return the process-wide SubscriptionTable, created on the first subscription"""
+    global _shared_table
+    if _shared_table is None:
+        _shared_table = SubscriptionTable()
+    return _shared_table
@@ -0,0 +1,38 @@
+"""
+Debug listener that prints the notifications agents emit
+
+    python3 -m agentcore.traplisten 16162
+"""
+
+import sys
+import json
+import socket
+
+from . import ber
+
+def listen(port, host="127.0.0.1"):
+    """Print every notification received on host:port, acknowledging informs"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    print(f"listening for traps on {host}:{port}", flush=True)
+    while True:
+        data, addr = sock.recvfrom(65535)
+        try:
+            message = ber.decode_message(data)
+        except (IndexError, ValueError):
+            print(f"{addr[0]}:{addr[1]} malformed datagram", flush=True)
+            continue
+        if message.pdu_type == ber.INFORM_REQUEST:
+            sock.sendto(ber.encode_message(message.community, ber.GET_RESPONSE, message.request_id,
+                                           message.varbinds), addr)
+        values = {oid: value.decode(errors="replace") if isinstance(value, bytes) else value
+                  for oid, _, value in message.varbinds}
+        print(f"{addr[0]}:{addr[1]} {json.dumps(values)}", flush=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python3 -m agentcore.traplisten PORT")
+    try:
+        listen(int(sys.argv[1]))
+    except KeyboardInterrupt:
+        pass
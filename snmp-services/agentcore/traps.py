@@ -0,0 +1,288 @@
+"""
+Threshold-driven SNMPv2c trap/inform emitter
+
+A process-wide monitor thread evaluates each registered agent's
+thresholds on its sampled metrics. When a threshold is crossed it sends
+the matching enterpriseTraps notification to TRAP_RECEIVER, and it sends
+thresholdCleared once the value is back past the clear level
+(hysteresis). Emission is rate limited with a token bucket, and the
+same notification from the same agent is not repeated within the dedup
+window. A threshold only becomes active once its notification is
+delivered (sent, for traps; acknowledged, for informs), so every
+thresholdCleared follows a raise the receiver saw.
+
+Informs are handed to a sender thread that waits for each
+acknowledgement, so a slow receiver never delays threshold checks.
+Until the outcome is known, the threshold is left as it was and not
+evaluated again.
+
+For a quick look at what an agent emits, run a local listener:
+
+    python3 -m agentcore.traplisten 16162
+"""
+
+import os
+import time
+import queue
+import threading
+import weakref
+from collections import namedtuple
+
+from . import ber
+from .mib import MIB
+from .oids import OIDS
+from .sampler import PeriodicSampler
+
+# host:port of the trap receiver; traps are disabled when unset
+TRAP_RECEIVER = os.environ.get("TRAP_RECEIVER", "")
+TRAP_COMMUNITY = os.environ.get("TRAP_COMMUNITY", "public")
+TRAP_EVAL_PERIOD = float(os.environ.get("TRAP_EVAL_PERIOD", "5.0"))
+# Notifications per minute (token bucket) and seconds before an identical one is resent
+TRAP_RATE_LIMIT = float(os.environ.get("TRAP_RATE_LIMIT", "30"))
+TRAP_DEDUP_SECONDS = float(os.environ.get("TRAP_DEDUP_SECONDS", "60"))
+# Send InformRequests and wait for the receiver's acknowledgement
+TRAP_INFORM = os.environ.get("TRAP_INFORM", "0") == "1"
+TRAP_INFORM_TIMEOUT = float(os.environ.get("TRAP_INFORM_TIMEOUT", "1.0"))
+TRAP_INFORM_RETRIES = int(os.environ.get("TRAP_INFORM_RETRIES", "2"))
+# Informs waiting for the sender thread; more are counted as failed
+TRAP_INFORM_QUEUE = int(os.environ.get("TRAP_INFORM_QUEUE", "256"))
+# JSON overrides of threshold levels, e.g. {"highCpuUsage": [90, 80]}
+TRAP_THRESHOLDS = os.environ.get("TRAP_THRESHOLDS", "")
+
+SYS_UPTIME_OID = "1.3.6.1.2.1.1.3.0"
+SNMP_TRAP_OID = "1.3.6.1.6.3.1.1.4.1.0"
+
+# Notifications from ENTERPRISE-MIB.txt enterpriseTraps, by name
+TRAP_OIDS = {node.name: node.dotted for node in MIB.walk(MIB["enterpriseTraps"]) if node.kind == "notification"}
+
+# raise_at/clear_at apply to the value, or to its increase per evaluation when delta is set;
+# above=False raises when the value falls to raise_at or below
+Threshold = namedtuple("Threshold", "name metric raise_at clear_at above delta")
+
+# Raise memory alarms at 90% of physical memory, in the MB units of memoryUsage
+MEMORY_ALARM_MB = round(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 / 1024 * 0.9)
+
+DEFAULT_THRESHOLDS = (
+    Threshold("highCpuUsage", "cpuUsage", 85, 75, True, False),
+    Threshold("highMemoryUsage", "memoryUsage", MEMORY_ALARM_MB, MEMORY_ALARM_MB * 0.9, True, False),
+    Threshold("highErrorRate", "totalErrors", 5, 0, True, True),
+)
+
+def configure_thresholds(thresholds, overrides=TRAP_THRESHOLDS):
+    """Apply TRAP_THRESHOLDS-style JSON overrides to raise/clear levels"""
+    if not overrides:
+        return tuple(thresholds)
+    import json
+    levels = json.loads(overrides)
+    return tuple(threshold._replace(raise_at=levels[threshold.name][0], clear_at=levels[threshold.name][1])
+                 if threshold.name in levels else threshold
+                 for threshold in thresholds)
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = max(1.0, per_minute)
+        self.tokens = self.capacity
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+class Delivery:
+    """Outcome of one notification: delivered is None until known, then True or False"""
+
+    __slots__ = ("delivered",)
+
+    def __init__(self, delivered=None):
+        self.delivered = delivered
+
+class TrapEmitter:
+    """Sends SNMPv2-Trap or InformRequest PDUs to one receiver"""
+
+    def __init__(self, receiver, community=TRAP_COMMUNITY, rate_limit=TRAP_RATE_LIMIT,
+                 dedup_seconds=TRAP_DEDUP_SECONDS, inform=TRAP_INFORM,
+                 timeout=TRAP_INFORM_TIMEOUT, retries=TRAP_INFORM_RETRIES, inform_queue=TRAP_INFORM_QUEUE):
+        host, _, port = receiver.rpartition(":")
+        self.address = (host or "127.0.0.1", int(port or 162))
+        self.community = community.encode()
+        self.bucket = TokenBucket(rate_limit)
+        self.dedup_seconds = dedup_seconds
+        self.inform = inform
+        self.timeout = timeout
+        self.retries = retries
+        self.recent = {}  # (agent id, trap oid, subject oid) -> last sent monotonic time
+        self.request_id = 0
+        self.sent = 0
+        self.acknowledged = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.deduplicated = 0
+        self._counts = threading.Lock()  # the counters are updated from the monitor and sender threads
+        import socket
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(timeout)
+        self.informs = queue.Queue(max(1, inform_queue))
+        self._sender = None
+        if inform:
+            self._sender = threading.Thread(target=self._deliver, name="trap-informs", daemon=True)
+            self._sender.start()
+
+    def count(self, name):
+        with self._counts:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def send(self, agent, trap_oid, varbinds):
+        """
+        Emit one notification. Returns None if it was suppressed or could
+        not be sent, else its Delivery: already delivered for a trap, and
+        resolved by the sender thread once an inform is acknowledged or
+        given up on.
+        """
+        now = time.monotonic()
+        # Fleet agents share a service_name, so dedup is per agent object
+        key = (id(agent), trap_oid, varbinds[0][0] if varbinds else None)
+        if now - self.recent.get(key, float("-inf")) < self.dedup_seconds:
+            self.count("deduplicated")
+            return None
+        if not self.bucket.take():
+            self.count("rate_limited")
+            return None
+        self.forget(now)
+        self.recent[key] = now
+
+        self.request_id = (self.request_id + 1) & 0x7FFFFFFF
+        uptime = int((time.time() - agent.start_time) * 100)
+        pdu_varbinds = [(SYS_UPTIME_OID, ber.TIMETICKS, uptime),
+                        (SNMP_TRAP_OID, ber.OBJECT_IDENTIFIER, trap_oid),
+                        (OIDS["sysName"], ber.OCTET_STRING, agent.service_name)] + list(varbinds)
+        pdu_type = ber.INFORM_REQUEST if self.inform else ber.SNMPV2_TRAP
+        data = ber.encode_message(self.community, pdu_type, self.request_id, pdu_varbinds)
+        if self.inform:
+            delivery = Delivery()
+            try:
+                self.informs.put_nowait((self.request_id, data, delivery))
+            except queue.Full:
+                self.count("failed")
+                return None
+            return delivery
+        try:
+            self.sock.sendto(data, self.address)
+        except OSError:
+            self.count("failed")
+            return None
+        self.count("sent")
+        return Delivery(True)
+
+    def forget(self, now):
+        """Drop dedup entries older than the window, so agents that went away are not kept"""
+        if len(self.recent) >= 1024:
+            self.recent = {key: sent for key, sent in self.recent.items() if now - sent < self.dedup_seconds}
+
+    def _deliver(self):
+        """Sender thread: send each queued inform until acknowledged or out of retries"""
+        while True:
+            request_id, data, delivery = self.informs.get()
+            for _ in range(self.retries + 1):
+                try:
+                    self.sock.sendto(data, self.address)
+                except OSError:
+                    continue
+                self.count("sent")
+                if self._wait_ack(request_id):
+                    self.count("acknowledged")
+                    delivery.delivered = True
+                    break
+            else:
+                self.count("failed")
+                delivery.delivered = False
+
+    def _wait_ack(self, request_id):
+        import socket
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            try:
+                response = ber.decode_message(self.sock.recv(65535))
+            except socket.timeout:
+                return False
+            except (OSError, IndexError, ValueError):
+                continue
+            if response.pdu_type == ber.GET_RESPONSE and response.request_id == request_id:
+                return True
+        return False
+
+class ThresholdMonitor(PeriodicSampler):
+    """Evaluates every registered agent's thresholds once per tick"""
+
+    thread_name = "trap-monitor"
+
+    def __init__(self, emitter, period=TRAP_EVAL_PERIOD):
+        super().__init__(period)
+        self.emitter = emitter
+        # agent -> {threshold name: (active, last value, (Delivery, raising) awaiting its outcome or None)}
+        self.agents = weakref.WeakKeyDictionary()
+        self.errors = 0
+        self.start()
+
+    def register(self, agent):
+        self.agents[agent] = {}
+
+    def sample(self):
+        for agent, state in list(self.agents.items()):
+            try:
+                self.evaluate(agent, state)
+            except Exception:
+                self.errors += 1
+
+    def evaluate(self, agent, state):
+        for threshold in agent.trap_thresholds:
+            oid = OIDS[threshold.metric]
+            # Straight from the handler: the monitor's reads are not requests and stay out of the self-stats
+            value = float(agent.oid_handlers[oid](agent))
+            active, previous, pending = state.get(threshold.name, (False, value, None))
+            if pending is not None:
+                delivery, raising = pending
+                if delivery.delivered is None:
+                    # An inform still in flight: wait for its outcome before deciding anything else
+                    state[threshold.name] = (active, value, pending)
+                    continue
+                if delivery.delivered:
+                    active = raising
+            measured = value - previous if threshold.delta else value
+            if threshold.above:
+                crossed, cleared = measured >= threshold.raise_at, measured <= threshold.clear_at
+            else:
+                crossed, cleared = measured <= threshold.raise_at, measured >= threshold.clear_at
+
+            varbinds = [(oid, ber.GAUGE32 if value >= 0 else ber.INTEGER, int(round(value)))]
+            # The state only changes once the notification is delivered; a suppressed one is retried next tick
+            delivery = None
+            if not active and crossed:
+                delivery = self.emitter.send(agent, TRAP_OIDS[threshold.name], varbinds)
+            elif active and cleared:
+                delivery = self.emitter.send(agent, TRAP_OIDS["thresholdCleared"], varbinds)
+            pending = None
+            if delivery is not None:
+                if delivery.delivered is None:
+                    pending = (delivery, not active)
+                elif delivery.delivered:
+                    active = not active
+            state[threshold.name] = (active, value, pending)
+
+_shared_monitor = None
+_shared_lock = threading.Lock()
+
+def get_threshold_monitor():
+    """Return the process-wide ThresholdMonitor, or None when TRAP_RECEIVER is unset"""
+    global _shared_monitor
+    if not TRAP_RECEIVER:
+        return None
+    with _shared_lock:
+        if _shared_monitor is None:
+            _shared_monitor = ThresholdMonitor(TrapEmitter(TRAP_RECEIVER))
+        return _shared_monitor
@@ -0,0 +1,160 @@
+"""
+Standalone asyncio SNMPv2c responder
+
+Answers GET/GETNEXT/GETBULK/SET straight from the agent's OID registry,
+so a container can serve 161/udp without snmpd and the pass_persist pipe.
+"""
+
+import time
+import asyncio
+
+from . import ber
+from .encoding import ValueEncoder
+from .oids import WRITABLE_OIDS
+from .subscription import get_subscription_table
+
+# Upper bound on varbinds in one GETBULK response, to stay within a datagram
+MAX_BULK_VARBINDS = 64
+
+READ_COMMUNITY = b"public"
+WRITE_COMMUNITY = b"private"
+
+def typed_varbind(agent, oid):
+    """Encoded varbind of an OID the agent serves, typed by its SYNTAX"""
+    return agent.encode_value(oid, ValueEncoder.varbind)
+
+def get_varbind(agent, oid):
+    if oid not in agent.oid_handlers:
+        return ber.encode_varbind(oid, ber.NO_SUCH_OBJECT, None)
+    return typed_varbind(agent, oid)
+
+def next_varbind(agent, oid):
+    next_oid = agent.get_next_oid(oid)
+    if next_oid is None:
+        return ber.encode_varbind(oid, ber.END_OF_MIB_VIEW, None)
+    return typed_varbind(agent, next_oid)
+
+def bulk_varbinds(agent, varbinds, non_repeaters, max_repetitions):
+    """GETBULK: one GETNEXT per non-repeater, then max_repetitions rows of the rest"""
+    non_repeaters = max(0, non_repeaters)
+    response = [next_varbind(agent, oid) for oid, _, _ in varbinds[:non_repeaters]]
+    repeaters = [oid for oid, _, _ in varbinds[non_repeaters:]]
+    if not repeaters:
+        return response
+    columns = [agent.oid_index.bulk(oid, max_repetitions) for oid in repeaters]
+    for row in range(max(0, max_repetitions)):
+        for oid, column in zip(repeaters, columns):
+            if len(response) >= MAX_BULK_VARBINDS:
+                return response
+            if row < len(column):
+                response.append(typed_varbind(agent, column[row]))
+            else:
+                last = column[-1] if column else oid
+                response.append(ber.encode_varbind(last, ber.END_OF_MIB_VIEW, None))
+        if all(row >= len(column) for column in columns):
+            break
+    return response
+
+def set_value(tag, value):
+    """Convert a SET varbind value into the agent's representation"""
+    if tag == ber.INTEGER:
+        return value
+    if tag == ber.OCTET_STRING:
+        return value.decode(errors="replace")
+    raise TypeError(tag)
+
+def apply_set(agent, varbinds):
+    """Apply a SET PDU, all varbinds or none; returns (error_status, error_index)"""
+    pairs = []
+    for index, (oid, tag, value) in enumerate(varbinds, start=1):
+        try:
+            pairs.append((oid, set_value(tag, value)))
+        except TypeError:
+            return ber.WRONG_TYPE, index
+    failed = agent.set_many(pairs)
+    if failed:
+        oid = pairs[failed - 1][0]
+        return (ber.WRONG_VALUE if oid in WRITABLE_OIDS else ber.NOT_WRITABLE), failed
+    return ber.NO_ERROR, 0
+
+def respond(agent, request, writable=False):
+    """Build the encoded response to a decoded request Message, or None to drop it"""
+    agent.request_count += 1
+    error_status, error_index = ber.NO_ERROR, 0
+    # Varbinds of one PDU share data sources, like one batched pass request
+    agent.batch = {}
+    try:
+        if request.pdu_type == ber.GET_REQUEST:
+            varbinds = [get_varbind(agent, oid) for oid, _, _ in request.varbinds]
+        elif request.pdu_type == ber.GET_NEXT_REQUEST:
+            varbinds = [next_varbind(agent, oid) for oid, _, _ in request.varbinds]
+        elif request.pdu_type == ber.GET_BULK_REQUEST:
+            varbinds = bulk_varbinds(agent, request.varbinds, request.error_status, request.error_index)
+        elif request.pdu_type == ber.SET_REQUEST:
+            varbinds = [ber.encode_varbind(*varbind) for varbind in request.varbinds]
+            if writable:
+                error_status, error_index = apply_set(agent, request.varbinds)
+            else:
+                error_status, error_index = ber.NO_ACCESS, 1
+        else:
+            return None
+    except Exception:
+        agent.error_count += 1
+        varbinds = [ber.encode_varbind(*varbind) for varbind in request.varbinds]
+        error_status, error_index = ber.GEN_ERR, 1
+    finally:
+        agent.batch = None
+
+    # Values were encoded as they were read (see BaseSNMPAgent.encode_value); this only assembles them
+    started = time.perf_counter_ns()
+    response = ber.encode_response(request.community, request.request_id, varbinds, error_status,
+                                   error_index, request.version)
+    agent.stats.serialize.add(time.perf_counter_ns() - started)
+    return response
+
+class SNMPResponder(asyncio.DatagramProtocol):
+    """Datagram protocol serving one agent over SNMPv2c"""
+
+    def __init__(self, agent, read_community=READ_COMMUNITY, write_community=WRITE_COMMUNITY):
+        self.agent = agent
+        self.read_community = read_community
+        self.write_community = write_community
+        self.transport = None
+        self.dropped = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        started = time.perf_counter_ns()
+        try:
+            request = ber.decode_message(data)
+        except (IndexError, ValueError):
+            self.dropped += 1
+            return
+        self.agent.stats.parse.add(time.perf_counter_ns() - started)
+        writable = request.community == self.write_community
+        if not writable and request.community != self.read_community:
+            self.dropped += 1
+            return
+        if request.pdu_type == ber.SUBSCRIBE_REQUEST:
+            response = get_subscription_table().subscribe(self.agent, self.transport, request, addr)
+        else:
+            response = respond(self.agent, request, writable)
+        if response is not None:
+            self.transport.sendto(response, addr)
+
+async def serve_udp(agent, host="0.0.0.0", port=161):
+    """Serve the agent on host:port until cancelled"""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: SNMPResponder(agent), local_addr=(host, port))
+    try:
+        await asyncio.Future()
+    finally:
+        transport.close()
+
+def parse_address(address, default_port=161):
+    """Split "[host:]port" into (host, port)"""
+    host, _, port = address.rpartition(":")
+    return host or "0.0.0.0", int(port or default_port)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Load-generator benchmark for the agents' request path
+
+Drives every agent with a configurable request mix, either in-process
+through process_request/process_pass or through the stdin protocol loop
+of a real snmp-agent.py process. It reports p50/p95/p99 latency, requests
+per second and RSS per agent, and writes everything to a JSON file so
+runs from different commits can be compared with --compare.
+
+Mixes:
+  get   - GETs spread over the enterprise scalars
+  walk  - repeated GETNEXT walks of 1.3.6.1.4.1.9999 until the end of the MIB
+  set   - GETs with bursts of SETs on logLevel
+
+Usage: python3 benchmarks/bench_agents.py [--mode stdin|inprocess] [--mix get,walk,set]
+                                          [--requests N] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import psutil
+
+from common import AGENT_CLASSES, SERVICES_DIR, load_agent_class, percentile
+
+from agentcore.oids import ENTERPRISE_OID, OIDS
+
+SCALARS = [oid for name, oid in OIDS.items() if not name.startswith("cache")]
+LOG_LEVEL_VALUES = ["INFO", "DEBUG", "ERROR"]
+SINGLE_LINE_RESPONSES = ("NONE", "DONE", "not-writable", "wrong-type", "wrong-value")
+
+def build_ops(mix, requests, rng, set_burst=20, set_ratio=0.2):
+    """Return a list of (command, oid, value) for the mix"""
+    if mix == "get":
+        return [("get", rng.choice(SCALARS), None) for _ in range(requests)]
+    if mix == "walk":
+        # Each op is one GETNEXT; the driver restarts the walk at the end of the MIB
+        return [("getnext", None, None) for _ in range(requests)]
+    if mix == "set":
+        ops = []
+        while len(ops) < requests:
+            if rng.random() < set_ratio:
+                ops += [("set", OIDS["logLevel"], rng.choice(LOG_LEVEL_VALUES)) for _ in range(set_burst)]
+            else:
+                ops.append(("get", rng.choice(SCALARS), None))
+        return ops[:requests]
+    raise ValueError(f"unknown mix {mix}")
+
+class InProcessDriver:
+    """Calls the agent object directly"""
+
+    def __init__(self, service):
+        self.agent = load_agent_class(service)()
+        self.walk_oid = ENTERPRISE_OID
+
+    def send(self, command, oid, value):
+        if command == "get":
+            self.agent.process_request("GET", oid)
+        elif command == "set":
+            self.agent.process_request("SET", oid, value)
+        else:
+            response = self.agent.process_pass("getnext", self.walk_oid)
+            self.walk_oid = ENTERPRISE_OID if response == ["NONE"] else response[0]
+
+    def rss(self):
+        return psutil.Process().memory_info().rss
+
+    def close(self):
+        pass
+
+class StdinDriver:
+    """Speaks pass_persist to a real snmp-agent.py process over its pipes"""
+
+    def __init__(self, service):
+        script = os.path.join(SERVICES_DIR, service, "snmp-agent.py")
+        self.proc = subprocess.Popen([sys.executable, script], text=True, bufsize=1,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.walk_oid = "." + ENTERPRISE_OID
+        self._request("PING\n")
+
+    def _request(self, text):
+        self.proc.stdin.write(text)
+        self.proc.stdin.flush()
+        first = self.proc.stdout.readline().strip()
+        if first in SINGLE_LINE_RESPONSES or first == "PONG":
+            return [first]
+        return [first, self.proc.stdout.readline().strip(), self.proc.stdout.readline().strip()]
+
+    def send(self, command, oid, value):
+        if command == "get":
+            self._request(f"get\n.{oid}\n")
+        elif command == "set":
+            self._request(f"set\n.{oid}\nstring {value}\n")
+        else:
+            response = self._request(f"getnext\n{self.walk_oid}\n")
+            self.walk_oid = "." + ENTERPRISE_OID if response == ["NONE"] else response[0]
+
+    def rss(self):
+        return psutil.Process(self.proc.pid).memory_info().rss
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+DRIVERS = {"inprocess": InProcessDriver, "stdin": StdinDriver}
+
+def run_mix(driver, ops):
+    latencies = []
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    for command, oid, value in ops:
+        t0 = perf_counter()
+        driver.send(command, oid, value)
+        latencies.append((perf_counter() - t0) * 1e6)
+    elapsed = perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(ops),
+        "requests_per_second": round(len(ops) / elapsed, 1),
+        "p50_us": round(percentile(latencies, 50), 2),
+        "p95_us": round(percentile(latencies, 95), 2),
+        "p99_us": round(percentile(latencies, 99), 2),
+        "rss_bytes": driver.rss(),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVICES_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, baseline_path):
+    """Print p99 and throughput changes against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} (commit {baseline.get('commit')})")
+    for service, mixes in current["results"].items():
+        for mix, result in mixes.items():
+            old = baseline.get("results", {}).get(service, {}).get(mix)
+            if not old:
+                continue
+            rps_change = (result["requests_per_second"] / old["requests_per_second"] - 1) * 100
+            p99_change = (result["p99_us"] / old["p99_us"] - 1) * 100 if old["p99_us"] else 0.0
+            print(f"  {service:<16} {mix:<5} req/s {rps_change:+7.1f}%   p99 {p99_change:+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=sorted(DRIVERS), default="stdin")
+    parser.add_argument("--mix", default="get,walk,set", help="comma-separated mixes")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per mix per agent")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench-agents.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    mixes = [mix.strip() for mix in args.mix.split(",") if mix.strip()]
+    results = {}
+    print(f"{'service':<16} {'mix':<5} {'req/s':>10} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'RSS MB':>7}")
+    for service in AGENT_CLASSES:
+        results[service] = {}
+        driver = DRIVERS[args.mode](service)
+        try:
+            for mix in mixes:
+                ops = build_ops(mix, args.requests, random.Random(args.seed))
+                result = run_mix(driver, ops)
+                results[service][mix] = result
+                print(f"{service:<16} {mix:<5} {result['requests_per_second']:>10.0f} "
+                      f"{result['p50_us']:>9.1f} {result['p95_us']:>9.1f} {result['p99_us']:>9.1f} "
+                      f"{result['rss_bytes'] / 1048576:>7.1f}")
+        finally:
+            driver.close()
+
+    report = {
+        "benchmark": "bench_agents",
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "mode": args.mode,
+        "requests": args.requests,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Batched getmulti against one get per OID over pass_persist
+
+Each round fetches the collector's OIDs from a resident agent process.
+It uses one get/response exchange per OID, then a single getmulti
+request. The metric cache is disabled (METRIC_CACHE_TTL_MS=0) so every
+round recomputes the gauges, which shows the shared data sources being
+read once per batch.
+
+Usage: python3 benchmarks/bench_batch.py [--rounds N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from common import AGENT_CLASSES, SERVICES_DIR, percentile
+
+from collector.poller import COLLECT_OIDS
+
+def start_agent(service):
+    env = dict(os.environ, METRIC_CACHE_TTL_MS="0")
+    return subprocess.Popen([sys.executable, os.path.join(SERVICES_DIR, service, "snmp-agent.py")],
+                            text=True, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+def read_value(stdout):
+    first = stdout.readline().strip()
+    if first in ("NONE", "PONG"):
+        return first
+    stdout.readline()
+    return stdout.readline().strip()
+
+def single_round(proc):
+    for oid in COLLECT_OIDS:
+        proc.stdin.write(f"get\n.{oid}\n")
+        proc.stdin.flush()
+        read_value(proc.stdout)
+
+def batch_request():
+    return f"getmulti\n{len(COLLECT_OIDS)}\n" + "".join(f".{oid}\n" for oid in COLLECT_OIDS)
+
+def batch_round(proc, request):
+    proc.stdin.write(request)
+    proc.stdin.flush()
+    while proc.stdout.readline().strip() != "END":
+        pass
+
+def time_rounds(run, rounds):
+    latencies = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    latencies.sort()
+    return rounds / (sum(latencies) / 1e6), percentile(latencies, 50), percentile(latencies, 99)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    request = batch_request()
+    print(f"{len(COLLECT_OIDS)} OIDs per round\n")
+    print(f"{'service':<15} {'single rounds/s':>16} {'p50 us':>8} {'getmulti rounds/s':>18} {'p50 us':>8} {'speedup':>8}")
+    for service in AGENT_CLASSES:
+        proc = start_agent(service)
+        try:
+            proc.stdin.write("PING\n")
+            proc.stdin.flush()
+            read_value(proc.stdout)
+            single, single_p50, _ = time_rounds(lambda: single_round(proc), args.rounds)
+            batched, batched_p50, _ = time_rounds(lambda: batch_round(proc, request), args.rounds)
+        finally:
+            proc.stdin.close()
+            proc.wait()
+        print(f"{service:<15} {single:>16,.0f} {single_p50:>8.0f} {batched:>18,.0f} {batched_p50:>8.0f} "
+              f"{batched / single:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Collector throughput against a simulated fleet of agents
+
+Starts an agentcore.fleet of --agents UDP responders, cycling through
+the five profiles, in a separate process on consecutive loopback ports.
+It then polls all of them concurrently with the collector for --cycles
+rounds and reports polls per second.
+
+Usage: python3 benchmarks/bench_collector.py [--agents N] [--cycles N] [--first-port P]
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+import common  # puts snmp-services on sys.path
+
+from agentcore.fleet import build_fleet, serve_fleet
+from collector import AsyncPoller, port_range_inventory
+
+async def poll_fleet(count, first_port, cycles, timeout):
+    targets = port_range_inventory("127.0.0.1", first_port, count)
+    poller = await AsyncPoller(targets, timeout=timeout, retries=2).start()
+    try:
+        await poller.poll_all()  # warm-up round
+        failures = poller.stats.failures
+        start = time.perf_counter()
+        for _ in range(cycles):
+            await poller.poll_all()
+        elapsed = time.perf_counter() - start
+        return count * cycles / elapsed, poller.stats.failures - failures, poller.stats.retries
+    finally:
+        poller.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--first-port", type=int, default=20000)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve_fleet(build_fleet(args.agents), "127.0.0.1", args.first_port,
+                                ready=lambda: print("ready", flush=True)))
+        return
+
+    fleet = subprocess.Popen([sys.executable, __file__, "--serve", "--agents", str(args.agents),
+                              "--first-port", str(args.first_port)],
+                             stdout=subprocess.PIPE, text=True)
+    try:
+        fleet.stdout.readline()
+        rate, failures, retries = asyncio.run(
+            poll_fleet(args.agents, args.first_port, args.cycles, args.timeout))
+    finally:
+        fleet.terminate()
+        fleet.wait()
+    print(f"{args.agents} agents x {args.cycles} cycles: {rate:.0f} polls/s "
+          f"({rate * 14:.0f} OIDs/s), {failures} failed polls, {retries} retries")
+
+if __name__ == "__main__":
+    main()
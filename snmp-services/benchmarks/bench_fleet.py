@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Fleet-mode footprint: memory and construction time per virtual agent
+
+Builds --agents agents across the five profiles, as agentcore.fleet does,
+with and without history ring buffers. It reports the traced Python
+bytes and construction time per agent, and the process RSS.
+
+Usage: python3 benchmarks/bench_fleet.py [--agents N]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import psutil
+
+import common  # puts snmp-services on sys.path
+
+from agentcore.fleet import build_fleet, fleet_classes
+
+def measure(count, history):
+    fleet_classes(history)
+    build_fleet(5, history=history)  # build the shared per-class tables outside the measurement
+    rss_before = psutil.Process().memory_info().rss
+    tracemalloc.start()
+    start = time.perf_counter()
+    agents = build_fleet(count, history=history)
+    elapsed = time.perf_counter() - start
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss = psutil.Process().memory_info().rss - rss_before
+    del agents
+    return traced / count, elapsed / count * 1e6, rss / 1048576
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'history':<8} {'bytes/agent':>12} {'us/agent':>9} {'RSS MB':>8}")
+    for history in (False, True):
+        per_agent, build_us, rss = measure(args.agents, history)
+        print(f"{'on' if history else 'off':<8} {per_agent:>12,.0f} {build_us:>9.1f} {rss:>8.1f}")
+
+if __name__ == "__main__":
+    main()
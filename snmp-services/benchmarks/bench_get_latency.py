@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Per-GET latency benchmark for all five agents
+
+Compares the old eager behaviour (every handler evaluated to build the
+full OID map on each GET) with the lazy per-OID dispatch.
+
+Usage: python3 benchmarks/bench_get_latency.py [--iterations N] [--eager-iterations N]
+"""
+
+import argparse
+import time
+
+from common import AGENT_CLASSES, load_agent_class, percentile
+
+from agentcore.oids import OIDS
+
+SYS_NAME_OID = OIDS["sysName"]
+CPU_USAGE_OID = OIDS["cpuUsage"]
+
+def eager_get(agent, oid):
+    """Reproduce the pre-registry lookup: build every value, then index"""
+    oid_map = {key: handler(agent) for key, handler in agent.oid_handlers.items()}
+    return oid_map.get(oid, "No Such Instance")
+
+def lazy_get(agent, oid):
+    return agent.get_oid_value(oid)
+
+def measure(get, agent, oids, iterations):
+    """Return sorted per-GET latencies in microseconds"""
+    samples = []
+    for _ in range(iterations):
+        for oid in oids:
+            start = time.perf_counter()
+            get(agent, oid)
+            samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return samples
+
+def report(label, samples):
+    print(f"  {label:<22} n={len(samples):<6} "
+          f"p50={percentile(samples, 50):>12.1f}us "
+          f"p99={percentile(samples, 99):>12.1f}us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="lazy GETs per OID per agent")
+    parser.add_argument("--eager-iterations", type=int, default=200,
+                        help="eager GETs of sysName per agent (each evaluates every handler)")
+    args = parser.parse_args()
+
+    for service in AGENT_CLASSES:
+        agent = load_agent_class(service)()
+        all_oids = list(agent.oid_handlers)
+        print(f"{service} ({agent.service_name})")
+        report("eager sysName", measure(eager_get, agent, [SYS_NAME_OID], args.eager_iterations))
+        report("lazy sysName", measure(lazy_get, agent, [SYS_NAME_OID], args.iterations))
+        report("lazy cpuUsage", measure(lazy_get, agent, [CPU_USAGE_OID], args.iterations))
+        report("lazy all OIDs", measure(lazy_get, agent, all_oids, args.iterations))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Columnar metric store: write throughput and range-query latency
+
+Fills a temporary store with --days of samples for the five agents,
+polled every --interval seconds, with rollups maintained as it writes.
+It then times range queries on it: a full day of raw samples per
+metric, the last hour, and the 1m and 1h rollups. It also reports the
+bytes on disk per sample.
+
+Usage: python3 benchmarks/bench_metric_store.py [--days N] [--interval S] [--queries N]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from common import AGENT_CLASSES, percentile
+
+from collector.metricstore import MetricStore
+from collector.poller import COLLECT_OIDS
+
+def fill(store, start, samples, interval, rng):
+    values = {oid: 0 for oid in COLLECT_OIDS}
+    for i in range(samples):
+        timestamp = start + i * interval
+        for agent in AGENT_CLASSES:
+            for oid in COLLECT_OIDS:
+                values[oid] = rng.randrange(1000)
+            store.append(agent, timestamp, values)
+
+def time_queries(store, start, end, resolution, queries, rng):
+    latencies, rows = [], 0
+    for _ in range(queries):
+        agent = rng.choice(list(AGENT_CLASSES))
+        metric = rng.choice(store.metrics)
+        t0 = time.perf_counter()
+        chunks = store.query(agent, metric, start, end, resolution)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        rows = sum(len(values) for _, _, values, _ in chunks)
+        for _, offsets, values, _ in chunks:
+            offsets.release()
+            values.release()
+    latencies.sort()
+    return rows, percentile(latencies, 50), percentile(latencies, 99)
+
+def disk_usage(root):
+    return sum(os.stat(os.path.join(path, name)).st_blocks * 512
+               for path, _, names in os.walk(root) for name in names)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--interval", type=float, default=5.0)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = int(args.days * 86400 / args.interval)
+    start = 1_700_000_000.0
+    end = start + samples * args.interval
+
+    with tempfile.TemporaryDirectory() as root:
+        store = MetricStore(root)
+        t0 = time.perf_counter()
+        fill(store, start, samples, args.interval, rng)
+        elapsed = time.perf_counter() - t0
+        written = samples * len(AGENT_CLASSES)
+        print(f"wrote {written} polls x {len(store.metrics)} metrics in {elapsed:.1f}s "
+              f"({written / elapsed:,.0f} polls/s), "
+              f"{disk_usage(root) / written / len(store.metrics):.1f} bytes/sample on disk")
+
+        print(f"\n{'query':<22} {'rows':>7} {'p50 ms':>8} {'p99 ms':>8}")
+        for label, resolution, query_start in (("raw, full range", "raw", start),
+                                               ("raw, last hour", "raw", end - 3600),
+                                               ("1m rollup, full range", "1m", start),
+                                               ("1h rollup, full range", "1h", start)):
+            rows, p50, p99 = time_queries(store, query_start, end, resolution, args.queries, rng)
+            print(f"{label:<22} {rows:>7} {p50:>8.3f} {p99:>8.3f}")
+        store.close()
+
+if __name__ == "__main__":
+    main()
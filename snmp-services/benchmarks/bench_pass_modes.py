@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Requests per second under snmpd "pass" (fork per request) and "pass_persist"
+
+Drives each agent script exactly the way snmpd would: one interpreter per
+request with -g OID for pass, and a single resident process speaking the
+get/getnext protocol over pipes for pass_persist.
+
+Usage: python3 benchmarks/bench_pass_modes.py [--fork-requests N] [--persist-requests N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from common import AGENT_CLASSES, SERVICES_DIR
+
+OIDS = [
+    ".1.3.6.1.4.1.9999.1.1.0",
+    ".1.3.6.1.4.1.9999.1.3.0",
+    ".1.3.6.1.4.1.9999.1.4.0",
+    ".1.3.6.1.4.1.9999.1.9.0",
+]
+
+def script_path(service):
+    return os.path.join(SERVICES_DIR, service, "snmp-agent.py")
+
+def bench_fork(service, requests):
+    """One python process per GET, as snmpd does for pass"""
+    start = time.perf_counter()
+    for i in range(requests):
+        subprocess.run([sys.executable, script_path(service), "-g", OIDS[i % len(OIDS)]],
+                       check=True, stdout=subprocess.DEVNULL)
+    return requests / (time.perf_counter() - start)
+
+def read_response(stdout):
+    """Read one pass_persist response (NONE or OID/TYPE/VALUE)"""
+    first = stdout.readline()
+    if first.strip() in ("NONE", "PONG", "DONE"):
+        return [first]
+    return [first, stdout.readline(), stdout.readline()]
+
+def bench_persist(service, requests):
+    """One resident process answering GETs over its stdin/stdout pipes"""
+    proc = subprocess.Popen([sys.executable, script_path(service)], text=True,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        proc.stdin.write("PING\n")
+        proc.stdin.flush()
+        read_response(proc.stdout)
+        start = time.perf_counter()
+        for i in range(requests):
+            proc.stdin.write(f"get\n{OIDS[i % len(OIDS)]}\n")
+            proc.stdin.flush()
+            read_response(proc.stdout)
+        return requests / (time.perf_counter() - start)
+    finally:
+        proc.stdin.close()
+        proc.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fork-requests", type=int, default=20)
+    parser.add_argument("--persist-requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'service':<16} {'pass req/s':>12} {'pass_persist req/s':>20} {'speedup':>9}")
+    for service in AGENT_CLASSES:
+        fork_rate = bench_fork(service, args.fork_requests)
+        persist_rate = bench_persist(service, args.persist_requests)
+        print(f"{service:<16} {fork_rate:>12.1f} {persist_rate:>20.1f} {persist_rate / fork_rate:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Sharded collector throughput against a local simulated fleet
+
+Starts an agentcore.fleet of --agents UDP responders on consecutive
+loopback ports, split across --fleet-processes processes. Each
+configuration then polls all agents back to back (interval 0) for
+--seconds:
+
+  inline       one AsyncPoller in this process, the unsharded collector
+  workers=N    ShardedCollector with N worker processes, for N = 1, 2, 4...
+               up to --max-workers
+
+It reports polls/s and the speedup over inline. With --kill, one worker
+is killed halfway through the largest run. The report then shows how
+long its agents went unpolled before the survivors took them over.
+
+The fleet shares the machine's cores with the collector, so scaling
+flattens once the two together fill them. The core count is printed
+with the results.
+
+Usage: python3 benchmarks/bench_sharding.py [--agents N] [--seconds S] [--max-workers N] [--kill]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import common  # puts snmp-services on sys.path
+
+from collector import AsyncPoller, ShardedCollector, port_range_inventory
+
+def start_fleet(agents, first_port, processes):
+    fleet = subprocess.Popen([sys.executable, "-m", "agentcore.fleet", "--agents", str(agents),
+                              "--first-port", str(first_port), "--processes", str(processes)],
+                             cwd=common.SERVICES_DIR, stderr=subprocess.PIPE, text=True)
+    fleet.stderr.readline()  # "N agents ready ..."
+    return fleet
+
+def inline_rate(targets, seconds, timeout):
+    async def run():
+        poller = await AsyncPoller(targets, interval=0, jitter=0, timeout=timeout).start()
+        try:
+            await asyncio.wait_for(poller.run(lambda result: None), seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            poller.close()
+        return poller.stats
+    stats = asyncio.run(run())
+    return stats.polls / seconds, stats.failures
+
+def sharded_rate(targets, workers, seconds, timeout, kill=False):
+    collector = ShardedCollector(targets, workers=workers, interval=0, jitter=0, timeout=timeout).start()
+    last_polled = {}
+    outage = None
+    try:
+        collector.run(lambda result: None, duration=0.5)  # warm-up: workers up and polling
+        polls, failures = collector.stats.polls, collector.stats.failures
+        started = time.monotonic()
+        if kill:
+            collector.run(lambda result: None, duration=seconds / 2)
+            victim = next(iter(collector.workers.values()))
+            moved = {targets[index].name for index in victim.share}
+            killed_at = time.monotonic()
+            os.kill(victim.process.pid, signal.SIGKILL)
+
+            def on_result(result):
+                if result.target.name in moved and result.target.name not in last_polled:
+                    last_polled[result.target.name] = time.monotonic()
+            collector.run(on_result, duration=seconds / 2)
+            if len(last_polled) == len(moved):
+                outage = max(last_polled.values()) - killed_at
+        else:
+            collector.run(lambda result: None, duration=seconds)
+        elapsed = time.monotonic() - started
+        return (collector.stats.polls - polls) / elapsed, collector.stats.failures - failures, outage
+    finally:
+        collector.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--max-workers", type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument("--fleet-processes", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--first-port", type=int, default=22000)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--kill", action="store_true", help="kill a worker halfway through the largest run")
+    args = parser.parse_args()
+
+    targets = port_range_inventory("127.0.0.1", args.first_port, args.agents)
+    fleet = start_fleet(args.agents, args.first_port, args.fleet_processes)
+    try:
+        print(f"{args.agents} agents in {args.fleet_processes} fleet processes, {os.cpu_count()} cores, "
+              f"{args.seconds:.0f} s per run\n")
+        print(f"{'collector':<12} {'polls/s':>9} {'speedup':>8} {'failed':>7}")
+        baseline, failures = inline_rate(targets, args.seconds, args.timeout)
+        print(f"{'inline':<12} {baseline:>9,.0f} {1.0:>7.2f}x {failures:>7}")
+        counts, workers = [], 1
+        while workers <= args.max_workers:
+            counts.append(workers)
+            workers *= 2
+        for workers in counts:
+            kill = args.kill and workers == counts[-1] and workers > 1
+            rate, failures, outage = sharded_rate(targets, workers, args.seconds, args.timeout, kill)
+            note = ""
+            if kill:
+                note = (f"  one worker killed; its agents polled again within {outage * 1000:.0f} ms"
+                        if outage is not None else "  one worker killed; some of its agents were not polled again")
+            print(f"{f'workers={workers}':<12} {rate:>9,.0f} {rate / baseline:>7.2f}x {failures:>7}{note}")
+    finally:
+        fleet.send_signal(signal.SIGINT)
+        fleet.wait()
+
+if __name__ == "__main__":
+    main()
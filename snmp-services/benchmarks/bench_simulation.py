@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Metric simulation: per-request cost, block size and reproducibility
+
+Times simulated() reads for each profile on a fake clock that advances
+one step every --reads-per-step reads. The cost of generating each block
+is spread over all the reads served from it. It then checks that two
+simulators with the same seed agree at every step and that different
+seeds diverge. It also reports the memory held by one simulator.
+
+Usage: python3 benchmarks/bench_simulation.py [--steps N] [--reads-per-step N] [--block N]
+"""
+
+import argparse
+import sys
+import time
+
+from common import AGENT_CLASSES, load_agent_class
+
+from agentcore.simulation import SIMULATION_BLOCK, Simulator
+
+START = 1_700_000_000.0
+
+class FakeClock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+def signals_of(cls):
+    names = ["cpu", "netIn", "netOut", "memory", "latency", "requests", "hits", "backendsUp"]
+    return names + list(cls.random_walks)
+
+def time_reads(cls, steps, reads_per_step, block):
+    clock = FakeClock()
+    simulator = Simulator(cls, 1, START, step=1.0, block=block, clock=clock)
+    names = signals_of(cls)
+    value = simulator.value
+    t0 = time.perf_counter()
+    for step in range(steps):
+        clock.now = START + step
+        for i in range(reads_per_step):
+            value(names[i % len(names)])
+    elapsed = time.perf_counter() - t0
+    return elapsed / (steps * reads_per_step) * 1e9
+
+def trace(cls, seed, steps, block):
+    clock = FakeClock()
+    simulator = Simulator(cls, seed, START, step=1.0, block=block, clock=clock)
+    names = signals_of(cls)
+    rows = []
+    for step in range(steps):
+        clock.now = START + step
+        rows.append(tuple(simulator.value(name) for name in names))
+    return rows
+
+def footprint(cls, block):
+    simulator = Simulator(cls, 1, START, step=1.0, block=block, clock=lambda: START)
+    simulator.value("cpu")
+    signals = simulator.current[1]
+    return sys.getsizeof(simulator) + sum(sys.getsizeof(values) for values in signals.values()) + sys.getsizeof(signals)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--reads-per-step", type=int, default=10)
+    parser.add_argument("--block", type=int, default=SIMULATION_BLOCK)
+    args = parser.parse_args()
+
+    print(f"{'profile':<15} {'ns/read':>8} {'ns/read block=1':>16} {'bytes/simulator':>16} {'reproducible':>13}")
+    for service in AGENT_CLASSES:
+        cls = load_agent_class(service)
+        blocked = time_reads(cls, args.steps, args.reads_per_step, args.block)
+        unblocked = time_reads(cls, args.steps // 10, args.reads_per_step, 1)
+        same = trace(cls, 7, 2000, args.block) == trace(cls, 7, 2000, args.block)
+        different = trace(cls, 7, 2000, args.block) != trace(cls, 8, 2000, args.block)
+        print(f"{service:<15} {blocked:>8.0f} {unblocked:>16.0f} {footprint(cls, args.block):>16} "
+              f"{'yes' if same and different else 'NO':>13}")
+
+if __name__ == "__main__":
+    main()
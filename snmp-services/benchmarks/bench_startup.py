@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Agent startup: spawn to first response, and an import-time breakdown
+
+For each service, starts a fresh agent process --runs times and measures
+the time from spawn to the first response line on stdout:
+
+  pass     snmp-agent.py -g OID, the process snmpd runs for every request
+  persist  snmp-agent.py in pass_persist mode, sent a get on startup
+  warm     persist with AGENT_SNAPSHOT_DIR holding the previous run's snapshot
+
+The OID is cpuUsage unless --oid is given. The median of each is compared
+with the time the interpreter alone takes to start and print a line
+(python -c 'print()'), and the difference with the 50 ms target.
+
+It then lists the modules with the highest self time in
+python -X importtime, for an agent one-shot GET.
+
+Usage: python3 benchmarks/bench_startup.py [--runs N] [--oid NAME] [--top N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import AGENT_CLASSES, SERVICES_DIR
+
+from agentcore.oids import OIDS
+
+TARGET_MS = 50.0
+
+def agent_script(service):
+    return os.path.join(SERVICES_DIR, service, "snmp-agent.py")
+
+def time_first_line(argv, env, request=None):
+    """Milliseconds from spawn to the first line on the process's stdout"""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(argv, env=env, text=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    if request is not None:
+        proc.stdin.write(request)
+        proc.stdin.flush()
+    proc.stdout.readline()
+    elapsed = (time.perf_counter() - t0) * 1000
+    proc.stdin.close()
+    proc.stdout.read()
+    proc.wait()
+    return elapsed
+
+def median_ms(runs, measure):
+    return statistics.median(measure() for _ in range(runs))
+
+def import_breakdown(service, oid, top):
+    """(self µs, cumulative µs, module) rows of -X importtime, highest self time first"""
+    result = subprocess.run([sys.executable, "-X", "importtime", agent_script(service), "-g", oid],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(own), int(cumulative), module.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top], sum(own for own, _, _ in rows)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--oid", default="cpuUsage", choices=sorted(OIDS))
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    oid = "." + OIDS[args.oid]
+    env = dict(os.environ)
+    env.pop("AGENT_SNAPSHOT_DIR", None)
+    baseline = median_ms(args.runs, lambda: time_first_line([sys.executable, "-c", "print()"], env))
+    print(f"interpreter alone (python -c 'print()'): {baseline:.1f} ms; GET {args.oid}; median of {args.runs} runs\n")
+    print(f"{'service':<15} {'pass ms':>8} {'persist ms':>11} {'warm ms':>8} {'over interpreter':>17} {'target':>7}")
+    for service in AGENT_CLASSES:
+        argv = [sys.executable, agent_script(service)]
+        one_shot = median_ms(args.runs, lambda: time_first_line(argv + ["-g", oid], env))
+        persist = median_ms(args.runs, lambda: time_first_line(argv, env, f"get\n{oid}\n"))
+        with tempfile.TemporaryDirectory() as snapshots:
+            warm_env = dict(env, AGENT_SNAPSHOT_DIR=snapshots)
+            time_first_line(argv + ["-g", oid], warm_env)
+            warm = median_ms(args.runs, lambda: time_first_line(argv, warm_env, f"get\n{oid}\n"))
+        over = max(one_shot, persist, warm) - baseline
+        print(f"{service:<15} {one_shot:>8.1f} {persist:>11.1f} {warm:>8.1f} {over:>17.1f} "
+              f"{'met' if over < TARGET_MS else 'MISSED':>7}")
+
+    service = next(iter(AGENT_CLASSES))
+    rows, total = import_breakdown(service, oid, args.top)
+    print(f"\n-X importtime for {service} -g: {total / 1000:.1f} ms in all imports; top {len(rows)} by self time")
+    print(f"{'self us':>8} {'cumulative us':>14}  module")
+    for own, cumulative, module in rows:
+        print(f"{own:>8} {cumulative:>14}  {module.strip()}")
+
+if __name__ == "__main__":
+    main()
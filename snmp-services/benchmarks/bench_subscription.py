@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Changes-only subscriptions against full polling, on a local simulated fleet
+
+Starts an agentcore.fleet of --agents UDP responders and collects the
+collector's 14 OIDs from all of them every --interval seconds for
+--seconds, twice:
+
+  polling     AsyncPoller: one GET of all 14 OIDs per agent per interval
+  subscribed  Subscriber: one subscription per agent, the default
+              deadbands, and only changed values sent back
+
+Each run reports collector-side bytes sent and received per second, the
+collector's CPU time per second of wall time (this process, which only
+collects) and the fleet's, and how many agent results were delivered.
+The subscribed run's subscriptions are renewed every --lease / 2
+seconds, and those renewals are counted in its bytes.
+
+Usage: python3 benchmarks/bench_subscription.py [--agents N] [--seconds S] [--interval S]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import psutil
+
+import common  # puts snmp-services on sys.path
+
+from collector import AsyncPoller, Subscriber, port_range_inventory
+
+def start_fleet(agents, first_port):
+    fleet = subprocess.Popen([sys.executable, "-m", "agentcore.fleet", "--agents", str(agents),
+                              "--first-port", str(first_port)],
+                             cwd=common.SERVICES_DIR, stderr=subprocess.PIPE, text=True)
+    fleet.stderr.readline()  # "N agents ready ..."
+    return fleet
+
+def cpu_seconds(process):
+    times = process.cpu_times()
+    return times.user + times.system
+
+async def measure(collector, seconds, fleet):
+    """(bytes sent, bytes received, results, collector CPU s, fleet CPU s) over seconds of collection"""
+    results = 0
+
+    def on_result(result):
+        nonlocal results
+        results += 1
+
+    await collector.start()
+    fleet_started, started = cpu_seconds(fleet), time.process_time()
+    try:
+        if isinstance(collector, Subscriber):
+            await collector.run(on_result, duration=seconds)
+        else:
+            try:
+                await asyncio.wait_for(collector.run(on_result), seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        collector.close()
+    stats = collector.stats
+    return (stats.bytes_sent, stats.bytes_received, results, time.process_time() - started,
+            cpu_seconds(fleet) - fleet_started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--lease", type=float, default=30.0)
+    parser.add_argument("--first-port", type=int, default=24000)
+    args = parser.parse_args()
+
+    targets = port_range_inventory("127.0.0.1", args.first_port, args.agents)
+    fleet_process = start_fleet(args.agents, args.first_port)
+    try:
+        fleet = psutil.Process(fleet_process.pid)
+        print(f"{args.agents} agents, every {args.interval:g} s for {args.seconds:g} s, "
+              f"lease {args.lease:g} s, {os.cpu_count()} cores\n")
+        print(f"{'mode':<11} {'sent B/s':>9} {'recv B/s':>10} {'results/s':>10} {'collector CPU':>14} "
+              f"{'fleet CPU':>10}")
+        runs = {}
+        for mode, collector in (
+                ("polling", AsyncPoller(targets, interval=args.interval)),
+                ("subscribed", Subscriber(targets, interval=args.interval, lease=args.lease))):
+            sent, received, results, cpu, fleet_cpu = asyncio.run(measure(collector, args.seconds, fleet))
+            runs[mode] = (sent + received, cpu)
+            print(f"{mode:<11} {sent / args.seconds:>9,.0f} {received / args.seconds:>10,.0f} "
+                  f"{results / args.seconds:>10,.1f} {cpu / args.seconds:>13.1%} {fleet_cpu / args.seconds:>9.1%}")
+        (polled_bytes, polled_cpu), (subscribed_bytes, subscribed_cpu) = runs["polling"], runs["subscribed"]
+        print(f"\nsubscribed: {subscribed_bytes / polled_bytes:.0%} of the bytes and "
+              f"{subscribed_cpu / polled_cpu:.0%} of the collector CPU of polling")
+    finally:
+        fleet_process.send_signal(signal.SIGINT)
+        fleet_process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Trap storm against the trap receiver
+
+Starts python3 -m trapreceiver in a separate process with a temporary
+database. It then sends --traps pre-encoded notifications, spread over
+a handful of agents and trap types, at --rate per second (0 = as fast as
+possible). It reports the send rate, what the receiver ingested and
+dropped, and the kernel's UDP receive-buffer drops over the run.
+
+Usage: python3 benchmarks/bench_trap_storm.py [--traps N] [--rate R] [--port P]
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from common import AGENT_CLASSES, SERVICES_DIR
+
+from agentcore import ber
+from agentcore.oids import OIDS
+from agentcore.traps import SNMP_TRAP_OID, SYS_UPTIME_OID, TRAP_OIDS
+
+def build_traps(count=64):
+    """Distinct encoded SNMPv2-Trap messages to cycle through"""
+    messages = []
+    for i in range(count):
+        agent = list(AGENT_CLASSES)[i % len(AGENT_CLASSES)]
+        trap_name = list(TRAP_OIDS)[i % len(TRAP_OIDS)]
+        varbinds = [(SYS_UPTIME_OID, ber.TIMETICKS, 1000 + i),
+                    (SNMP_TRAP_OID, ber.OBJECT_IDENTIFIER, TRAP_OIDS[trap_name]),
+                    (OIDS["sysName"], ber.OCTET_STRING, agent),
+                    (OIDS["cpuUsage"], ber.GAUGE32, 50 + i % 50)]
+        messages.append(ber.encode_message(b"public", ber.SNMPV2_TRAP, i + 1, varbinds))
+    return messages
+
+def kernel_udp_drops():
+    """RcvbufErrors from /proc/net/snmp, or None where unavailable"""
+    try:
+        with open("/proc/net/snmp") as f:
+            lines = [line.split() for line in f if line.startswith("Udp:")]
+        return int(lines[1][lines[0].index("RcvbufErrors")])
+    except (OSError, IndexError, ValueError):
+        return None
+
+def fetch_stats(http_port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{http_port}/stats", timeout=5) as response:
+        return json.load(response)
+
+def send_storm(port, traps, rate):
+    messages = build_traps()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = ("127.0.0.1", port)
+    start = time.perf_counter()
+    for i in range(traps):
+        sock.sendto(messages[i % len(messages)], address)
+        if rate and i % 100 == 99:
+            ahead = (i + 1) / rate - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+    return traps / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--traps", type=int, default=200000)
+    parser.add_argument("--rate", type=float, default=30000, help="traps per second, 0 = unpaced")
+    parser.add_argument("--port", type=int, default=16262)
+    parser.add_argument("--http-port", type=int, default=16280)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        receiver = subprocess.Popen(
+            [sys.executable, "-m", "trapreceiver", "--host", "127.0.0.1", "--port", str(args.port),
+             "--http-port", str(args.http_port), "--db", os.path.join(tmp, "traps.db"), "--report", "3600"],
+            cwd=SERVICES_DIR, stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                try:
+                    fetch_stats(args.http_port)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            kernel_before = kernel_udp_drops()
+            send_rate = send_storm(args.port, args.traps, args.rate)
+
+            # Wait for the writer to drain the queue
+            stats, previous = fetch_stats(args.http_port), -1
+            while stats["queued"] or stats["ingested"] != previous:
+                previous = stats["ingested"]
+                time.sleep(0.2)
+                stats = fetch_stats(args.http_port)
+            kernel_after = kernel_udp_drops()
+        finally:
+            receiver.terminate()
+            receiver.wait()
+
+    print(f"sent        {args.traps} traps at {send_rate:,.0f}/s")
+    print(f"received    {stats['received']}")
+    print(f"ingested    {stats['ingested']} in {stats['batches']} batches")
+    print(f"dropped     {stats['dropped']} (queue full), {stats['malformed']} malformed")
+    if kernel_before is not None:
+        print(f"kernel      {kernel_after - kernel_before} UDP receive-buffer drops (host-wide)")
+
+if __name__ == "__main__":
+    main()
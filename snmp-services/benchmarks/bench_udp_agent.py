@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Throughput of the standalone SNMPv2c UDP responder
+
+Starts each agent with --udp on a loopback port and drives it from a
+loopback load generator that keeps a window of GET requests in flight.
+Also times decode + respond in-process to show the per-request CPU cost
+without the socket.
+
+Usage: python3 benchmarks/bench_udp_agent.py [--requests N] [--window N] [--oids N]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from common import AGENT_CLASSES, SERVICES_DIR, load_agent_class
+
+from agentcore import ber
+from agentcore.oids import OIDS
+from agentcore.udpagent import respond
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def build_requests(count, oids):
+    varbinds = [(oid, ber.NULL, None) for oid in oids]
+    return [ber.encode_message(b"public", ber.GET_REQUEST, i, varbinds) for i in range(count)]
+
+def wait_ready(sock, address, probe):
+    deadline = time.monotonic() + 10
+    sock.settimeout(0.2)
+    while time.monotonic() < deadline:
+        sock.sendto(probe, address)
+        try:
+            sock.recv(65535)
+            return
+        except socket.timeout:
+            continue
+    raise RuntimeError("agent did not answer on %s:%d" % address)
+
+def drive(address, requests, window):
+    """Send requests keeping `window` outstanding; return (req/s, lost)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    wait_ready(sock, address, requests[0])
+    sock.settimeout(1.0)
+    sent = received = lost = 0
+    start = time.perf_counter()
+    while sent < min(window, len(requests)):
+        sock.sendto(requests[sent], address)
+        sent += 1
+    while received + lost < len(requests):
+        try:
+            sock.recv(65535)
+            received += 1
+        except socket.timeout:
+            lost += sent - received - lost
+        if sent < len(requests):
+            sock.sendto(requests[sent], address)
+            sent += 1
+    elapsed = time.perf_counter() - start
+    sock.close()
+    return received / elapsed, lost
+
+def in_process_rate(service, requests):
+    agent = load_agent_class(service)()
+    start = time.perf_counter()
+    for data in requests:
+        respond(agent, ber.decode_message(data))
+    return len(requests) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--window", type=int, default=32, help="requests kept in flight")
+    parser.add_argument("--oids", type=int, default=1, help="varbinds per GET (max 15)")
+    args = parser.parse_args()
+
+    oids = list(OIDS.values())[:max(1, min(args.oids, len(OIDS)))]
+    requests = build_requests(args.requests, oids)
+    print(f"{'service':<16} {'udp req/s':>11} {'lost':>6} {'in-process req/s':>18}")
+    for service in AGENT_CLASSES:
+        port = free_port()
+        script = os.path.join(SERVICES_DIR, service, "snmp-agent.py")
+        proc = subprocess.Popen([sys.executable, script, "--udp", f"127.0.0.1:{port}"])
+        try:
+            rate, lost = drive(("127.0.0.1", port), requests, args.window)
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{service:<16} {rate:>11.0f} {lost:>6} {in_process_rate(service, requests):>18.0f}")
+
+if __name__ == "__main__":
+    main()
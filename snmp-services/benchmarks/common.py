@@ -0,0 +1,25 @@
+"""
+Shared helpers for the agent benchmarks
+Loads the per-service profiles through agentcore without needing snmpd
+"""
+
+import os
+import sys
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICES_DIR)
+
+from agentcore import SERVICES, load_profile
+
+AGENT_CLASSES = {service: class_name for service, (class_name, _) in SERVICES.items()}
+
+def load_agent_class(service):
+    """Return the agent class defined by a service's snmp-agent.py"""
+    return load_profile(service)
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, int(round(pct / 100.0 * len(samples))) - 1))
+    return samples[index]
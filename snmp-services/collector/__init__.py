@@ -0,0 +1,26 @@
+"""
+Collector service that polls the snmp-services agents
+"""
+
+from .inventory import AgentTarget, community_inventory, default_inventory, load_inventory, port_range_inventory
+from .metricstore import MetricStore
+from .poller import COLLECT_OIDS, AsyncPoller, PollResult
+from .scheduler import AdaptiveScheduler
+from .sharding import HashRing, ShardedCollector
+from .subscriber import Subscriber
+
+__all__ = [
+    "COLLECT_OIDS",
+    "AdaptiveScheduler",
+    "AgentTarget",
+    "AsyncPoller",
+    "HashRing",
+    "MetricStore",
+    "PollResult",
+    "ShardedCollector",
+    "Subscriber",
+    "community_inventory",
+    "default_inventory",
+    "load_inventory",
+    "port_range_inventory",
+]
@@ -0,0 +1,145 @@
+"""
+Run the collector: python3 -m collector [options]
+
+Prints one JSON line per poll and a throughput summary on exit. With
+--store DIR every sample is also written to the columnar metric store.
+With --workers N the agents are sharded across N polling processes
+(see collector.sharding). With --subscribe the agents are not polled:
+each one streams its changed values (see collector.subscriber). With
+--adaptive each agent's OIDs are polled as often as they change, within
+a --budget of polls/s (see collector.scheduler).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from agentcore.mib import MIB
+
+from .inventory import default_inventory, load_inventory
+from .metricstore import MetricStore
+from .poller import AsyncPoller
+from .scheduler import DEFAULT_BUDGET, AdaptiveScheduler
+from .sharding import ShardedCollector
+from .subscriber import DEFAULT_LEASE, Subscriber
+
+def print_result(result):
+    print(json.dumps({
+        "agent": result.target.name,
+        "timestamp": result.timestamp,
+        "latencyMs": round(result.latency * 1000, 2),
+        "error": result.error,
+        "values": {oid: MIB.display(oid, value) for oid, value in result.values.items()},
+    }), flush=True)
+
+def inventory(args):
+    return load_inventory(args.inventory) if args.inventory else default_inventory(args.host)
+
+def result_handler(args, store):
+    def on_result(result):
+        if store is not None:
+            store.record(result)
+        if not args.quiet:
+            print_result(result)
+    return on_result
+
+def print_summary(stats):
+    print(f"{stats.polls} polls, {stats.failures} failed, {stats.retries} retries, "
+          f"{stats.polls_per_second():.1f} polls/s", file=sys.stderr)
+
+async def collect(args):
+    poller = await AsyncPoller(inventory(args), timeout=args.timeout, retries=args.retries,
+                               interval=args.interval, jitter=args.jitter).start()
+    store = MetricStore(args.store) if args.store else None
+    try:
+        await poller.run(result_handler(args, store), cycles=args.cycles)
+    finally:
+        poller.close()
+        if store is not None:
+            store.close()
+        print_summary(poller.stats)
+
+async def collect_subscribed(args):
+    subscriber = await Subscriber(inventory(args), timeout=args.timeout, retries=args.retries,
+                                  interval=args.interval, lease=args.lease).start()
+    store = MetricStore(args.store) if args.store else None
+    try:
+        await subscriber.run(result_handler(args, store),
+                             duration=None if args.cycles is None else args.cycles * args.interval)
+    finally:
+        subscriber.close()
+        if store is not None:
+            store.close()
+        print_summary(subscriber.stats)
+        print(f"{subscriber.updates} updates, {subscriber.gaps} sequence gaps", file=sys.stderr)
+
+async def collect_adaptive(args):
+    scheduler = await AdaptiveScheduler(inventory(args), timeout=args.timeout, retries=args.retries,
+                                        interval=args.interval, jitter=args.jitter, budget=args.budget,
+                                        min_interval=args.min_interval, max_interval=args.max_interval).start()
+    store = MetricStore(args.store) if args.store else None
+    try:
+        await scheduler.run(result_handler(args, store),
+                            duration=None if args.cycles is None else args.cycles * args.interval)
+    finally:
+        scheduler.close()
+        if store is not None:
+            store.close()
+        print_summary(scheduler.stats)
+        print(f"{scheduler.demand:.1f} polls/s wanted of a {scheduler.budget:g} budget, "
+              f"{scheduler.degraded} agents degraded", file=sys.stderr)
+
+def collect_sharded(args):
+    collector = ShardedCollector(inventory(args), workers=args.workers, cycles=args.cycles,
+                                 timeout=args.timeout, retries=args.retries,
+                                 interval=args.interval, jitter=args.jitter).start()
+    store = MetricStore(args.store) if args.store else None
+    try:
+        collector.run(result_handler(args, store))
+    finally:
+        collector.close()
+        if store is not None:
+            store.close()
+        print_summary(collector.stats)
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll SNMP agents concurrently")
+    parser.add_argument("--inventory", help="JSON inventory file (default: the five compose agents)")
+    parser.add_argument("--host", default="127.0.0.1", help="host of the default inventory")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between polls per agent")
+    parser.add_argument("--jitter", type=float, default=0.1, help="fractional interval jitter")
+    parser.add_argument("--timeout", type=float, default=1.0, help="seconds per attempt")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--cycles", type=int, help="stop after this many polls per agent")
+    parser.add_argument("--store", help="directory of the columnar metric store to write samples to")
+    parser.add_argument("--quiet", action="store_true", help="do not print the JSON lines")
+    parser.add_argument("--workers", type=int, default=1, help="shard the agents across this many processes")
+    parser.add_argument("--subscribe", action="store_true",
+                        help="subscribe to changes instead of polling; --cycles then counts intervals")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE, help="subscription lease in seconds")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="adapt each agent's and OID's interval to its changes and health; "
+                             "--cycles then counts intervals")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="adaptive polls/s across all agents")
+    parser.add_argument("--min-interval", type=float, help="shortest adaptive interval (default: interval / 4)")
+    parser.add_argument("--max-interval", type=float, help="longest adaptive interval (default: interval * 6)")
+    args = parser.parse_args()
+    if args.subscribe and args.adaptive:
+        parser.error("--subscribe and --adaptive are alternatives")
+    if (args.subscribe or args.adaptive) and args.workers > 1:
+        parser.error("--subscribe and --adaptive run in one process; drop --workers")
+    try:
+        if args.subscribe:
+            asyncio.run(collect_subscribed(args))
+        elif args.adaptive:
+            asyncio.run(collect_adaptive(args))
+        elif args.workers > 1:
+            collect_sharded(args)
+        else:
+            asyncio.run(collect(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Agent inventory for the collector
+"""
+
+import json
+from collections import namedtuple
+
+from agentcore import SERVICES
+
+AgentTarget = namedtuple("AgentTarget", "name host port community")
+
+def default_inventory(host="127.0.0.1"):
+    """The five docker-compose agents on their published ports 16101-16105"""
+    return [AgentTarget(service, host, port, "public")
+            for service, (_, port) in SERVICES.items()]
+
+def load_inventory(path):
+    """Read a JSON list of {"name", "host", "port", "community"} objects"""
+    with open(path) as f:
+        entries = json.load(f)
+    return [AgentTarget(entry.get("name") or f"{entry['host']}:{entry['port']}",
+                        entry.get("host", "127.0.0.1"), int(entry.get("port", 161)),
+                        entry.get("community", "public"))
+            for entry in entries]
+
+def port_range_inventory(host, first_port, count, community="public"):
+    """count agents on consecutive ports, e.g. a simulated fleet"""
+    return [AgentTarget(f"{host}:{port}", host, port, community)
+            for port in range(first_port, first_port + count)]
+
+def community_inventory(host, port, count, read_community="public"):
+    """count fleet agents sharing one port, addressed as community public-N"""
+    return [AgentTarget(f"{host}:{port}/{index}", host, port, f"{read_community}-{index}")
+            for index in range(count)]
@@ -0,0 +1,385 @@
+"""
+Columnar on-disk store for collected samples
+
+Each agent has a directory holding one series per resolution: raw
+samples, 1-minute rollups and 1-hour rollups. A series is a sequence
+of fixed-capacity, memory-mapped segment files, each laid out in
+columns:
+
+    header   magic, version, column count, capacity, row count, base time (ms)
+    time     uint32 ms offsets from the segment's base time, one per row
+    present  one validity bitmap per column, a set bit per row holding a value
+    columns  one array per column: float32 gauges, uint32 counters and timeticks, int32 integers
+
+Times are frame-of-reference encoded rather than delta encoded: every
+offset is from the segment's base, so the time column stays sorted and
+can be bisected in place without summing deltas. Missing values are
+cleared bits in the bitmap, never a sentinel, so every counter and
+timeticks value, 2**32 - 1 included, can be stored.
+
+Values are written in place. The header's row count is updated last, so
+a reader never sees a half-written row. Range queries bisect the time
+column and return memoryview slices of the mapped files without copying
+them. Raw samples are rolled up into 1-minute and 1-hour min/max/avg
+rows as they arrive. Each resolution has its own retention, and whole
+segments are deleted once they age out.
+"""
+
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from bisect import bisect_left
+
+from agentcore.mib import MIB
+from agentcore.oids import OIDS
+
+from .poller import COLLECT_OIDS
+
+MAGIC = b"MSEG"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIIq")  # magic, version, columns, capacity, rows, base ms
+ROWS_OFFSET = 12
+SEGMENT_ROWS = 8192
+MAX_OFFSET_MS = 2 ** 32 - 1
+
+# Column type per pass type from the MIB; string OIDs (sysName, ...) are not stored,
+# enumerations (sysStatus, logLevel) are stored as their numbers
+TYPECODES = {"gauge": "f", "counter": "I", "timeticks": "I", "integer": "i"}
+# Written under a cleared validity bit; only the bitmap says a value is missing
+MISSING = {"f": float("nan"), "I": 0, "i": 0}
+
+# Bucket width in ms per resolution; raw keeps every sample
+RESOLUTIONS = {"raw": 0, "1m": 60_000, "1h": 3_600_000}
+# Seconds each resolution is kept
+RETENTION = {"raw": 2 * 86400, "1m": 30 * 86400, "1h": 365 * 86400}
+EXPIRE_EVERY = 60.0
+
+METRIC_NAMES = {oid: name for name, oid in OIDS.items()}
+
+def safe_name(agent):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", agent)
+
+def bitmap_size(capacity):
+    """Bytes in one column's validity bitmap, padded to keep the columns 4-byte aligned"""
+    return (capacity + 31) // 32 * 4
+
+class Present:
+    """Zero-copy view of rows [start, start + length) of a validity bitmap"""
+
+    __slots__ = ("bits", "start", "length")
+
+    def __init__(self, bits, start, length):
+        self.bits = bits
+        self.start = start
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        row = self.start + index
+        return bool(self.bits[row >> 3] >> (row & 7) & 1)
+
+    def __iter__(self):
+        return (self[index] for index in range(self.length))
+
+class Segment:
+    """One memory-mapped, fixed-capacity columnar segment file"""
+
+    def __init__(self, path, typecodes, capacity=SEGMENT_ROWS, base_ms=None, writable=False):
+        self.path = path
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, len(typecodes), capacity, 0, base_ms))
+                f.truncate(HEADER.size + (4 * capacity + bitmap_size(capacity)) * len(typecodes) + 4 * capacity)
+        self._file = open(path, "r+b" if writable else "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, width, self.capacity, self.rows, self.base_ms = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or width != len(typecodes):
+            raise ValueError(f"{path}: not a version {VERSION} segment with {len(typecodes)} columns")
+        self.typecodes = typecodes
+        self._view = memoryview(self._map)
+        size, bits = 4 * self.capacity, bitmap_size(self.capacity)
+        self.times = self._view[HEADER.size:HEADER.size + size].cast("I")
+        start = HEADER.size + size
+        self.bitmaps = [self._view[start + bits * i:start + bits * (i + 1)] for i in range(width)]
+        start += bits * width
+        self.columns = [self._view[start + size * i:start + size * (i + 1)].cast(typecode)
+                        for i, typecode in enumerate(typecodes)]
+
+    def last_ms(self):
+        return self.base_ms + self.times[self.rows - 1] if self.rows else None
+
+    def fits(self, ts_ms):
+        return self.rows < self.capacity and ts_ms - self.base_ms <= MAX_OFFSET_MS
+
+    def append(self, ts_ms, values):
+        row = self.rows
+        for column, bits, typecode, value in zip(self.columns, self.bitmaps, self.typecodes, values):
+            try:
+                if value is None:
+                    raise ValueError
+                column[row] = value if typecode == "f" else int(value)
+                bits[row >> 3] |= 1 << (row & 7)
+            except (TypeError, ValueError, OverflowError):
+                column[row] = MISSING[typecode]
+                bits[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+        self.times[row] = ts_ms - self.base_ms
+        self.rows = row + 1
+        struct.pack_into("<I", self._map, ROWS_OFFSET, self.rows)
+
+    def slice(self, start_ms, end_ms):
+        """Row range [first, last) with start_ms <= time < end_ms"""
+        times = self.times[:self.rows]
+        first = bisect_left(times, max(0, start_ms - self.base_ms))
+        last = bisect_left(times, end_ms - self.base_ms) if end_ms - self.base_ms <= MAX_OFFSET_MS else self.rows
+        times.release()
+        return first, last
+
+    def present(self, column, first, last):
+        return Present(self.bitmaps[column], first, last - first)
+
+    def row(self, index):
+        return [column[index] if bits[index >> 3] >> (index & 7) & 1 else None
+                for column, bits in zip(self.columns, self.bitmaps)]
+
+    def close(self):
+        for view in [self.times] + self.bitmaps + self.columns + [self._view]:
+            view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # a caller still holds query() slices; the map goes when they do
+        self._file.close()
+
+class Series:
+    """All segments of one resolution for one agent"""
+
+    def __init__(self, directory, name, typecodes, retention_s, segment_rows=SEGMENT_ROWS):
+        self.directory = directory
+        self.name = name
+        self.typecodes = typecodes
+        self.retention_ms = retention_s * 1000
+        self.segment_rows = segment_rows
+        pattern = re.compile(rf"{name}-(\d+)\.seg$")
+        bases = sorted(int(match.group(1)) for match in map(pattern.match, os.listdir(directory)) if match)
+        self.segments = [Segment(self._path(base), typecodes, writable=base == bases[-1]) for base in bases]
+
+    def _path(self, base_ms):
+        return os.path.join(self.directory, f"{self.name}-{base_ms}.seg")
+
+    def last_ms(self):
+        return self.segments[-1].last_ms() if self.segments else None
+
+    def append(self, ts_ms, values):
+        """Append one row; returns False for a row older than the last one"""
+        segment = self.segments[-1] if self.segments else None
+        if segment is not None and segment.rows and ts_ms < segment.last_ms():
+            return False
+        if segment is None or not segment.fits(ts_ms):
+            segment = Segment(self._path(ts_ms), self.typecodes, self.segment_rows, ts_ms, writable=True)
+            self.segments.append(segment)
+        segment.append(ts_ms, values)
+        return True
+
+    def range(self, start_ms, end_ms):
+        """(segment, first row, last row) for every segment overlapping [start_ms, end_ms)"""
+        for segment in self.segments:
+            if segment.base_ms >= end_ms or not segment.rows or segment.last_ms() < start_ms:
+                continue
+            first, last = segment.slice(start_ms, end_ms)
+            if first < last:
+                yield segment, first, last
+
+    def rows(self, start_ms):
+        """Every (time ms, values) from start_ms on, for replaying into a rollup"""
+        for segment, first, last in self.range(start_ms, 2 ** 63 - 1):
+            for index in range(first, last):
+                yield segment.base_ms + segment.times[index], segment.row(index)
+
+    def expire(self, now_ms):
+        """Delete whole segments older than the retention; the newest is always kept"""
+        while len(self.segments) > 1 and self.segments[0].last_ms() < now_ms - self.retention_ms:
+            segment = self.segments.pop(0)
+            segment.close()
+            os.remove(segment.path)
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+class Rollup:
+    """min/max/avg accumulator for the current bucket of one resolution"""
+
+    def __init__(self, bucket_ms, width):
+        self.bucket_ms = bucket_ms
+        self.width = width
+        self.start = None
+
+    def _reset(self, start):
+        self.start = start
+        self.samples = 0
+        self.mins = [math.inf] * self.width
+        self.maxs = [-math.inf] * self.width
+        self.sums = [0.0] * self.width
+        self.counts = [0] * self.width
+
+    def add(self, ts_ms, mins, maxs, avgs, samples):
+        """Fold in one row; returns the previous bucket's (start, values) when this row closes it"""
+        start = ts_ms - ts_ms % self.bucket_ms
+        done = self.row() if self.start is not None and start != self.start else None
+        if start != self.start:
+            self._reset(start)
+        self.samples += samples
+        for i, (low, high, avg) in enumerate(zip(mins, maxs, avgs)):
+            if avg is None:
+                continue
+            self.mins[i] = min(self.mins[i], low)
+            self.maxs[i] = max(self.maxs[i], high)
+            self.sums[i] += avg * samples
+            self.counts[i] += samples
+        return done
+
+    def row(self):
+        values = [self.samples]
+        for low, high, total, count in zip(self.mins, self.maxs, self.sums, self.counts):
+            values += [low, high, total / count] if count else [None, None, None]
+        return self.start, values
+
+def split_rollup(values):
+    """Rollup row values -> (samples, mins, maxs, avgs)"""
+    return values[0], values[1::3], values[2::3], values[3::3]
+
+class AgentStore:
+    """Raw, 1m and 1h series of one agent, with the rollup accumulators between them"""
+
+    def __init__(self, directory, typecodes, retention, segment_rows):
+        os.makedirs(directory, exist_ok=True)
+        rollup_typecodes = ["I"] + [code for typecode in typecodes for code in (typecode, typecode, "f")]
+        self.series = {resolution: Series(directory, resolution,
+                                          typecodes if resolution == "raw" else rollup_typecodes,
+                                          retention[resolution], segment_rows)
+                       for resolution in RESOLUTIONS}
+        self.minute = Rollup(RESOLUTIONS["1m"], len(typecodes))
+        self.hour = Rollup(RESOLUTIONS["1h"], len(typecodes))
+        self._replay()
+
+    def _replay(self):
+        """Rebuild the open buckets from rows written after the last completed rollup"""
+        last_hour = self.series["1h"].last_ms()
+        for ts_ms, values in self.series["1m"].rows(0 if last_hour is None else last_hour + RESOLUTIONS["1h"]):
+            self._add_minute(ts_ms, values)
+        last_minute = self.series["1m"].last_ms()
+        for ts_ms, values in self.series["raw"].rows(0 if last_minute is None else last_minute + RESOLUTIONS["1m"]):
+            self._add_raw(ts_ms, values, write=False)
+
+    def _add_raw(self, ts_ms, values, write=True):
+        if write and not self.series["raw"].append(ts_ms, values):
+            return False
+        done = self.minute.add(ts_ms, values, values, values, 1)
+        if done is not None:
+            self.series["1m"].append(*done)
+            self._add_minute(*done)
+        return True
+
+    def _add_minute(self, ts_ms, values):
+        samples, mins, maxs, avgs = split_rollup(values)
+        done = self.hour.add(ts_ms, mins, maxs, avgs, samples)
+        if done is not None:
+            self.series["1h"].append(*done)
+
+    def close(self):
+        for series in self.series.values():
+            series.close()
+
+class MetricStore:
+    """Per-agent columnar sample store under one root directory"""
+
+    def __init__(self, root, oids=COLLECT_OIDS, retention=RETENTION, segment_rows=SEGMENT_ROWS):
+        self.root = root
+        self.retention = dict(RETENTION, **retention)
+        self.segment_rows = segment_rows
+        self.oids = [oid for oid in oids if MIB.pass_type(oid) in TYPECODES]
+        self.metrics = [METRIC_NAMES.get(oid, oid) for oid in self.oids]
+        self.typecodes = [TYPECODES[MIB.pass_type(oid)] for oid in self.oids]
+        os.makedirs(root, exist_ok=True)
+        schema_path = os.path.join(root, "schema.json")
+        schema = {"version": VERSION, "columns": [[metric, oid, typecode] for metric, oid, typecode
+                                                  in zip(self.metrics, self.oids, self.typecodes)]}
+        if os.path.exists(schema_path):
+            with open(schema_path) as f:
+                if json.load(f) != schema:
+                    raise ValueError(f"{root} was written with different columns")
+        else:
+            with open(schema_path, "w") as f:
+                json.dump(schema, f, indent=2)
+        self.agents = {}
+        self.rejected = 0
+        self._expired_at = 0.0
+
+    def agent(self, name):
+        store = self.agents.get(name)
+        if store is None:
+            store = self.agents[name] = AgentStore(os.path.join(self.root, safe_name(name)),
+                                                   self.typecodes, self.retention, self.segment_rows)
+        return store
+
+    def append(self, agent, timestamp, values):
+        """Store one poll's {oid: value} taken at timestamp (epoch seconds)"""
+        row = []
+        for oid in self.oids:
+            value = values.get(oid)
+            row.append(value if isinstance(value, (int, float)) else None)
+        if not self.agent(agent)._add_raw(int(timestamp * 1000), row):
+            self.rejected += 1
+        if timestamp - self._expired_at >= EXPIRE_EVERY:
+            self.expire(timestamp)
+
+    def record(self, result):
+        """Store a collector PollResult; failed polls are skipped"""
+        if result.values and not result.error:
+            self.append(result.target.name, result.timestamp, result.values)
+
+    def query(self, agent, metric, start, end, resolution="raw", stat="avg"):
+        """
+        Zero-copy range read of one metric over [start, end) epoch seconds.
+
+        Returns a list of (base ms, time offsets, values, present) chunks, one
+        per segment: memoryviews of the time and value columns and a Present
+        view of the validity bitmap. Rollup resolutions read the stat column:
+        min, max or avg.
+        """
+        column = self.metrics.index(metric)
+        if resolution != "raw":
+            column = 1 + 3 * column + ("min", "max", "avg").index(stat)
+        if agent not in self.agents and not os.path.isdir(os.path.join(self.root, safe_name(agent))):
+            return []
+        store = self.agent(agent)
+        return [(segment.base_ms, segment.times[first:last], segment.columns[column][first:last],
+                 segment.present(column, first, last))
+                for segment, first, last in store.series[resolution].range(int(start * 1000), int(end * 1000))]
+
+    def points(self, agent, metric, start, end, resolution="raw", stat="avg"):
+        """query() copied out as [(epoch seconds, value)], with missing values dropped"""
+        return [((base + offset) / 1000, value)
+                for base, offsets, values, present in self.query(agent, metric, start, end, resolution, stat)
+                for offset, value, valid in zip(offsets, values, present) if valid]
+
+    def expire(self, now=None):
+        now = time.time() if now is None else now
+        self._expired_at = now
+        for store in self.agents.values():
+            for series in store.series.values():
+                series.expire(int(now * 1000))
+
+    def close(self):
+        for store in self.agents.values():
+            store.close()
+        self.agents = {}
@@ -0,0 +1,234 @@
+"""
+Adaptive polling: per-agent, per-OID intervals within a polls/s budget
+
+AsyncPoller polls every OID of every agent at one fixed interval. The
+AdaptiveScheduler starts every OID at that interval and adapts it after
+each poll:
+
+- an OID that moved further than its deadband (the subscriber's
+  DEFAULT_DEADBANDS) since the last poll has its interval halved, down
+  to min_interval; one that held still has it stretched by half, up to
+  max_interval. sysName ends up at max_interval, cpuUsage of a busy
+  agent near min_interval. Counters always grow, so for them it is
+  their rate per second that has to move, by more than
+  COUNTER_TOLERANCE of it and more than RATE_DEADBANDS.
+- the health OIDs (sysStatus, activeServices) are never left longer
+  than health_interval, so a stable agent going down is still noticed.
+- an agent reporting sysStatus down, or fewer activeServices than the
+  most it has reported (a load balancer that lost backends), is
+  degraded: all its OIDs are polled every min_interval until it
+  recovers.
+- an agent that does not answer is retried after min_interval, backing
+  off exponentially with consecutive failures up to max_interval, so
+  dead agents do not eat the budget.
+
+A poll is one GET of the OIDs due within the agent's shortest OID
+interval, so OIDs on similar intervals share a request.
+
+Every agent has one entry, (due time, sequence, state), in a single
+heap, popped by one dispatcher task. Scheduling a poll costs O(log
+agents) however many agents there are, with no sleeping task per
+agent. The dispatcher is rate-limited by a token bucket of budget
+polls/s. When the agents' combined demand is over the budget, healthy
+agents' intervals are stretched by demand / budget so they all fall
+behind evenly, while degraded agents keep min_interval.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+
+from agentcore.mib import MIB
+from agentcore.oids import OIDS
+
+from .poller import COLLECT_OIDS, AsyncPoller
+from .subscriber import DEFAULT_DEADBANDS
+
+DEFAULT_BUDGET = 1000.0  # polls/s across all agents
+STATUS_DOWN = MIB["sysStatus"].enum_number("down")
+HEALTH_OIDS = (OIDS["sysStatus"], OIDS["activeServices"])
+SPEEDUP = 0.5   # interval factor after a change beyond the deadband
+SLOWDOWN = 1.5  # interval factor after a poll without one
+COUNTER_TOLERANCE = 0.25  # relative change of a counter's rate that counts as a change
+# Counter rate deadbands, per second. requestsProcessed counts the polls themselves, so
+# polling faster raises its rate; this keeps it from driving its own interval down.
+RATE_DEADBANDS = {OIDS["requestsProcessed"]: 10.0, OIDS["totalErrors"]: 0.1}
+
+class AgentSchedule:
+    """One agent's OID intervals and due times, last values and health"""
+
+    __slots__ = ("target", "intervals", "due", "polled", "rates", "values", "failures", "degraded", "services", "rate")
+
+    def __init__(self, target, intervals, first_due):
+        self.target = target
+        self.intervals = intervals      # per OID, before budget stretch
+        self.due = [first_due] * len(intervals)
+        self.polled = [None] * len(intervals)  # when each OID was last read
+        self.rates = [None] * len(intervals)   # each counter's last rate per second
+        self.values = {}
+        self.failures = 0               # consecutive failed polls
+        self.degraded = False
+        self.services = 0               # most activeServices seen
+        self.rate = 0.0                 # polls/s this agent asks for, counted in AdaptiveScheduler.demand
+
+class AdaptiveScheduler(AsyncPoller):
+    """Polls each agent's OIDs as often as their changes and the agent's health call for"""
+
+    def __init__(self, targets, oids=COLLECT_OIDS, budget=DEFAULT_BUDGET, min_interval=None, max_interval=None,
+                 health_interval=None, deadbands=None, **options):
+        super().__init__(targets, oids=oids, **options)
+        self.budget = budget
+        self.min_interval = min_interval or self.interval / 4
+        self.max_interval = max_interval or self.interval * 6
+        self.health_interval = health_interval or self.interval * 2
+        deadbands = DEFAULT_DEADBANDS if deadbands is None else deadbands
+        health_ceiling = min(self.health_interval, self.max_interval)
+        # Per OID: (oid, is a counter, deadband of its value or of its rate, longest interval)
+        self._rules = []
+        for oid in self.oids:
+            counter = MIB.pass_type(oid) == "counter"
+            self._rules.append((oid, counter, RATE_DEADBANDS.get(oid, 0.0) if counter else deadbands.get(oid, 0),
+                                health_ceiling if oid in HEALTH_OIDS else self.max_interval))
+        self.burst = max(1.0, budget / 20)  # tokens: at most 50 ms worth of polls at once
+        self.demand = 0.0                   # polls/s all agents ask for, before stretching
+        self.degraded = 0
+        self.schedules = []
+        self._heap = []
+        self._sequence = itertools.count()
+        self._sleeping_until = float("inf")
+        self._wake = asyncio.Event()
+
+    @property
+    def stretch(self):
+        """Factor applied to healthy agents' intervals to keep demand within the budget"""
+        return max(1.0, self.demand / self.budget)
+
+    def push(self, state, rate):
+        """(Re)enter an agent in the heap at its earliest OID due time, now asking for rate polls/s"""
+        due = min(state.due)
+        self.demand += rate - state.rate
+        state.rate = rate
+        heapq.heappush(self._heap, (due, next(self._sequence), state))
+        if due < self._sleeping_until:
+            self._wake.set()
+
+    async def run(self, on_result, duration=None):
+        """Poll every target on its adaptive schedule, reporting results to on_result, until cancelled or duration passes"""
+        now = asyncio.get_running_loop().time()
+        self._heap, self.demand, self.degraded = [], 0.0, 0
+        self.schedules = [AgentSchedule(target, [self.interval] * len(self.oids),
+                                        now + random.uniform(0, self.interval)) for target in self.targets]
+        for state in self.schedules:
+            state.rate = 1.0 / self.interval
+            self.demand += state.rate
+            heapq.heappush(self._heap, (state.due[0], next(self._sequence), state))
+        polls = set()
+        dispatcher = asyncio.ensure_future(self.dispatch(on_result, polls))
+        try:
+            await asyncio.wait([dispatcher], timeout=duration)
+        finally:
+            dispatcher.cancel()
+            for task in polls:
+                task.cancel()
+            await asyncio.gather(dispatcher, *polls, return_exceptions=True)
+
+    async def dispatch(self, on_result, polls):
+        """Start each agent's poll when it falls due, at most budget polls/s"""
+        loop = asyncio.get_running_loop()
+        heap = self._heap
+        tokens, refilled = self.burst, loop.time()
+        while True:
+            now = loop.time()
+            if not heap or heap[0][0] > now:
+                self._sleeping_until = heap[0][0] if heap else float("inf")
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), None if not heap else self._sleeping_until - now)
+                except asyncio.TimeoutError:
+                    pass
+                self._sleeping_until = float("inf")
+                continue
+            tokens = min(self.burst, tokens + (now - refilled) * self.budget)
+            refilled = now
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / self.budget)
+                continue
+            tokens -= 1
+            state = heapq.heappop(heap)[2]
+            task = loop.create_task(self.poll_agent(state, on_result))
+            polls.add(task)
+            task.add_done_callback(polls.discard)
+
+    async def poll_agent(self, state, on_result):
+        """Poll the agent's due OIDs, adapt its intervals and put it back in the heap"""
+        loop = asyncio.get_running_loop()
+        horizon = loop.time() + min(state.intervals)
+        indexes = [index for index, due in enumerate(state.due) if due <= horizon]
+        result = await self.poll(state.target, [self._varbinds[index] for index in indexes])
+        self.push(state, self.adapt(state, indexes, result.values, result.error, loop.time()))
+        on_result(result)
+
+    def adapt(self, state, indexes, values, error, now):
+        """
+        New intervals and due times for the polled OIDs, from their changes
+        and the agent's health. Returns the polls/s the agent now asks for,
+        before stretching.
+        """
+        if error:
+            state.failures += 1
+            backoff = min(self.max_interval, self.min_interval * 2 ** (state.failures - 1))
+            # Everything is due on the next attempt, so a recovered agent is refreshed in full
+            state.due = [now + backoff] * len(state.due)
+            return 1.0 / backoff
+        state.failures = 0
+        previous, intervals, polled, rates = state.values, state.intervals, state.polled, state.rates
+        floor = self.min_interval
+        for index in indexes:
+            oid, counter, deadband, ceiling = self._rules[index]
+            value, last, then = values.get(oid), previous.get(oid), polled[index]
+            polled[index] = now
+            if value is None or last is None:
+                continue
+            if counter:
+                rate, last_rate = (value - last) % 2 ** 32 / max(now - then, 1e-3), rates[index]
+                rates[index] = rate
+                if last_rate is None:
+                    continue
+                changed = abs(rate - last_rate) > max(COUNTER_TOLERANCE * last_rate, deadband)
+            elif type(value) is int and type(last) is int:
+                changed = abs(value - last) > deadband
+            else:
+                changed = value != last
+            interval = intervals[index]
+            if changed:
+                intervals[index] = max(interval * SPEEDUP, floor)
+            elif interval < ceiling:
+                intervals[index] = min(interval * SLOWDOWN, ceiling)
+        previous.update(values)
+        degraded = self.is_degraded(state)
+        if degraded != state.degraded:
+            self.degraded += 1 if degraded else -1
+            state.degraded = degraded
+            if degraded:
+                # Bring every OID forward, not only the ones polled now
+                state.due = [min(due, now + floor) for due in state.due]
+        due, jitter = state.due, self.jitter
+        if degraded:
+            for index in indexes:
+                due[index] = now + floor * (1 + jitter * (2 * random.random() - 1))
+            return 1.0 / floor
+        stretch = self.stretch
+        for index in indexes:
+            due[index] = now + intervals[index] * stretch * (1 + jitter * (2 * random.random() - 1))
+        return 1.0 / min(intervals)
+
+    def is_degraded(self, state):
+        """sysStatus down, or fewer active services (load balancer backends) than the agent has had"""
+        if state.values.get(OIDS["sysStatus"]) == STATUS_DOWN:
+            return True
+        active = state.values.get(OIDS["activeServices"])
+        if not isinstance(active, int):
+            return False
+        state.services = max(state.services, active)
+        return active < state.services
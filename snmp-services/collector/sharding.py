@@ -0,0 +1,331 @@
+"""
+Process-pool collector: the inventory sharded across worker processes
+
+One collector process spends most of its CPU decoding BER responses and
+saturates one core long before the network does. ShardedCollector
+starts --workers processes, each running its own AsyncPoller on its own
+event loop over the agents it owns. The parent only merges results.
+
+Agents are assigned to workers by consistent hashing of the agent name
+on a HashRing. When a worker dies, its agents are rebalanced onto the
+survivors at once, and only its agents move. With respawn (the default),
+a replacement is started under the same name. Once it reports ready it
+rejoins the ring and takes the same agents back.
+
+Each worker owns a pipe to the parent. The parent sends it a list of
+inventory indexes whenever its share changes, and the worker sends back
+batches of results: every RESULT_BATCH results, or after RESULT_FLUSH
+seconds, whichever comes first. A result row is the target's index and
+its values in oid order, not the PollResult itself, to keep pickling
+cheap.
+
+A target leaving a live worker is not handed on until that worker has
+stopped polling it: the worker cancels it, flushes its batch and
+replies "released", and only then does the new owner get it. With
+cycles, the parent counts the results it has received per target and
+sends each share with every target's remaining cycles, so a target that
+moves picks up where it left off instead of starting over.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import time
+from bisect import bisect, insort
+from multiprocessing.connection import wait
+
+from .poller import COLLECT_OIDS, AsyncPoller, PollerStats, PollResult
+
+RESULT_BATCH = 256
+RESULT_FLUSH = 0.05
+RING_REPLICAS = 64
+
+def ring_hash(key):
+    """Stable 64-bit hash; hash() is salted per process"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+class HashRing:
+    """Consistent hash ring with RING_REPLICAS virtual points per node"""
+
+    def __init__(self, nodes=(), replicas=RING_REPLICAS):
+        self.replicas = replicas
+        self.points = []  # sorted (hash, node)
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        for replica in range(self.replicas):
+            insort(self.points, (ring_hash(f"{node}#{replica}"), node))
+
+    def remove(self, node):
+        self.points = [point for point in self.points if point[1] != node]
+
+    def nodes(self):
+        return {node for _, node in self.points}
+
+    def node_for(self, key):
+        if not self.points:
+            raise LookupError("hash ring is empty")
+        i = bisect(self.points, (ring_hash(key), "")) % len(self.points)
+        return self.points[i][1]
+
+    def assign(self, keys):
+        """{node: [indexes of keys it owns]}"""
+        shares = {node: [] for _, node in self.points}
+        for index, key in enumerate(keys):
+            shares[self.node_for(key)].append(index)
+        return shares
+
+def pack_result(index, result, oids):
+    return (index, result.timestamp, result.latency, tuple(result.values.get(oid) for oid in oids),
+            result.error)
+
+def unpack_result(row, targets, oids):
+    index, timestamp, latency, values, error = row
+    return PollResult(targets[index], timestamp, latency,
+                      {oid: value for oid, value in zip(oids, values) if value is not None}, error)
+
+async def serve_worker(conn, targets, options, cycles):
+    """Worker event loop: poll the assigned targets and stream result batches to the parent"""
+    loop = asyncio.get_running_loop()
+    poller = await AsyncPoller([], **options).start()
+    conn.send(("ready",))
+    oids = poller.oids
+    tasks = {}  # inventory index -> polling task
+    owned = set()  # the share last assigned, including targets whose cycles are done
+    batch = []
+    stopped = asyncio.Event()
+
+    def flush():
+        if batch:
+            conn.send(("results", batch[:], poller.stats.retries))
+            batch.clear()
+
+    def on_result(index, result):
+        batch.append(pack_result(index, result, oids))
+        if len(batch) >= RESULT_BATCH:
+            flush()
+
+    def on_done(index, task):
+        if tasks.get(index) is task:
+            del tasks[index]
+            if not task.cancelled() and not tasks:
+                flush()
+                conn.send(("done",))
+
+    def assign(indexes, remaining=None):
+        wanted = dict(zip(indexes, remaining or [cycles] * len(indexes)))
+        released = sorted(owned.difference(wanted))
+        for index in released:
+            task = tasks.pop(index, None)
+            if task is not None:
+                task.cancel()
+        owned.clear()
+        owned.update(wanted)
+        if released:
+            flush()
+            conn.send(("released", released))
+        for index in sorted(wanted.keys() - tasks.keys()):
+            if wanted[index] is not None and wanted[index] <= 0:
+                continue
+            task = loop.create_task(poller.run_target(
+                targets[index], lambda result, index=index: on_result(index, result), wanted[index]))
+            tasks[index] = task
+            task.add_done_callback(lambda task, index=index: on_done(index, task))
+        if not tasks:
+            conn.send(("done",))
+
+    def on_message():
+        try:
+            message = conn.recv()
+        except EOFError:
+            message = ("stop",)
+        if message[0] == "assign":
+            assign(*message[1:])
+        else:
+            stopped.set()
+
+    loop.add_reader(conn.fileno(), on_message)
+    try:
+        while not stopped.is_set():
+            try:
+                await asyncio.wait_for(stopped.wait(), RESULT_FLUSH)
+            except asyncio.TimeoutError:
+                flush()
+        flush()
+    finally:
+        loop.remove_reader(conn.fileno())
+        for task in tasks.values():
+            task.cancel()
+        poller.close()
+
+def run_worker(conn, targets, options, cycles):
+    """Worker process body"""
+    try:
+        asyncio.run(serve_worker(conn, targets, options, cycles))
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+class Worker:
+    """Parent-side handle of one worker process"""
+
+    def __init__(self, name, targets, options, cycles):
+        self.name = name
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=run_worker, name=f"collector-{name}",
+                                               args=(child, targets, options, cycles), daemon=True)
+        self.process.start()
+        child.close()
+        self.share = None  # inventory indexes, once assigned
+        self.retries = 0
+        self.done = False
+
+    def assign(self, share, remaining=None):
+        """Send a new share; remaining holds each target's cycles left, None to poll until stopped"""
+        self.share = share
+        self.done = False
+        self.conn.send(("assign", share, remaining))
+
+class ShardedCollector:
+    """Polls targets from a pool of worker processes, merging results in the parent"""
+
+    def __init__(self, targets, workers=2, oids=COLLECT_OIDS, respawn=True, cycles=None, **poller_options):
+        self.targets = list(targets)
+        self.oids = list(oids)
+        self.options = dict(poller_options, oids=self.oids)
+        self.cycles = cycles
+        self.respawn = respawn
+        self.names = [f"worker-{n}" for n in range(workers)]
+        self.ring = HashRing(self.names)
+        self.workers = {}
+        self.stats = PollerStats()
+        self.completed = [0] * len(self.targets)  # results received per target, for cycles
+        self.releasing = {}  # target index -> the live worker it is leaving
+        self.deaths = 0
+        self.rebalances = 0
+        self._lost_retries = 0  # retries reported by workers that have since died
+
+    def start(self):
+        for name in self.names:
+            self.workers[name] = Worker(name, self.targets, self.options, self.cycles)
+        self.rebalance()
+        return self
+
+    def rebalance(self):
+        """Send every worker whose share changed its new list of target indexes"""
+        if not self.ring.points:
+            return  # only replacements left, none ready yet
+        shares = self.ring.assign([target.name for target in self.targets])
+        # Targets leaving a live worker wait for its "released" before going to their new owner
+        for name, worker in self.workers.items():
+            kept = set(shares.get(name, []))
+            for index in worker.share or ():
+                if index not in kept:
+                    self.releasing[index] = worker
+        for name, worker in self.workers.items():
+            share = [index for index in shares.get(name, []) if index not in self.releasing]
+            if share != worker.share:
+                worker.assign(share, self.remaining(share))
+        self.rebalances += 1
+
+    def remaining(self, share):
+        """Cycles left for each target in share, or None when polling until stopped"""
+        if self.cycles is None:
+            return None
+        return [max(0, self.cycles - self.completed[index]) for index in share]
+
+    def run(self, on_result, duration=None):
+        """Merge results until every target has run its cycles, duration passes or all workers are gone"""
+        deadline = None if duration is None else time.monotonic() + duration
+        while self.workers:
+            if (self.cycles is not None and not self.releasing
+                    and all(worker.done for worker in self.workers.values())):
+                break
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            by_handle = {}
+            for worker in self.workers.values():
+                by_handle[worker.conn] = by_handle[worker.process.sentinel] = worker
+            ready = wait(list(by_handle), timeout)
+            # A dying worker's pipe and sentinel are often ready together: handle it once
+            for worker in dict.fromkeys(by_handle[handle] for handle in ready):
+                if self.workers.get(worker.name) is not worker:
+                    continue
+                if worker.conn in ready and self._receive(worker, on_result):
+                    continue
+                self._drain(worker, on_result)
+                self._lose(worker)
+
+    def _receive(self, worker, on_result):
+        """Handle one message; False once the worker's pipe is closed"""
+        try:
+            message = worker.conn.recv()
+        except (EOFError, OSError):
+            return False
+        if message[0] == "results":
+            _, rows, worker.retries = message
+            stats = self.stats
+            for row in rows:
+                result = unpack_result(row, self.targets, self.oids)
+                self.completed[row[0]] += 1
+                stats.polls += 1
+                if result.error:
+                    stats.failures += 1
+                on_result(result)
+            stats.retries = self._lost_retries + sum(w.retries for w in self.workers.values())
+        elif message[0] == "released":
+            for index in message[1]:
+                if self.releasing.get(index) is worker:
+                    del self.releasing[index]
+            self.rebalance()
+        elif message[0] == "done":
+            worker.done = True
+        elif message[0] == "ready" and worker.name not in self.ring.nodes():
+            # A replacement is up: it rejoins the ring and takes its agents back
+            self.ring.add(worker.name)
+            self.rebalance()
+        return True
+
+    def _drain(self, worker, on_result):
+        """Deliver whatever a dead worker sent before it went"""
+        try:
+            while worker.conn.poll() and self._receive(worker, on_result):
+                pass
+        except (EOFError, OSError):
+            pass
+
+    def _lose(self, worker):
+        """A worker died: replace it under the same name, or move its targets to the survivors"""
+        if self.workers.get(worker.name) is not worker:
+            return  # already lost; its name may belong to a replacement by now
+        worker.process.join()
+        worker.conn.close()
+        del self.workers[worker.name]
+        self._lost_retries += worker.retries
+        self.deaths += 1
+        self.releasing = {index: owner for index, owner in self.releasing.items() if owner is not worker}
+        self.ring.remove(worker.name)
+        if self.workers:
+            self.rebalance()
+        if self.respawn:
+            # Same name, same ring points: once ready, it owns exactly the dead worker's targets again
+            self.workers[worker.name] = Worker(worker.name, self.targets, self.options, self.cycles)
+
+    def worker_pids(self):
+        return {name: worker.process.pid for name, worker in self.workers.items()}
+
+    def close(self):
+        self.respawn = False
+        for worker in self.workers.values():
+            try:
+                worker.conn.send(("stop",))
+            except OSError:
+                pass
+        for worker in self.workers.values():
+            worker.process.join(2.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+            worker.conn.close()
+        self.workers.clear()
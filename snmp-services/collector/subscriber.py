@@ -0,0 +1,152 @@
+"""
+Changes-only collection: subscriptions instead of polls
+
+A Subscriber subscribes to the collected OIDs on every agent once (see
+agentcore.subscription) and then only receives the values that changed,
+or that moved further than their deadband. It keeps each agent's latest
+values and reports the whole set, as a PollResult, whenever some of
+them change. Agents whose values stay put cost neither bytes nor
+decoding.
+
+Each subscription is renewed every half lease. The renewal is answered
+with every value, so it doubles as a periodic full refresh and as the
+liveness check: an agent that does not answer it is reported as a
+failed poll and subscribed to again every interval. A gap in an agent's
+update sequence numbers triggers a renewal at once.
+
+An agent only subscribes a collector that echoes the cookie it issued
+to the collector's address. The first request to each agent, and the
+first renewal after the cookie has gone stale, is answered with a fresh
+cookie instead, and is sent again at once with it.
+"""
+
+import asyncio
+import random
+import time
+
+from agentcore import ber
+from agentcore.oids import OIDS
+from agentcore.subscription import COOKIE_OID
+
+from .poller import COLLECT_OIDS, AsyncPoller, PollResult, decode_values
+
+# Deadbands in each OID's own units (%, MB, ms, KB/s, TimeTicks): smaller moves are not sent.
+# uptime would otherwise change on every check; it is refreshed once a minute and at each renewal.
+# OIDs not listed are sent on any change.
+DEFAULT_DEADBANDS = {OIDS[name]: deadband for name, deadband in (
+    ("cpuUsage", 2), ("memoryUsage", 32), ("avgLatency", 2), ("networkInBytes", 16), ("networkOutBytes", 16),
+    ("uptime", 6000),
+)}
+DEFAULT_LEASE = 30.0
+
+class SubscriptionState:
+    """The collector's side of one agent's subscription"""
+
+    __slots__ = ("target", "request_id", "cookie", "values", "sequence", "resync")
+
+    def __init__(self, target):
+        self.target = target
+        self.request_id = None
+        self.cookie = None  # last cookie the agent issued, echoed in every subscribe
+        self.values = {}
+        self.sequence = 0
+        self.resync = asyncio.Event()
+
+class Subscriber(AsyncPoller):
+    """Keeps every target subscribed and reports their values as they change"""
+
+    def __init__(self, targets, oids=COLLECT_OIDS, deadbands=None, lease=DEFAULT_LEASE, **options):
+        super().__init__(targets, oids=oids, **options)
+        self.deadbands = dict(DEFAULT_DEADBANDS if deadbands is None else deadbands)
+        self.lease = lease
+        self.updates = 0
+        self.gaps = 0
+        self.states = {}  # request-id of the live subscription -> SubscriptionState
+        self._subscribe_varbinds = [(oid, ber.INTEGER, self.deadbands[oid]) if self.deadbands.get(oid)
+                                    else (oid, ber.NULL, None) for oid in self.oids]
+        self._on_result = None
+
+    async def start(self):
+        await super().start()
+        self._protocol.on_update = self.on_update
+        return self
+
+    async def subscribe(self, state):
+        """Subscribe to (or renew) one agent; returns the PollResult of all its values"""
+        start = time.monotonic()
+        try:
+            for attempt in range(2):
+                request_id = self.next_request_id()
+                varbinds = self._subscribe_varbinds
+                if state.cookie is not None:
+                    varbinds = [(COOKIE_OID, ber.INTEGER, state.cookie)] + varbinds
+                response = await self.request(state.target, ber.SUBSCRIBE_REQUEST, varbinds,
+                                              int(self.interval * 1000), int(self.lease), request_id)
+                if not (response.error_status == ber.AUTHORIZATION_ERROR and response.varbinds
+                        and response.varbinds[0][0] == COOKIE_OID):
+                    break
+                # Challenged: no cookie yet, or a stale one. Send again with the one issued.
+                state.cookie = response.varbinds[0][2]
+            values, error = decode_values(response.varbinds), None
+            if response.error_status:
+                error = f"error-status {response.error_status}"
+        except asyncio.TimeoutError as e:
+            values, error = {}, str(e)
+        self.states.pop(state.request_id, None)
+        if error is None:
+            state.request_id, state.values, state.sequence = request_id, values, 0
+            self.states[request_id] = state
+        self.stats.polls += 1
+        if error:
+            self.stats.failures += 1
+        return PollResult(state.target, time.time(), time.monotonic() - start, values, error)
+
+    def on_update(self, message):
+        state = self.states.get(message.request_id)
+        if state is None:
+            return  # from a subscription since replaced
+        if message.error_status != state.sequence + 1:
+            self.gaps += 1
+            state.resync.set()
+        state.sequence = message.error_status
+        if message.varbinds:
+            state.values.update(decode_values(message.varbinds))
+            self.updates += 1
+            self._on_result(PollResult(state.target, time.time(), 0.0, dict(state.values), None))
+
+    async def run(self, on_result, duration=None):
+        """Keep every target subscribed, reporting results to on_result, until cancelled or duration passes"""
+        self._on_result = on_result
+        tasks = [asyncio.ensure_future(self.keep_subscribed(target)) for target in self.targets]
+        try:
+            await asyncio.wait(tasks, timeout=duration)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def keep_subscribed(self, target):
+        """Renew one agent's subscription every half lease, at once after a gap, every interval after a failure"""
+        state = SubscriptionState(target)
+        # Spread the first subscriptions so agents are not all read in lockstep
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            state.resync.clear()
+            result = await self.subscribe(state)
+            self._on_result(result)
+            try:
+                await asyncio.wait_for(state.resync.wait(), self.interval if result.error else self.lease / 2)
+            except asyncio.TimeoutError:
+                pass
+
+    def close(self):
+        """Cancel the live subscriptions (best effort, agents drop them at lease end anyway) and close"""
+        if self._transport is not None and not self._transport.is_closing():
+            for state in self.states.values():
+                target = state.target
+                self._transport.sendto(ber.encode_message(target.community.encode(), ber.SUBSCRIBE_REQUEST,
+                                                          self.next_request_id(),
+                                                          [(COOKIE_OID, ber.INTEGER, state.cookie)]),
+                                       (target.host, target.port))
+        self.states.clear()
+        super().close()
@@ -0,0 +1,28 @@
+"""
+Shared fixtures for the snmp-services tests
+
+Run from snmp-services/: python3 -m pytest tests
+"""
+
+import os
+import sys
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICES_DIR)
+
+# Keep agents built by the tests from sending traps or writing snapshots
+for name in ("TRAP_RECEIVER", "AGENT_SNAPSHOT_DIR", "AGENT_PROFILE"):
+    os.environ.pop(name, None)
+
+import pytest
+
+from agentcore import SERVICES, load_profile
+
+@pytest.fixture(params=sorted(SERVICES))
+def agent(request):
+    """A fresh agent of each of the five service profiles"""
+    return load_profile(request.param)()
+
+@pytest.fixture
+def db_agent():
+    return load_profile("db-service")()
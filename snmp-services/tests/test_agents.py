@@ -0,0 +1,91 @@
+"""
+GET, GETNEXT, walks and SETs through every service profile
+"""
+
+from agentcore import ENTERPRISE_OID, OIDS, oid_key
+from agentcore.mib import MIB
+from agentcore.profiling import get_profiler
+from collector.poller import COLLECT_OIDS
+
+def pass_get(agent, oid):
+    """(type, value) lines of a pass get, or None for NONE"""
+    response = agent.process_pass("get", "." + oid)
+    if response == ["NONE"]:
+        return None
+    returned_oid, pass_type, value = response[0].split("\n")
+    assert returned_oid == "." + oid
+    return pass_type, value
+
+def test_get_answers_every_collected_oid(agent):
+    for oid in COLLECT_OIDS:
+        pass_type, value = pass_get(agent, oid)
+        assert pass_type == MIB.pass_type(oid)
+        if pass_type != "string":
+            int(value)
+    assert pass_get(agent, OIDS["sysName"]) == ("string", agent.service_name)
+
+def test_get_unknown_oid_is_none(agent):
+    assert pass_get(agent, ENTERPRISE_OID + ".99.1.0") is None
+    assert agent.process_pass("get", "." + ENTERPRISE_OID) == ["NONE"]
+
+def test_getnext_from_subtree_root_is_first_scalar(agent):
+    response = agent.process_pass("getnext", "." + ENTERPRISE_OID)
+    assert response[0].split("\n")[0] == "." + OIDS["sysName"]
+
+def test_walk_visits_every_oid_in_numeric_order(agent):
+    walked = []
+    oid = ENTERPRISE_OID
+    while True:
+        response = agent.process_pass("getnext", "." + oid)
+        if response == ["NONE"]:
+            break
+        oid = response[0].split("\n")[0].lstrip(".")
+        walked.append(oid)
+    assert walked == sorted(walked, key=oid_key)
+    assert walked == agent.oid_index.oids
+    assert set(COLLECT_OIDS) <= set(walked)
+
+def test_getbulk_returns_walk_order_then_end(agent):
+    response = agent.process_pass("getbulk", "." + ENTERPRISE_OID, "5")
+    assert response[-1] == "END"
+    assert [line.split("\n")[0].lstrip(".") for line in response[:-1]] == agent.oid_index.oids[:5]
+
+def test_set_writable_oid(agent):
+    oid = "." + OIDS["logLevel"]
+    assert agent.process_pass("set", oid, "string debug") == ["DONE"]
+    assert agent.log_level == "DEBUG"
+    assert pass_get(agent, OIDS["logLevel"]) == ("integer", "2")
+    # Enumerations are also accepted by number
+    assert agent.process_pass("set", oid, "integer 3") == ["DONE"]
+    assert agent.log_level == "ERROR"
+
+def test_set_writable_oid_rejects_bad_values(agent):
+    oid = "." + OIDS["logLevel"]
+    assert agent.process_pass("set", oid, "string loud") == ["wrong-value"]
+    assert agent.process_pass("set", oid, "integer nine") == ["wrong-type"]
+    assert agent.log_level == "INFO"
+
+def test_set_read_only_oid(agent):
+    assert agent.process_pass("set", "." + OIDS["sysName"], "string renamed") == ["not-writable"]
+    assert agent.process_pass("set", "." + OIDS["cpuUsage"], "integer 5") == ["not-writable"]
+    assert pass_get(agent, OIDS["sysName"]) == ("string", agent.service_name)
+
+def test_one_line_requests(agent):
+    assert agent.process_request("GET", OIDS["sysName"]) == f'{OIDS["sysName"]} = STRING: "{agent.service_name}"'
+    assert agent.process_request("SET", OIDS["logLevel"], "error") == f'{OIDS["logLevel"]} = INTEGER: 3'
+    assert agent.process_request("SET", OIDS["sysName"], "x") == "Error: OID is read-only or invalid value"
+
+def test_set_many_checks_every_pair_before_applying(db_agent, monkeypatch):
+    applied = []
+    monkeypatch.setitem(type(db_agent).set_handlers, OIDS["logLevel"],
+                        lambda agent, level: applied.append(level) or True)
+    assert db_agent.set_many([(OIDS["logLevel"], "debug"), (OIDS["sysName"], "renamed")]) == 2
+    assert db_agent.set_many([(OIDS["logLevel"], "debug"), (OIDS["logLevel"], "loud")]) == 2
+    assert applied == []
+    assert db_agent.set_many([(OIDS["logLevel"], "debug"), (OIDS["logLevel"], "3")]) == 0
+    assert applied == ["debug", "error"]
+
+def test_set_many_does_not_start_the_profiler_for_a_rejected_batch(db_agent):
+    assert db_agent.set_many([(OIDS["selfProfile"], "sampling"), (OIDS["logLevel"], "loud")]) == 2
+    assert get_profiler().mode == "off"
+    assert db_agent.set_many([(OIDS["selfProfile"], "bogus")]) == 1
@@ -0,0 +1,92 @@
+"""
+BER codec round trips and the UDP responder's PDU handling
+"""
+
+import pytest
+
+from agentcore import ENTERPRISE_OID, OIDS, ber
+from agentcore.udpagent import MAX_BULK_VARBINDS, respond
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 255, 256, -1, -128, -129, 2 ** 31 - 1, -2 ** 31])
+def test_integer_round_trip(value):
+    encoded = ber.encode_integer(value)
+    tag, start, end = ber.decode_header(encoded, 0)
+    assert tag == ber.INTEGER and end == len(encoded)
+    assert ber.decode_value(tag, encoded[start:end]) == value
+
+def test_unsigned_types_never_read_as_negative():
+    for tag in ber.UNSIGNED_TAGS:
+        encoded = ber.encode_value(tag, 2 ** 32 - 1)
+        _, start, end = ber.decode_header(encoded, 0)
+        assert ber.decode_value(tag, encoded[start:end]) == 2 ** 32 - 1
+
+@pytest.mark.parametrize("oid", ["1.3.6.1.2.1.1.1.0", "1.3.6.1.4.1.9999.1.1.0", "1.3.6.1.4.1.311.200000.1", "2.999.3"])
+def test_oid_round_trip(oid):
+    encoded = ber.encode_oid(oid)
+    _, start, end = ber.decode_header(encoded, 0)
+    assert ber.decode_oid(encoded[start:end]) == oid
+
+def test_long_lengths():
+    payload = b"x" * 300
+    encoded = ber.encode_tlv(ber.OCTET_STRING, payload)
+    assert encoded[1] == 0x82
+    tag, start, end = ber.decode_header(encoded, 0)
+    assert (tag, encoded[start:end]) == (ber.OCTET_STRING, payload)
+
+def test_message_round_trip():
+    varbinds = [(OIDS["sysName"], ber.OCTET_STRING, b"Web Server"), (OIDS["cpuUsage"], ber.GAUGE32, 42),
+                (OIDS["uptime"], ber.TIMETICKS, 123456), (ENTERPRISE_OID + ".9.0", ber.NO_SUCH_OBJECT, None),
+                (OIDS["sysName"], ber.NULL, None), ("1.3.6.1.2.1.4.20.1.1", ber.IP_ADDRESS, "10.0.0.1")]
+    data = ber.encode_message(b"public", ber.GET_RESPONSE, 1234, varbinds, 0, 0)
+    assert ber.decode_message(data) == ber.Message(ber.SNMP_VERSION_2C, b"public", ber.GET_RESPONSE, 1234, 0, 0,
+                                                   varbinds)
+
+def test_encode_response_matches_encode_message():
+    varbinds = [(OIDS["sysName"], ber.OCTET_STRING, b"x" * 200), (OIDS["cpuUsage"], ber.GAUGE32, 7)]
+    encoded = [ber.encode_varbind(*varbind) for varbind in varbinds]
+    assert (ber.encode_response(b"public", 9, encoded, 5, 2)
+            == ber.encode_message(b"public", ber.GET_RESPONSE, 9, varbinds, 5, 2))
+
+def test_truncated_messages_raise():
+    data = ber.encode_message(b"public", ber.GET_REQUEST, 1, [(OIDS["sysName"], ber.NULL, None)])
+    for cut in (1, 5, len(data) - 1):
+        with pytest.raises((ValueError, IndexError)):
+            ber.decode_message(data[:cut])
+
+def request(pdu_type, varbinds, error_status=0, error_index=0, community=b"public"):
+    return ber.decode_message(ber.encode_message(community, pdu_type, 77, varbinds, error_status, error_index))
+
+def answer(agent, pdu_type, oids, error_status=0, error_index=0, writable=False):
+    varbinds = [(oid, ber.NULL, None) for oid in oids] if pdu_type != ber.SET_REQUEST else oids
+    response = ber.decode_message(respond(agent, request(pdu_type, varbinds, error_status, error_index), writable))
+    assert response.pdu_type == ber.GET_RESPONSE and response.request_id == 77
+    return response
+
+def test_get_and_getnext(db_agent):
+    response = answer(db_agent, ber.GET_REQUEST, [OIDS["sysName"], ENTERPRISE_OID + ".9.0"])
+    assert response.varbinds == [(OIDS["sysName"], ber.OCTET_STRING, b"Database Service"),
+                                 (ENTERPRISE_OID + ".9.0", ber.NO_SUCH_OBJECT, None)]
+    response = answer(db_agent, ber.GET_NEXT_REQUEST, [ENTERPRISE_OID, db_agent.oid_index.oids[-1]])
+    assert response.varbinds[0][0] == db_agent.oid_index.oids[0]
+    assert response.varbinds[1][1] == ber.END_OF_MIB_VIEW
+
+def test_getbulk_is_capped(db_agent):
+    response = answer(db_agent, ber.GET_BULK_REQUEST, [OIDS["sysName"], ENTERPRISE_OID], 1, 1000)
+    assert len(response.varbinds) == MAX_BULK_VARBINDS
+    assert response.varbinds[0][0] == OIDS["sysStatus"]
+    assert [oid for oid, _, _ in response.varbinds[1:4]] == db_agent.oid_index.oids[:3]
+
+def test_set_needs_the_write_community_and_is_all_or_nothing(db_agent):
+    level = [(OIDS["logLevel"], ber.INTEGER, 2)]
+    assert answer(db_agent, ber.SET_REQUEST, level).error_status == ber.NO_ACCESS
+    assert db_agent.log_level == "INFO"
+    response = answer(db_agent, ber.SET_REQUEST, level + [(OIDS["sysName"], ber.OCTET_STRING, b"x")], writable=True)
+    assert (response.error_status, response.error_index) == (ber.NOT_WRITABLE, 2)
+    assert db_agent.log_level == "INFO"
+    response = answer(db_agent, ber.SET_REQUEST, level + [(OIDS["logLevel"], ber.GAUGE32, 3)], writable=True)
+    assert (response.error_status, response.error_index) == (ber.WRONG_TYPE, 2)
+    assert answer(db_agent, ber.SET_REQUEST, level, writable=True).error_status == ber.NO_ERROR
+    assert db_agent.log_level == "DEBUG"
+
+def test_unknown_pdu_is_dropped(db_agent):
+    assert respond(db_agent, request(ber.SNMPV2_TRAP, [])) is None
@@ -0,0 +1,103 @@
+"""
+Metric cache: TTLs, constants, LRU eviction, stale-while-revalidate and invalidation
+"""
+
+import threading
+import time
+
+import pytest
+
+from agentcore import OIDS
+from agentcore import cache as cache_module
+from agentcore.cache import FOREVER, MetricCache
+
+class Clock:
+    """Stands in for the time module; tests move now by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+class Counter:
+    """A compute function returning 1, 2, 3 … on successive calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+def test_values_expire_after_their_ttl(clock):
+    cache, compute = MetricCache({"a": 500}), Counter()
+    assert [cache.get("a", compute) for _ in range(3)] == [1, 1, 1]
+    clock.now += 0.499
+    assert cache.get("a", compute) == 1
+    clock.now += 0.001
+    assert cache.get("a", compute) == 2
+    assert (cache.hits, cache.misses) == (3, 2)
+
+def test_forever_entries_never_expire_and_zero_bypasses(clock):
+    cache, constant, uncached = MetricCache({"c": FOREVER}), Counter(), Counter()
+    cache.get("c", constant)
+    clock.now += 10 ** 6
+    assert cache.get("c", constant) == 1
+    # Unlisted OIDs take default_ttl_ms, 0 here: computed every time and never stored
+    assert [cache.get("x", uncached) for _ in range(3)] == [1, 2, 3]
+    assert "x" not in cache.entries and cache.misses == 1
+
+def test_least_recently_used_entries_are_evicted(clock):
+    cache = MetricCache({oid: FOREVER for oid in "abc"}, max_entries=2)
+    computes = {oid: Counter() for oid in "abc"}
+    cache.get("a", computes["a"])
+    cache.get("b", computes["b"])
+    cache.get("a", computes["a"])  # a is now the most recently used
+    cache.get("c", computes["c"])
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.evictions == 1
+    assert cache.get("b", computes["b"]) == 2
+    assert list(cache.entries) == ["c", "b"] and cache.evictions == 2
+
+def test_stale_values_are_served_while_refreshing(clock):
+    cache = MetricCache({"a": 100}, stale_ms=1000)
+    release, refreshed = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(clock.now)
+        if len(calls) > 1:
+            release.wait(5)
+            refreshed.set()
+        return len(calls)
+
+    cache.get("a", compute)
+    clock.now += 0.5  # expired, but inside the stale window
+    assert cache.get("a", compute) == 1
+    assert cache.get("a", compute) == 1  # one refresh at a time
+    assert cache.stale_served == 2 and cache.misses == 1
+    release.set()
+    assert refreshed.wait(5)
+    for _ in range(100):
+        if not cache._refreshing:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 2
+    assert cache.get("a", compute) == 2 and cache.hits == 1
+    # Past the stale window the value is recomputed in line
+    clock.now += 2.0
+    assert cache.get("a", compute) == 3 and cache.misses == 2
+
+def test_set_invalidates_the_cached_value(db_agent):
+    db_agent.metric_cache = MetricCache({OIDS["logLevel"]: FOREVER})
+    assert db_agent.get_oid_value(OIDS["logLevel"]) == "INFO"
+    assert db_agent.set_oid_value(OIDS["logLevel"], "debug")
+    assert db_agent.get_oid_value(OIDS["logLevel"]) == "DEBUG"
+    assert db_agent.metric_cache.misses == 2
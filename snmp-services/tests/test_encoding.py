@@ -0,0 +1,52 @@
+"""
+Typed per-OID encoders against the generic BER encoder
+"""
+
+import pytest
+
+from agentcore import OIDS, ber
+from agentcore.encoding import UINT32_MAX, ValueEncoder, encoder_for
+from agentcore.mib import MIB
+
+@pytest.mark.parametrize("name,value,typed", [
+    ("cpuUsage", 42.6, 43),
+    ("cpuUsage", -5, 0),
+    ("cpuUsage", 2 ** 40, UINT32_MAX),
+    ("requestsProcessed", 2 ** 32 + 5, 5),
+    ("uptime", 123456, 123456),
+    ("sysStatus", "UP", MIB["sysStatus"].enum_number("up")),
+    ("logLevel", "debug", 2),
+    ("sysName", "Web Server", "Web Server"),
+])
+def test_typed_values(name, value, typed):
+    assert encoder_for(OIDS[name]).typed(value) == typed
+
+def test_varbind_matches_the_generic_encoder():
+    for name, value in (("cpuUsage", 17), ("requestsProcessed", 2 ** 31 + 3), ("uptime", 0), ("logLevel", 3),
+                        ("sysName", "x" * 300), ("sysName", "")):
+        encoder = encoder_for(OIDS[name])
+        typed = encoder.typed(value)
+        assert encoder.varbind(value) == ber.encode_varbind(OIDS[name], encoder.tag, typed)
+        (_, tag, decoded), = ber.decode_message(ber.encode_response(b"public", 1, [encoder.varbind(value)])).varbinds
+        assert (tag, decoded) == (encoder.tag, typed.encode() if isinstance(typed, str) else typed)
+
+def test_pass_and_text_forms():
+    cpu, name = encoder_for(OIDS["cpuUsage"]), encoder_for(OIDS["sysName"])
+    assert cpu.pass_lines(12.4) == f".{OIDS['cpuUsage']}\ngauge\n12"
+    assert cpu.text(12.4) == f"{OIDS['cpuUsage']} = Gauge32: 12"
+    assert name.text("Web Server") == f'{OIDS["sysName"]} = STRING: "Web Server"'
+
+def test_oids_outside_the_mib_are_strings():
+    encoder = ValueEncoder("1.3.6.1.4.1.9999.42.0")
+    assert (encoder.pass_type, encoder.tag) == ("string", ber.OCTET_STRING)
+    assert encoder.typed(5) == "5"
+
+def test_encoders_are_shared():
+    assert encoder_for(OIDS["cpuUsage"]) is encoder_for(OIDS["cpuUsage"])
+
+def test_agent_reuses_constant_encodings(db_agent):
+    first = db_agent.encode_value(OIDS["sysName"], ValueEncoder.varbind)
+    assert first == encoder_for(OIDS["sysName"]).varbind("Database Service")
+    assert db_agent.encode_value(OIDS["sysName"], ValueEncoder.varbind) is first
+    # Changing values are encoded afresh
+    assert db_agent.encode_value(OIDS["uptime"], ValueEncoder.pass_lines).startswith(f".{OIDS['uptime']}\ntimeticks\n")
@@ -0,0 +1,67 @@
+"""
+Fleet mode: shard ranges, per-profile classes and community routing on one socket
+"""
+
+import asyncio
+import importlib
+import sys
+
+import pytest
+
+from agentcore import OIDS, SERVICES, ber
+from agentcore.fleet import CommunityResponder, agent_communities, build_fleet, fleet_classes, shard_ranges
+from collector import AgentTarget, AsyncPoller
+
+@pytest.mark.parametrize("count,shards,ranges", [
+    (10, 3, [(0, 4), (4, 3), (7, 3)]),
+    (9, 3, [(0, 3), (3, 3), (6, 3)]),
+    (2, 4, [(0, 1), (1, 1)]),
+    (0, 2, []),
+])
+def test_shard_ranges(count, shards, ranges):
+    assert shard_ranges(count, shards) == ranges
+
+def test_agents_cycle_through_the_profiles_without_history():
+    classes = fleet_classes()
+    agents = build_fleet(7, start=3)
+    # Agent N runs profile N mod 5, whatever shard it starts in
+    assert [type(agent) for agent in agents] == [classes[index % len(SERVICES)] for index in range(3, 10)]
+    assert len(set(map(type, agents))) == len(SERVICES)
+    assert all(agent.history is None for agent in agents)
+    assert build_fleet(1, history=True)[0].history is not None
+
+def test_fleet_imports_without_psutil(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    monkeypatch.delitem(sys.modules, "agentcore.fleet")
+    assert importlib.import_module("agentcore.fleet").shard_ranges(4, 2) == [(0, 2), (2, 2)]
+
+def test_communities_route_to_their_agents():
+    agents = build_fleet(2)
+    assert type(agents[0]) is not type(agents[1])
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        transport, responder = await loop.create_datagram_endpoint(lambda: CommunityResponder(agents),
+                                                                   local_addr=("127.0.0.1", 0))
+        port = transport.get_extra_info("sockname")[1]
+        targets = [AgentTarget(f"agent-{index}", "127.0.0.1", port, agent_communities(index)[0].decode())
+                   for index in range(2)]
+        unknown = AgentTarget("stranger", "127.0.0.1", port, "public-9")
+        poller = await AsyncPoller(targets + [unknown], timeout=0.1, retries=0).start()
+        try:
+            results = await poller.poll_all()
+            written = await poller.request(AgentTarget("writer", "127.0.0.1", port, agent_communities(1)[1].decode()),
+                                           ber.SET_REQUEST, [(OIDS["logLevel"], ber.INTEGER, 2)])
+            refused = await poller.request(targets[0], ber.SET_REQUEST, [(OIDS["logLevel"], ber.INTEGER, 2)])
+        finally:
+            poller.close()
+            transport.close()
+        return results, written, refused, responder
+
+    results, written, refused, responder = asyncio.run(scenario())
+    assert [result.values[OIDS["sysName"]] for result in results[:2]] == [agent.service_name for agent in agents]
+    assert results[2].error == "no response from stranger" and responder.dropped == 1
+    # private-1 writes agent 1 only; public-0 cannot write at all
+    assert written.error_status == ber.NO_ERROR and refused.error_status == ber.NO_ACCESS
+    assert (agents[0].log_level, agents[1].log_level) == ("INFO", "DEBUG")
+    assert agents[0].request_count == 2 and agents[1].request_count == 2
@@ -0,0 +1,32 @@
+"""
+Ring buffers of gauge history and their window summaries
+"""
+
+from agentcore.history import MetricHistory
+
+def recorded(samples, retention=100.0):
+    values = iter(samples)
+    history = MetricHistory({"gauge": lambda: next(values)}, period=1.0, retention=retention)
+    for now in range(len(samples)):
+        history.record(now)
+    return history
+
+def test_summary_p95_is_nearest_rank():
+    history = recorded(range(1, 21))
+    low, high, avg, p95, count = history.summary("gauge", 60, now=19)
+    assert (low, high, avg, count) == (1, 20, 10.5, 20)
+    assert p95 == 19
+    assert recorded(range(1, 101), retention=200.0).summary("gauge", 200, now=99)[3] == 95
+    assert recorded([7]).summary("gauge", 60, now=0)[3] == 7
+
+def test_window_excludes_older_samples():
+    history = recorded(range(10))
+    assert history.window("gauge", 3, now=9) == [9, 8, 7, 6]
+
+def test_ring_buffer_keeps_only_retention():
+    history = recorded(range(50), retention=9.0)
+    assert history.capacity == 10
+    assert history.window("gauge", 1000, now=49) == list(range(49, 39, -1))
+
+def test_empty_summary():
+    assert MetricHistory({"gauge": lambda: 0}).summary("gauge", 60) == (0.0, 0.0, 0.0, 0.0, 0)
@@ -0,0 +1,98 @@
+"""
+Columnar metric store: round trips, segments, rollups, reopening and retention
+"""
+
+import os
+
+import pytest
+
+from agentcore import OIDS
+from collector import MetricStore
+from collector.metricstore import RETENTION
+
+T0 = 1_700_000_040.0  # on a minute boundary
+
+def store_at(path, **options):
+    return MetricStore(str(path), oids=[OIDS["cpuUsage"], OIDS["requestsProcessed"], OIDS["sysName"]], **options)
+
+def sample(cpu, requests):
+    return {OIDS["cpuUsage"]: cpu, OIDS["requestsProcessed"]: requests, OIDS["sysName"]: "ignored"}
+
+def test_round_trip_and_missing_values(tmp_path):
+    store = store_at(tmp_path)
+    assert store.metrics == ["cpuUsage", "requestsProcessed"]
+    store.append("web", T0, sample(12.5, 100))
+    store.append("web", T0 + 1, {OIDS["cpuUsage"]: "n/a", OIDS["requestsProcessed"]: 101})
+    store.append("web", T0 + 2, sample(14.0, 102))
+    assert store.points("web", "cpuUsage", T0, T0 + 10) == [(T0, 12.5), (T0 + 2, 14.0)]
+    assert store.points("web", "requestsProcessed", T0 + 1, T0 + 2) == [(T0 + 1, 101)]
+    assert store.points("db", "cpuUsage", T0, T0 + 10) == []
+    store.close()
+
+def test_full_range_integers_are_not_missing(tmp_path):
+    store = store_at(tmp_path)
+    store.append("web", T0, sample(1, 2 ** 32 - 1))
+    store.append("web", T0 + 1, {OIDS["cpuUsage"]: 2})
+    assert store.points("web", "requestsProcessed", T0, T0 + 10) == [(T0, 2 ** 32 - 1)]
+    (_, _, _, present), = store.query("web", "requestsProcessed", T0, T0 + 10)
+    assert list(present) == [True, False]
+    store.append("web", T0 + 60, sample(3, 0))
+    assert store.points("web", "requestsProcessed", T0, T0 + 60, "1m", "max") == [(T0, 2 ** 32 - 1)]
+    store.close()
+
+def test_older_rows_are_rejected(tmp_path):
+    store = store_at(tmp_path)
+    store.append("web", T0 + 5, sample(1, 1))
+    store.append("web", T0, sample(2, 2))
+    assert store.rejected == 1
+    assert store.points("web", "cpuUsage", 0, T0 + 60) == [(T0 + 5, 1.0)]
+    store.close()
+
+def test_segments_roll_over_and_queries_span_them(tmp_path):
+    store = store_at(tmp_path, segment_rows=4)
+    for i in range(10):
+        store.append("web", T0 + i, sample(i, i))
+    assert len(store.agents["web"].series["raw"].segments) == 3
+    chunks = store.query("web", "requestsProcessed", T0 + 2, T0 + 9)
+    assert [list(values) for _, _, values, _ in chunks] == [[2, 3], [4, 5, 6, 7], [8]]
+    store.close()
+
+def test_minute_rollups(tmp_path):
+    store = store_at(tmp_path)
+    for i, cpu in enumerate((10, 30, 20)):
+        store.append("web", T0 + i * 20, sample(cpu, i))
+    # The first sample of the next minute closes the bucket
+    assert store.points("web", "cpuUsage", T0, T0 + 120, "1m") == []
+    store.append("web", T0 + 60, sample(50, 3))
+    stats = [store.points("web", "cpuUsage", T0, T0 + 120, "1m", stat)[0][1] for stat in ("min", "max", "avg")]
+    assert stats == [10, 30, 20]
+    store.close()
+
+def test_reopening_resumes_the_open_rollup(tmp_path):
+    store = store_at(tmp_path)
+    store.append("web", T0, sample(10, 0))
+    store.append("web", T0 + 30, sample(20, 1))
+    store.close()
+    store = store_at(tmp_path)
+    store.append("web", T0 + 45, sample(30, 2))
+    store.append("web", T0 + 60, sample(0, 3))
+    assert store.points("web", "cpuUsage", T0, T0 + 60, "1m") == [(T0, 20.0)]
+    assert store.points("web", "cpuUsage", T0, T0 + 61) == [(T0, 10.0), (T0 + 30, 20.0), (T0 + 45, 30.0),
+                                                            (T0 + 60, 0.0)]
+    store.close()
+
+def test_expired_segments_are_deleted(tmp_path):
+    store = store_at(tmp_path, retention={"raw": 10}, segment_rows=2)
+    for i in range(6):
+        store.append("web", T0 + i, sample(i, i))
+    store.expire(T0 + 14)
+    assert [point[0] for point in store.points("web", "cpuUsage", 0, T0 + 100)] == [T0 + 4, T0 + 5]
+    segments = [name for name in os.listdir(tmp_path / "web") if name.startswith("raw-")]
+    assert len(segments) == 1
+    assert store.retention["1h"] == RETENTION["1h"]
+    store.close()
+
+def test_schema_mismatch_is_refused(tmp_path):
+    store_at(tmp_path).close()
+    with pytest.raises(ValueError):
+        MetricStore(str(tmp_path), oids=[OIDS["memoryUsage"]])
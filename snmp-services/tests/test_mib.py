@@ -0,0 +1,147 @@
+"""
+The MIB parser, compiled trie and cache, and the OID index built on them
+"""
+
+import os
+
+import pytest
+
+from agentcore import OIDS, OidIndex, oid_key
+from agentcore.mib import MIB, Mib, find_mib, load_mib, parse_mib
+
+SAMPLE = """
+SAMPLE-MIB DEFINITIONS ::= BEGIN
+IMPORTS enterprises FROM SNMPv2-SMI;
+
+sample MODULE-IDENTITY
+    LAST-UPDATED "202401010000Z"
+    DESCRIPTION "A MIB -- with a dash pair in its text"
+    ::= { iso(1) org(3) dod(6) internet(1) private(4) enterprises(1) 4242 }
+
+box OBJECT IDENTIFIER ::= { sample 1 }
+
+mode OBJECT-TYPE
+    SYNTAX INTEGER { off(0), on(1), auto(2) }
+    MAX-ACCESS read-write
+    STATUS current
+    DESCRIPTION "Operating mode"
+    ::= { box 1 }
+
+level OBJECT-TYPE
+    SYNTAX Integer32 (0..100)
+    MAX-ACCESS read-write
+    STATUS current
+    DESCRIPTION "Level"
+    ::= { box 2 }
+
+slotTable OBJECT-TYPE
+    SYNTAX SEQUENCE OF SlotEntry
+    MAX-ACCESS not-accessible
+    STATUS current
+    DESCRIPTION "Slots"
+    ::= { box 10 }
+
+slotEntry OBJECT-TYPE
+    SYNTAX SlotEntry
+    MAX-ACCESS not-accessible
+    STATUS current
+    DESCRIPTION "A slot"
+    INDEX { slotIndex }
+    ::= { slotTable 1 }
+
+slotIndex OBJECT-TYPE
+    SYNTAX Integer32
+    MAX-ACCESS not-accessible
+    STATUS current
+    DESCRIPTION "Index"
+    ::= { slotEntry 1 }
+
+slotBytes OBJECT-TYPE
+    SYNTAX Counter32
+    MAX-ACCESS read-only
+    STATUS current
+    DESCRIPTION "Bytes"
+    ::= { slotEntry 2 }
+END
+"""
+
+@pytest.fixture(scope="module")
+def sample():
+    return Mib(parse_mib(SAMPLE))
+
+def test_parse_resolves_oids_and_clauses(sample):
+    assert sample["sample"].dotted == "1.3.6.1.4.1.4242"
+    mode = sample["mode"]
+    assert (mode.dotted, mode.pass_type, mode.writable) == ("1.3.6.1.4.1.4242.1.1", "integer", True)
+    assert mode.enums == {0: "off", 1: "on", 2: "auto"}
+    assert sample["level"].range == (0, 100)
+    assert sample["slotEntry"].index == ("slotIndex",)
+    assert sample["sample"].description == ""
+
+def test_scalars_columns_and_writable(sample):
+    assert sample.scalars() == {"mode": "1.3.6.1.4.1.4242.1.1.0", "level": "1.3.6.1.4.1.4242.1.2.0"}
+    assert sample.columns("slotEntry") == {"slotBytes": 2}
+    assert sample.writable() == {"1.3.6.1.4.1.4242.1.1.0", "1.3.6.1.4.1.4242.1.2.0"}
+
+def test_object_at_instances(sample):
+    assert sample.object_at("1.3.6.1.4.1.4242.1.1.0").name == "mode"
+    assert sample.object_at(".1.3.6.1.4.1.4242.1.10.1.2.7").name == "slotBytes"
+    assert sample.pass_type("1.3.6.1.4.1.4242.1.10.1.2.7") == "counter"
+    # The object itself, not-accessible nodes, unknown arcs and garbage are not instances
+    assert sample.object_at("1.3.6.1.4.1.4242.1.1") is None
+    assert sample.object_at("1.3.6.1.4.1.4242.1.10.1.1.7") is None
+    assert sample.object_at("1.3.6.1.4.1.4242.9.0") is None
+    assert sample.object_at("1.3.x.1") is None
+    assert sample.pass_type("1.3.6.1.4.1.4242.9.0") == "string"
+
+def test_coerce(sample):
+    mode, level = sample["mode"], sample["level"]
+    assert [mode.coerce(value) for value in ("ON", 2, "0")] == ["on", "auto", "off"]
+    assert mode.enum_number("Auto") == 2 and mode.enum_number(7) is None
+    assert level.coerce("42") == 42
+    for node, value in ((mode, "loud"), (mode, 9), (level, "101"), (level, "many")):
+        with pytest.raises(ValueError):
+            node.coerce(value)
+    assert sample.display("1.3.6.1.4.1.4242.1.1.0", 1) == "on"
+
+def test_walk_is_in_numeric_order():
+    dotted = [node.dotted for node in MIB.walk()]
+    assert dotted == sorted(dotted, key=oid_key)
+    assert MIB.resolve(OIDS["sysName"]) == (MIB["sysName"], (0,))
+
+def test_unresolvable_parent_raises():
+    with pytest.raises(ValueError):
+        parse_mib("orphan OBJECT IDENTIFIER ::= { nowhere 1 }")
+
+def test_compiled_cache_is_used_and_refreshed(tmp_path):
+    path = tmp_path / "SAMPLE-MIB.txt"
+    path.write_text(SAMPLE)
+    assert load_mib(str(path), str(tmp_path)).scalars() == Mib(parse_mib(SAMPLE)).scalars()
+    caches = [name for name in os.listdir(tmp_path) if name.endswith(".mibc")]
+    assert len(caches) == 1
+    assert load_mib(str(path), str(tmp_path))["mode"].enums == {0: "off", 1: "on", 2: "auto"}
+    # An edited MIB invalidates the cache
+    path.write_text(SAMPLE.replace("auto(2)", "eco(2)") + "\n")
+    assert load_mib(str(path), str(tmp_path))["mode"].enums[2] == "eco"
+    # A corrupt cache is reparsed rather than trusted
+    (tmp_path / caches[0]).write_bytes(b"junk")
+    assert load_mib(str(path), str(tmp_path))["mode"].enums[2] == "eco"
+
+def test_enterprise_mib_matches_the_served_oids(db_agent):
+    assert os.path.basename(find_mib()) == "ENTERPRISE-MIB.txt"
+    assert all(MIB.object_at(oid) is not None for oid in db_agent.oid_index.oids)
+
+def test_oid_index_next_and_bulk():
+    index = OidIndex(["1.3.6.1.2", "1.3.6.1.10", "1.3.6.1.9.1", "1.3.6.1.9"])
+    assert index.oids == ["1.3.6.1.2", "1.3.6.1.9", "1.3.6.1.9.1", "1.3.6.1.10"]
+    assert index.next("1.3.6.1.9") == "1.3.6.1.9.1"
+    assert index.next(".1.3.6.1.3") == "1.3.6.1.9"
+    assert index.next("1.3.6.1.10") is None
+    assert index.bulk("1.3.6", 3) == index.oids[:3]
+    assert index.bulk("1.3.6", -1) == []
+
+def test_trap_oids_come_from_the_mib():
+    from agentcore.traps import DEFAULT_THRESHOLDS, TRAP_OIDS
+    assert TRAP_OIDS["highCpuUsage"] == MIB["enterpriseTraps"].dotted + ".1"
+    assert {threshold.name for threshold in DEFAULT_THRESHOLDS} | {"thresholdCleared"} <= set(TRAP_OIDS)
+    assert all(MIB[name].kind == "notification" for name in TRAP_OIDS)
@@ -0,0 +1,20 @@
+"""
+Byte counter deltas behind the network rates
+"""
+
+from agentcore.netrate import COUNTER32_MODULO, counter_delta
+
+def test_increase():
+    assert counter_delta(1000, 5000) == 4000
+    assert counter_delta(5000, 5000) == 0
+
+def test_32bit_wrap():
+    assert counter_delta(COUNTER32_MODULO - 1000, 500) == 1500
+
+def test_reset_from_a_normal_value_is_not_a_wrap():
+    # An interface recreated at 1 GB: not ~3 GiB of traffic
+    assert counter_delta(10 ** 9, 10 ** 6) == 10 ** 6
+    assert counter_delta(5000, 0) == 0
+
+def test_reset_of_a_64bit_counter():
+    assert counter_delta(2 ** 40, 1234) == 1234
@@ -0,0 +1,69 @@
+"""
+The pass_persist loop, driven through in-memory pipes
+"""
+
+import io
+
+from agentcore import ENTERPRISE_OID, OIDS, pass_persist
+
+def converse(agent, *lines):
+    """Feed request lines to pass_persist until EOF and return the reply lines"""
+    stdout = io.StringIO()
+    pass_persist(agent, io.StringIO("".join(line + "\n" for line in lines)), stdout)
+    return stdout.getvalue().splitlines()
+
+def test_ping(db_agent):
+    assert converse(db_agent, "PING", "PING") == ["PONG", "PONG"]
+
+def test_eof_ends_the_loop(db_agent):
+    assert converse(db_agent) == []
+    # EOF in the middle of a request's argument lines does not hang or raise
+    stdout = io.StringIO()
+    pass_persist(db_agent, io.StringIO("getmulti\n3\n." + OIDS["sysName"]), stdout)
+    assert stdout.getvalue().splitlines()[-1] == "END"
+
+def test_blank_lines_are_skipped(db_agent):
+    assert converse(db_agent, "", "PING", "   ", "", "PING") == ["PONG", "PONG"]
+
+def test_get_and_getnext(db_agent):
+    replies = converse(db_agent, "get", "." + OIDS["sysName"], "getnext", "." + OIDS["sysName"],
+                       "get", "." + ENTERPRISE_OID + ".42.0")
+    assert replies == ["." + OIDS["sysName"], "string", "Database Service",
+                       "." + OIDS["sysStatus"], "integer", "1",
+                       "NONE"]
+
+def test_getbulk(db_agent):
+    replies = converse(db_agent, "getbulk", "." + ENTERPRISE_OID, "3")
+    assert replies[-1] == "END"
+    assert replies[:-1][::3] == ["." + oid for oid in db_agent.oid_index.oids[:3]]
+
+def test_getmulti_answers_in_request_order(db_agent):
+    oids = [OIDS["uptime"], ENTERPRISE_OID + ".42.0", OIDS["sysName"]]
+    replies = converse(db_agent, "getmulti", str(len(oids)), *("." + oid for oid in oids))
+    assert replies[0] == "." + OIDS["uptime"]
+    assert replies[1] == "timeticks"
+    assert replies[3:] == ["NONE", "." + OIDS["sysName"], "string", "Database Service", "END"]
+
+def test_setmulti_applies_all(db_agent):
+    replies = converse(db_agent, "setmulti", "1", "." + OIDS["logLevel"], "string debug",
+                       "get", "." + OIDS["logLevel"])
+    assert replies == ["DONE", "." + OIDS["logLevel"], "integer", "2"]
+    assert db_agent.log_level == "DEBUG"
+
+def test_setmulti_applies_none_on_failure(db_agent):
+    replies = converse(db_agent, "setmulti", "2", "." + OIDS["logLevel"], "string debug",
+                       "." + OIDS["sysName"], "string renamed")
+    assert replies == ["not-writable 2"]
+    assert db_agent.log_level == "INFO"
+    assert converse(db_agent, "setmulti", "2", "." + OIDS["logLevel"], "string error",
+                    "." + OIDS["logLevel"], "integer x") == ["wrong-type 2"]
+    assert db_agent.log_level == "INFO"
+
+def test_set(db_agent):
+    replies = converse(db_agent, "set", "." + OIDS["logLevel"], "string error",
+                       "set", "." + OIDS["cpuUsage"], "integer 3")
+    assert replies == ["DONE", "not-writable"]
+    assert db_agent.log_level == "ERROR"
+
+def test_unknown_command(db_agent):
+    assert converse(db_agent, "frobnicate", "PING") == ["NONE", "PONG"]
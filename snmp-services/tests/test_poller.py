@@ -0,0 +1,111 @@
+"""
+Async poller against an in-process agent: retries, timeouts and request-id matching
+"""
+
+import asyncio
+
+import pytest
+
+from agentcore import OIDS, ber, load_profile, udpagent
+from collector import COLLECT_OIDS, AgentTarget, AsyncPoller
+from collector.poller import ClientProtocol
+
+class Dropping(udpagent.SNMPResponder):
+    """Drops the first `drop` requests it receives, then answers normally"""
+
+    def __init__(self, agent, drop=1):
+        super().__init__(agent)
+        self.drop = drop
+        self.received = 0
+
+    def datagram_received(self, data, addr):
+        self.received += 1
+        if self.received > self.drop:
+            super().datagram_received(data, addr)
+
+class Stale(Dropping):
+    """Answers the first request under the wrong request-id"""
+
+    def datagram_received(self, data, addr):
+        self.received += 1
+        if self.received > self.drop:
+            udpagent.SNMPResponder.datagram_received(self, data, addr)
+            return
+        request = ber.decode_message(data)
+        self.transport.sendto(udpagent.respond(self.agent, request._replace(request_id=request.request_id + 1)),
+                              addr)
+
+def against(protocol, scenario, **options):
+    """Run scenario(poller, target, responder) with a poller aimed at an agent served by protocol"""
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        agent = load_profile("web-server")()
+        transport, responder = await loop.create_datagram_endpoint(lambda: protocol(agent),
+                                                                   local_addr=("127.0.0.1", 0))
+        target = AgentTarget("web", "127.0.0.1", transport.get_extra_info("sockname")[1], "public")
+        poller = await AsyncPoller([target], **dict({"timeout": 0.2, "retries": 2}, **options)).start()
+        try:
+            return await scenario(poller, target, responder)
+        finally:
+            poller.close()
+            transport.close()
+
+    return asyncio.run(main())
+
+async def poll_once(poller, target, responder):
+    return await poller.poll(target), responder
+
+def test_poll_collects_every_oid():
+    result, responder = against(udpagent.SNMPResponder, poll_once)
+    assert result.error is None
+    assert set(result.values) == set(COLLECT_OIDS)
+    assert result.values[OIDS["sysName"]] == "Web Server"
+    assert result.target.name == "web" and result.latency > 0
+
+def test_a_dropped_datagram_is_retried():
+    async def scenario(poller, target, responder):
+        return await poller.poll(target), poller.stats, responder
+
+    result, stats, responder = against(Dropping, scenario)
+    assert result.error is None and result.values[OIDS["sysName"]] == "Web Server"
+    assert responder.received == 2
+    assert (stats.polls, stats.failures, stats.retries, stats.timeouts) == (1, 0, 1, 1)
+
+def test_a_silent_agent_times_out_after_every_retry():
+    async def scenario(poller, target, responder):
+        result = await poller.poll(target)
+        with pytest.raises(asyncio.TimeoutError):
+            await poller.request(target, ber.GET_REQUEST, [(OIDS["sysName"], ber.NULL, None)])
+        return result, poller, responder
+
+    result, poller, responder = against(lambda agent: Dropping(agent, drop=100), scenario, timeout=0.05, retries=2)
+    assert result.values == {} and result.error == "no response from web"
+    assert responder.received == 6
+    assert (poller.stats.failures, poller.stats.retries, poller.stats.timeouts) == (1, 4, 6)
+    assert poller._protocol.pending == {}
+
+def test_a_response_under_another_request_id_is_ignored():
+    async def scenario(poller, target, responder):
+        return await poller.poll(target), poller.stats, responder
+
+    result, stats, responder = against(Stale, scenario)
+    assert result.error is None and result.values[OIDS["sysName"]] == "Web Server"
+    # The stale answer did not complete the request, the retry's answer did
+    assert responder.received == 2 and stats.retries == 1
+
+def test_client_protocol_routes_by_request_id():
+    async def scenario():
+        protocol = ClientProtocol()
+        waiting = asyncio.get_running_loop().create_future()
+        protocol.pending[42] = waiting
+        response = [(OIDS["sysName"], ber.OCTET_STRING, b"x")]
+        protocol.datagram_received(ber.encode_response(b"public", 41, [ber.encode_varbind(*response[0])]), None)
+        assert not waiting.done()
+        protocol.datagram_received(b"\x30\x03junk", None)
+        protocol.datagram_received(ber.encode_response(b"public", 42, [ber.encode_varbind(*response[0])]), None)
+        return protocol, waiting.result()
+
+    protocol, message = asyncio.run(scenario())
+    assert protocol.malformed == 1
+    assert message.request_id == 42 and message.varbinds == [(OIDS["sysName"], ber.OCTET_STRING, b"x")]
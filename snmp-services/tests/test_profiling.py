@@ -0,0 +1,90 @@
+"""
+On-demand profiling: one window at a time, the files each mode writes, and selfProfile SETs
+"""
+
+import pstats
+import threading
+import time
+
+import pytest
+
+from agentcore import OIDS, ber
+from agentcore.profiling import Profiler, get_profiler
+from agentcore.udpagent import respond
+
+def busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = Profiler(str(tmp_path), seconds=60, interval_ms=1)
+    yield profiler
+    profiler.stop()
+
+def test_a_second_window_is_refused_while_one_runs(profiler):
+    assert profiler.start("sampling")
+    thread = profiler._thread
+    assert not profiler.can_start("cprofile")
+    assert not profiler.start("cprofile")
+    # The same mode again is already running, and does not start a second sampler
+    assert profiler.can_start("sampling") and profiler.start("sampling")
+    assert profiler._thread is thread and profiler.mode == "sampling"
+    profiler.stop()
+    assert profiler.mode == "off" and profiler.can_start("cprofile")
+
+def test_unknown_modes_are_refused(profiler):
+    assert not profiler.can_start("bogus") and not profiler.start("bogus")
+    assert not profiler.can_start(99)
+    # Enumeration numbers name the modes too: 1 is off
+    assert profiler.can_start(1) and profiler.start(1)
+    assert profiler.mode == "off" and profiler.output == ""
+
+def test_cprofile_stop_writes_pstats(profiler, tmp_path):
+    assert profiler.start("cprofile")
+    sum(range(1000))
+    profiler.stop()
+    assert profiler.mode == "off"
+    assert profiler.output.startswith(str(tmp_path)) and profiler.output.endswith(".pstats")
+    assert pstats.Stats(profiler.output).total_calls > 0
+    assert "cumulative" in open(profiler.output[:-len(".pstats")] + ".txt").read()
+
+def test_sampling_stop_writes_collapsed_stacks(profiler):
+    stop = threading.Event()
+    worker = threading.Thread(target=busy, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        assert profiler.start("sampling")
+        time.sleep(0.1)
+        profiler.stop()
+    finally:
+        stop.set()
+        worker.join()
+    assert profiler.output.endswith(".collapsed")
+    lines = open(profiler.output).read().splitlines()
+    stacks = dict(line.rsplit(" ", 1) for line in lines)
+    assert any(stack.startswith("busy-worker;") and "busy (test_profiling.py" in stack for stack in stacks)
+    assert all(int(count) > 0 for count in stacks.values())
+
+def test_sampling_window_ends_by_itself(tmp_path):
+    profiler = Profiler(str(tmp_path), seconds=0.05, interval_ms=1)
+    assert profiler.start("sampling")
+    profiler._thread.join(5.0)
+    assert profiler.mode == "off" and profiler.output.endswith(".collapsed")
+
+def test_selfprofile_set_rejects_unknown_modes(db_agent, monkeypatch, tmp_path):
+    monkeypatch.setattr(get_profiler(), "directory", str(tmp_path))
+    oid = "." + OIDS["selfProfile"]
+    assert db_agent.process_pass("set", oid, "string bogus") == ["wrong-value"]
+    assert db_agent.process_pass("set", oid, "integer 99") == ["wrong-value"]
+    request = ber.decode_message(ber.encode_message(b"private", ber.SET_REQUEST, 5,
+                                                    [(OIDS["selfProfile"], ber.OCTET_STRING, b"bogus")]))
+    response = ber.decode_message(respond(db_agent, request, writable=True))
+    assert (response.error_status, response.error_index) == (ber.WRONG_VALUE, 1)
+    assert get_profiler().mode == "off"
+    # A different mode is refused while a window runs
+    try:
+        assert db_agent.process_pass("set", oid, "string sampling") == ["DONE"]
+        assert db_agent.process_pass("set", oid, "string cprofile") == ["wrong-value"]
+    finally:
+        get_profiler().stop()
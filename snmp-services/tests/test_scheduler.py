@@ -0,0 +1,116 @@
+"""
+Adaptive scheduler: per-OID intervals, counters, degraded agents, backoff and the budget
+"""
+
+import asyncio
+
+import pytest
+
+from agentcore import OIDS
+from agentcore.mib import MIB
+from collector import AdaptiveScheduler, PollResult, port_range_inventory
+from collector.poller import COLLECT_OIDS
+from collector.scheduler import STATUS_DOWN, AgentSchedule
+
+CPU, REQUESTS, STATUS, ACTIVE = (COLLECT_OIDS.index(OIDS[name])
+                                 for name in ("cpuUsage", "requestsProcessed", "sysStatus", "activeServices"))
+
+def values(**changes):
+    """One poll's values: every OID steady, except the named ones"""
+    polled = {oid: "Web Server" if MIB.pass_type(oid) == "string" else 10 for oid in COLLECT_OIDS}
+    polled[OIDS["sysStatus"]] = MIB["sysStatus"].enum_number("up")
+    polled[OIDS["activeServices"]] = 3
+    polled.update({OIDS[name]: value for name, value in changes.items()})
+    return polled
+
+@pytest.fixture
+def scheduler():
+    return AdaptiveScheduler(port_range_inventory("127.0.0.1", 20000, 1), interval=4.0, jitter=0.0, budget=100.0)
+
+def schedule(scheduler):
+    return AgentSchedule(scheduler.targets[0], [scheduler.interval] * len(COLLECT_OIDS), 0.0)
+
+def poll(scheduler, state, now, polled, error=None):
+    """adapt() after a poll of every OID at now; returns the polls/s the agent asks for"""
+    return scheduler.adapt(state, range(len(COLLECT_OIDS)), polled, error, now)
+
+def test_changes_shorten_and_stillness_lengthens_intervals(scheduler):
+    state = schedule(scheduler)
+    poll(scheduler, state, 0.0, values(cpuUsage=10))
+    poll(scheduler, state, 4.0, values(cpuUsage=40))
+    assert state.intervals[CPU] == 2.0
+    assert state.due[CPU] == 6.0
+    poll(scheduler, state, 6.0, values(cpuUsage=41))  # within the 2 % deadband
+    assert state.intervals[CPU] == 3.0
+    for step in range(10):
+        poll(scheduler, state, 10.0 + step, values(cpuUsage=41))
+    assert state.intervals[CPU] == scheduler.max_interval
+    # The health OIDs never stretch beyond health_interval
+    assert state.intervals[STATUS] == state.intervals[ACTIVE] == scheduler.health_interval
+    for step in range(5):
+        poll(scheduler, state, 30.0 + step, values(cpuUsage=90 * (step % 2)))
+    assert state.intervals[CPU] == scheduler.min_interval
+
+def test_counters_are_judged_by_their_rate(scheduler):
+    state = schedule(scheduler)
+    # 100 requests/s: the raw value moves on every poll, the rate does not
+    for step in range(4):
+        poll(scheduler, state, step * 4.0, values(requestsProcessed=1000 + step * 400))
+    assert state.intervals[REQUESTS] > scheduler.interval
+    assert state.rates[REQUESTS] == pytest.approx(100.0)
+    stretched = state.intervals[REQUESTS]
+    # The rate jumps to 1000/s
+    poll(scheduler, state, 16.0, values(requestsProcessed=1000 + 3 * 400 + 4000))
+    assert state.intervals[REQUESTS] == stretched / 2
+    # A wrap past 2**32 is still the same rate
+    state = schedule(scheduler)
+    for step, value in enumerate((2 ** 32 - 800, 2 ** 32 - 400, 0, 400)):
+        poll(scheduler, state, step * 4.0, values(requestsProcessed=value))
+    assert state.intervals[REQUESTS] > scheduler.interval
+
+@pytest.mark.parametrize("degraded", [{"sysStatus": STATUS_DOWN}, {"activeServices": 1}])
+def test_degraded_agents_go_to_min_interval(scheduler, degraded):
+    state = schedule(scheduler)
+    for step in range(3):
+        poll(scheduler, state, step * 4.0, values())
+    rate = poll(scheduler, state, 12.0, values(**degraded))
+    assert state.degraded and scheduler.degraded == 1
+    assert rate == 1 / scheduler.min_interval
+    assert state.due == [12.0 + scheduler.min_interval] * len(COLLECT_OIDS)
+    # Recovered: back to the OIDs' own intervals
+    rate = poll(scheduler, state, 13.0, values())
+    assert not state.degraded and scheduler.degraded == 0
+    assert rate == 1 / min(state.intervals)
+
+def test_failures_back_off(scheduler):
+    state = schedule(scheduler)
+    rates = [poll(scheduler, state, 0.0, {}, error="timeout") for _ in range(8)]
+    backoffs = [1 / rate for rate in rates]
+    assert backoffs[:4] == [1.0, 2.0, 4.0, 8.0]
+    assert backoffs[-1] == scheduler.max_interval
+    assert state.due == [scheduler.max_interval] * len(COLLECT_OIDS)
+    poll(scheduler, state, 30.0, values())
+    assert state.failures == 0
+
+def test_over_budget_intervals_are_stretched(scheduler):
+    state = schedule(scheduler)
+    scheduler.demand = 300.0  # three times the budget of 100 polls/s
+    assert scheduler.stretch == 3.0
+    poll(scheduler, state, 0.0, values())
+    assert state.due[CPU] == state.intervals[CPU] * 3.0
+    scheduler.demand = 50.0
+    assert scheduler.stretch == 1.0
+
+def test_dispatch_holds_to_the_budget():
+    targets = port_range_inventory("127.0.0.1", 20000, 200)
+
+    class Instant(AdaptiveScheduler):
+        async def poll(self, target, varbinds=None):
+            self.stats.polls += 1
+            return PollResult(target, 0.0, 0.0, values(), None)
+
+    scheduler = Instant(targets, interval=0.1, budget=200.0)
+    asyncio.run(scheduler.run(lambda result: None, duration=1.0))
+    # 2000 polls/s wanted, 200 allowed, plus the initial burst of 10
+    assert scheduler.demand > scheduler.budget
+    assert 150 <= scheduler.stats.polls <= 230
@@ -0,0 +1,82 @@
+"""
+Self-instrumentation: the log2 latency histogram, its percentiles and the stats file
+"""
+
+import json
+import random
+
+import pytest
+
+from agentcore import OIDS
+from agentcore.selfstats import LATENCY_BOUNDS_US, OVERFLOW_BUCKET, OidStats, StatsWriter
+
+def bucket_of(elapsed_ns):
+    stats = OidStats()
+    stats.record(elapsed_ns)
+    bucket, = (bucket for bucket, count in enumerate(stats.buckets) if count)
+    return bucket
+
+@pytest.mark.parametrize("elapsed_us,bucket", [
+    (0, 0), (1, 1), (2, 2), (3, 2), (4, 3), (1023, 10), (1024, 11),
+    (LATENCY_BOUNDS_US[-1] - 1, OVERFLOW_BUCKET - 1), (LATENCY_BOUNDS_US[-1], OVERFLOW_BUCKET),
+    (10 ** 9, OVERFLOW_BUCKET),
+])
+def test_bucket_boundaries(elapsed_us, bucket):
+    assert bucket_of(elapsed_us * 1000) == bucket
+    # Bucket k holds latencies under its bound of 2**k and at or over the bound below it
+    if bucket < OVERFLOW_BUCKET:
+        assert elapsed_us < LATENCY_BOUNDS_US[bucket]
+    if bucket:
+        assert elapsed_us >= LATENCY_BOUNDS_US[bucket - 1]
+
+def test_sub_microsecond_remainders_are_truncated():
+    assert bucket_of(999) == 0
+    assert bucket_of(1999) == 1
+
+def test_percentiles_fall_in_the_known_bucket():
+    rng = random.Random(7)
+    stats = OidStats()
+    # 90 % of requests at 100-127 us, 9 % at 3-4 ms and 1 % at 50 ms
+    for _ in range(9000):
+        stats.record(rng.randrange(100_000, 127_000))
+    for _ in range(900):
+        stats.record(rng.randrange(3_000_000, 4_000_000))
+    for _ in range(100):
+        stats.record(50_000_000)
+    assert stats.percentile_us(50) == 128
+    assert stats.percentile_us(90) == 128
+    assert stats.percentile_us(95) == 4096
+    assert stats.percentile_us(99) == 4096
+    assert stats.percentile_us(99.5) == 65536
+    assert stats.requests == 10000 and stats.max_ns == 50_000_000
+
+def test_percentiles_past_the_last_bound_report_the_maximum():
+    stats = OidStats()
+    stats.record(2_000_000_000)
+    assert stats.percentile_us(50) == stats.percentile_us(99) == 2_000_000
+    assert OidStats().percentile_us(99) == 0
+
+def test_as_dict():
+    stats = OidStats()
+    for elapsed_ns in (500, 1500, 3000):
+        stats.record(elapsed_ns)
+    report = stats.as_dict()
+    assert (report["requests"], report["totalMicros"], report["maxMicros"]) == (3, 5, 3)
+    assert report["histogramMicros"]["1"] == report["histogramMicros"]["2"] == report["histogramMicros"]["4"] == 1
+    assert report["histogramMicros"]["inf"] == 0
+    assert (report["p50Micros"], report["p99Micros"]) == (2, 4)
+
+def test_writer_reports_every_registered_agent(tmp_path, db_agent):
+    db_agent.get_oid_value(OIDS["sysName"])
+    writer = StatsWriter(str(tmp_path / "stats-{pid}.json"), period=3600)
+    try:
+        writer.register(db_agent)
+        writer.sample()
+    finally:
+        writer.stop()
+    path, = tmp_path.iterdir()
+    report = json.loads(path.read_text())
+    agent, = report["agents"]
+    assert agent["service"] == db_agent.service_name
+    assert agent["oids"][OIDS["sysName"]]["requests"] == 1
+    assert writer.errors == 0
@@ -0,0 +1,125 @@
+"""
+Sharded collector: hash ring assignment and replacing dead workers
+"""
+
+from collections import Counter
+
+from collector import port_range_inventory, sharding
+from collector.sharding import HashRing, ShardedCollector
+
+class FakeProcess:
+    pid = 1
+
+    def join(self, timeout=None):
+        pass
+
+class FakeConn:
+    """Records what the parent sends, and answers an assign the way serve_worker does"""
+
+    def __init__(self):
+        self.sent = []
+        self.inbox = []
+        self.left = {}  # cycles left per assigned index
+        self.owned = set()
+        self.closed = False
+
+    def send(self, message):
+        self.sent.append(message)
+        if message[0] == "assign":
+            _, share, remaining = message
+            wanted = dict(zip(share, remaining or [None] * len(share)))
+            released = sorted(self.owned.difference(wanted))
+            self.left = {index: left for index, left in self.left.items() if index in wanted}
+            self.left.update({index: left for index, left in wanted.items() if index not in self.owned})
+            self.owned = set(wanted)
+            if released:
+                self.inbox.append(("released", released))
+
+    def recv(self):
+        return self.inbox.pop(0)
+
+    def close(self):
+        self.closed = True
+
+class FakeWorker(sharding.Worker):
+    """A Worker without a process behind it"""
+
+    started = []
+
+    def __init__(self, name, targets, options, cycles):
+        self.name = name
+        self.conn = FakeConn()
+        self.process = FakeProcess()
+        self.share = None
+        self.retries = 0
+        self.done = False
+        FakeWorker.started.append(self)
+
+def test_ring_moves_only_the_removed_nodes_keys():
+    keys = [f"agent-{n}" for n in range(500)]
+    ring = HashRing(["a", "b", "c"])
+    before = {key: ring.node_for(key) for key in keys}
+    ring.remove("b")
+    after = {key: ring.node_for(key) for key in keys}
+    assert {key for key in keys if before[key] != after[key]} == {key for key in keys if before[key] == "b"}
+    shares = ring.assign(keys)
+    assert sorted(index for share in shares.values() for index in share) == list(range(500))
+
+def test_losing_a_worker_twice_replaces_it_once(monkeypatch):
+    monkeypatch.setattr(sharding, "Worker", FakeWorker)
+    FakeWorker.started = []
+    collector = ShardedCollector(port_range_inventory("127.0.0.1", 20000, 40), workers=2).start()
+    dead = collector.workers["worker-0"]
+    dead.retries = 5
+    collector._lose(dead)
+    collector._lose(dead)
+    replacement = collector.workers["worker-0"]
+    assert replacement is not dead and len(FakeWorker.started) == 3
+    assert collector.deaths == 1 and collector._lost_retries == 5
+    # The survivor owns everything until the replacement reports ready
+    assert collector.ring.nodes() == {"worker-1"}
+    assert sorted(collector.workers["worker-1"].share) == list(range(40))
+
+def deliver(collector, worker, polls):
+    """The parent handles everything worker has sent"""
+    while worker.conn.inbox:
+        collector._receive(worker, lambda result: polls.update([result.target.name]))
+
+def run_cycles(collector, worker, cycles, polls):
+    """worker polls each of its targets up to cycles more times, and the parent receives the results"""
+    rows = []
+    for _ in range(cycles):
+        for index, left in worker.conn.left.items():
+            if left:
+                rows.append((index, 0.0, 0.001, (), None))
+                worker.conn.left[index] = left - 1
+    worker.conn.inbox.append(("results", rows, 0))
+    deliver(collector, worker, polls)
+
+def test_moved_targets_keep_their_completed_cycles(monkeypatch):
+    monkeypatch.setattr(sharding, "Worker", FakeWorker)
+    targets = port_range_inventory("127.0.0.1", 20000, 40)
+    collector = ShardedCollector(targets, workers=2, cycles=3).start()
+    polls = Counter()
+    first, second = collector.workers["worker-0"], collector.workers["worker-1"]
+    assert first.conn.sent[-1][2] == [3] * len(first.share)
+    run_cycles(collector, first, 1, polls)
+    run_cycles(collector, second, 2, polls)
+    # worker-0 dies: the survivor takes its targets with the two cycles they have left
+    collector._lose(first)
+    _, share, remaining = second.conn.sent[-1]
+    assert sorted(share) == list(range(40))
+    assert sorted(set(remaining)) == [1, 2]
+    run_cycles(collector, second, 1, polls)
+    # The replacement rejoins, but gets worker-0's targets back only once the survivor releases them
+    replacement = collector.workers["worker-0"]
+    replacement.conn.inbox.append(("ready",))
+    deliver(collector, replacement, polls)
+    assert replacement.share == [] and collector.releasing
+    deliver(collector, second, polls)
+    assert not collector.releasing and replacement.share
+    assert replacement.conn.sent[-1][2] == [1] * len(replacement.share)
+    for worker in (replacement, second):
+        run_cycles(collector, worker, 3, polls)
+    assert polls == Counter({target.name: 3 for target in targets})
+    assert collector.completed == [3] * len(targets) and collector.stats.polls == 3 * len(targets)
@@ -0,0 +1,90 @@
+"""
+Simulated signals: reproducibility, jumping ahead, counters and thread safety
+"""
+
+import threading
+import time
+
+from agentcore import load_profile
+from agentcore.simulation import Simulator
+
+START = 1_700_000_000.0
+SIGNALS = ("cpu", "netIn", "netOut", "memory", "latency", "requests", "hits", "backendsUp")
+
+class FakeClock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+def simulator(profile="load-balancer", seed=7, block=120):
+    clock = FakeClock()
+    return Simulator(load_profile(profile), seed, START, step=1.0, block=block, clock=clock), clock
+
+def read_at(sim, clock, steps):
+    """{step: every signal's value} read in the order given"""
+    values = {}
+    for step in steps:
+        clock.now = START + step
+        values[step] = [sim.value(name) for name in SIGNALS]
+    return values
+
+def test_same_seed_same_values_whatever_the_read_order():
+    steps = [0, 1, 119, 120, 121, 500, 7 * 86400 + 3]
+    forwards = read_at(*simulator(), steps)
+    assert read_at(*simulator(), reversed(steps)) == forwards
+    assert read_at(*simulator(seed=8), steps) != forwards
+
+def test_a_week_ahead_generates_only_the_current_block():
+    sim, clock = simulator()
+    sim.value("cpu")
+    clock.now = START + 7 * 86400
+    started = time.perf_counter()
+    sim.value("cpu")
+    assert time.perf_counter() - started < 0.1
+    assert sim.current[0] == 7 * 86400
+
+def test_counters_never_go_backwards():
+    sim, clock = simulator(profile="cache-service", block=30)
+    last = {"requests": 0.0, "hits": 0.0}
+    for step in list(range(0, 400)) + [4000, 4001, 90000, 90001]:
+        clock.now = START + step
+        for name in last:
+            value = sim.value(name)
+            assert value >= last[name]
+            last[name] = value
+    assert last["hits"] < last["requests"]
+
+def test_walks_stay_in_range_and_continue_across_blocks():
+    sim, clock = simulator(profile="db-service", block=50)
+    low, high = sim.walk_ranges["memory"]
+    values = []
+    for step in range(500):
+        clock.now = START + step
+        values.append(sim.value("memory"))
+    assert all(low <= value <= high for value in values)
+    largest_step = max(abs(b - a) for a, b in zip(values, values[1:]))
+    assert largest_step < (high - low) / 4
+
+def test_concurrent_readers_see_whole_blocks():
+    sim, clock = simulator(block=10)
+    reference, reference_clock = simulator(block=10)
+    errors = []
+
+    def read():
+        for step in range(0, 2000, 7):
+            clock.now = START + step
+            try:
+                sim.value("requests")
+            except Exception as error:
+                errors.append(error)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    clock.now = reference_clock.now = START + 1234
+    assert sim.value("requests") == reference.value("requests")
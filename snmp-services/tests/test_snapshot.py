@@ -0,0 +1,48 @@
+"""
+Warm-start snapshots: what is carried over, and when one-shot agents save
+"""
+
+import os
+import time
+
+from agentcore import OIDS, load_profile, passproto
+from agentcore.snapshot import load_snapshot, save_snapshot, snapshot_path
+
+def test_restart_resumes_counters_seed_and_simulation(tmp_path):
+    cls = load_profile("cache-service")
+    agent = cls()
+    agent.start_time = time.time() - 3 * 86400
+    agent.request_count, agent.error_count, agent.log_level = 42, 3, "DEBUG"
+    before = agent.simulated("requests")
+    assert save_snapshot(agent, str(tmp_path))
+
+    restarted = cls()
+    assert load_snapshot(restarted, str(tmp_path))
+    assert (restarted.start_time, restarted.seed) == (agent.start_time, agent.seed)
+    assert (restarted.request_count, restarted.error_count, restarted.log_level) == (42, 3, "DEBUG")
+    started = time.perf_counter()
+    assert restarted.simulated("requests") >= before
+    assert time.perf_counter() - started < 0.1
+
+def test_stale_or_broken_snapshots_are_ignored(tmp_path):
+    agent = load_profile("db-service")()
+    assert not load_snapshot(agent, str(tmp_path))
+    assert save_snapshot(agent, str(tmp_path))
+    assert not load_snapshot(agent, str(tmp_path), max_age=-1)
+    with open(snapshot_path(agent, str(tmp_path)), "w") as f:
+        f.write("saved nonsense\n")
+    assert not load_snapshot(agent, str(tmp_path))
+
+def test_pass_saves_after_set_only(tmp_path, monkeypatch, capsys):
+    saved = []
+    monkeypatch.setattr(passproto, "AGENT_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(passproto, "load_snapshot", lambda agent: False)
+    monkeypatch.setattr(passproto, "save_snapshot", saved.append)
+    cls = load_profile("web-server")
+    passproto.run_agent(cls, ["-g", "." + OIDS["sysName"]])
+    passproto.run_agent(cls, ["-n", "." + OIDS["sysName"]])
+    assert saved == []
+    passproto.run_agent(cls, ["-s", "." + OIDS["logLevel"], "string", "debug"])
+    assert len(saved) == 1 and saved[0].log_level == "DEBUG"
+    assert capsys.readouterr().out.splitlines()[-1] == "DONE"
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,121 @@
+"""
+Subscriptions: the cookie round trip, limits, and a Subscriber against a live agent
+"""
+
+import asyncio
+
+from agentcore import OIDS, ber, load_profile, udpagent
+from agentcore.subscription import COOKIE_OID, MIN_INTERVAL, SubscriptionTable
+from collector import AgentTarget, Subscriber
+from collector.subscriber import SubscriptionState
+
+COLLECTOR = ("192.0.2.10", 40000)
+OID_VARBINDS = [(OIDS["sysName"], ber.NULL, None), (OIDS["cpuUsage"], ber.INTEGER, 2)]
+
+class FakeTransport:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((data, addr))
+
+    def is_closing(self):
+        return False
+
+def subscribe_request(varbinds, cookie=None, interval_ms=10, request_id=7):
+    if cookie is not None:
+        varbinds = [(COOKIE_OID, ber.INTEGER, cookie)] + varbinds
+    return ber.encode_message(b"public", ber.SUBSCRIBE_REQUEST, request_id, varbinds, interval_ms, 30)
+
+def send(table, agent, data, addr=COLLECTOR):
+    """(encoded response, decoded response) of one SUBSCRIBE_REQUEST"""
+    response = table.subscribe(agent, FakeTransport(), ber.decode_message(data), addr)
+    return response, ber.decode_message(response)
+
+def cookie_of(message):
+    assert message.error_status == ber.AUTHORIZATION_ERROR
+    (oid, tag, cookie), = message.varbinds
+    assert (oid, tag) == (COOKIE_OID, ber.INTEGER)
+    return cookie
+
+def test_first_request_only_gets_a_cookie():
+    async def scenario():
+        table, agent = SubscriptionTable(), load_profile("web-server")()
+        request = subscribe_request(OID_VARBINDS)
+        response, message = send(table, agent, request)
+        cookie = cookie_of(message)
+        assert len(response) <= len(request)
+        assert table.subscriptions == {} and table.challenges == 1
+        # A wrong cookie, or the right one from another address, is challenged again
+        assert cookie_of(send(table, agent, subscribe_request(OID_VARBINDS, cookie ^ 1))[1]) == cookie
+        assert send(table, agent, subscribe_request(OID_VARBINDS, cookie), ("192.0.2.11", 40000))[1].error_status
+        assert table.subscriptions == {}
+
+        _, message = send(table, agent, subscribe_request(OID_VARBINDS, cookie))
+        assert message.error_status == ber.NO_ERROR
+        assert [oid for oid, _, _ in message.varbinds] == [OIDS["sysName"], OIDS["cpuUsage"]]
+        subscription = table.subscriptions[(agent, COLLECTOR)]
+        assert subscription.interval == MIN_INTERVAL
+        # A challenge does not cancel the live subscription
+        send(table, agent, subscribe_request(OID_VARBINDS))
+        assert table.subscriptions[(agent, COLLECTOR)] is subscription
+        # Nor does a cancel without the cookie: only the collector itself can unsubscribe
+        assert cookie_of(send(table, agent, subscribe_request([]))[1]) == cookie
+        assert cookie_of(send(table, agent, subscribe_request([], cookie ^ 1))[1]) == cookie
+        assert table.subscriptions[(agent, COLLECTOR)] is subscription
+        _, message = send(table, agent, subscribe_request([], cookie))
+        assert (message.error_status, message.varbinds) == (ber.NO_ERROR, [])
+        assert table.subscriptions == {} and table.hosts == {}
+
+    asyncio.run(scenario())
+
+def test_subscriptions_per_host_are_capped():
+    async def scenario():
+        table, agent = SubscriptionTable(per_host=2), load_profile("web-server")()
+        statuses = []
+        for port in range(40000, 40003):
+            addr = (COLLECTOR[0], port)
+            cookie = cookie_of(send(table, agent, subscribe_request(OID_VARBINDS), addr)[1])
+            statuses.append(send(table, agent, subscribe_request(OID_VARBINDS, cookie), addr)[1].error_status)
+        assert statuses == [ber.NO_ERROR, ber.NO_ERROR, ber.RESOURCE_UNAVAILABLE]
+        # The same host subscribing to another agent is not held back by them
+        other = load_profile("db-service")()
+        cookie = cookie_of(send(table, other, subscribe_request(OID_VARBINDS))[1])
+        assert send(table, other, subscribe_request(OID_VARBINDS, cookie))[1].error_status == ber.NO_ERROR
+        table.cancel((agent, (COLLECTOR[0], 40000)))
+        assert table.hosts[(agent, COLLECTOR[0])] == 1
+        for key in list(table.subscriptions):
+            table.cancel(key)
+
+    asyncio.run(scenario())
+
+def test_subscriber_completes_the_round_trip(monkeypatch):
+    table = SubscriptionTable()
+    monkeypatch.setattr(udpagent, "get_subscription_table", lambda: table)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        agent = load_profile("cache-service")()
+        transport, _ = await loop.create_datagram_endpoint(lambda: udpagent.SNMPResponder(agent),
+                                                           local_addr=("127.0.0.1", 0))
+        port = transport.get_extra_info("sockname")[1]
+        subscriber = await Subscriber([AgentTarget("cache", "127.0.0.1", port, "public")]).start()
+        try:
+            state = SubscriptionState(subscriber.targets[0])
+            first = await subscriber.subscribe(state)
+            renewal = await subscriber.subscribe(state)
+            subscribed = len(table.subscriptions)
+            # Closing sends a cookied unsubscribe, which the agent honours
+            subscriber.close()
+            await asyncio.sleep(0.05)
+        finally:
+            subscriber.close()
+            transport.close()
+        return first, renewal, subscribed
+
+    first, renewal, subscribed = asyncio.run(scenario())
+    assert subscribed == 1 and table.subscriptions == {}
+    assert first.error is None and first.values[OIDS["sysName"]] == "Cache Service"
+    assert renewal.error is None
+    # Only the first subscribe was challenged; the renewal reused the cookie
+    assert table.challenges == 1
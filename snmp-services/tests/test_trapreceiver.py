@@ -0,0 +1,97 @@
+"""
+Trap receiver: decoding, batch commits, inform acknowledgements and the HTTP API
+"""
+
+import json
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from agentcore import ber
+from agentcore.oids import OIDS
+from agentcore.traps import SNMP_TRAP_OID, SYS_UPTIME_OID, TRAP_OIDS
+from trapreceiver.api import MAX_LIMIT, query_args, serve_api
+from trapreceiver.receiver import TrapReceiver
+from trapreceiver.store import TrapStore
+
+def notification(pdu_type=ber.SNMPV2_TRAP, request_id=1, agent=b"Database Service", cpu=93):
+    return ber.encode_message(b"public", pdu_type, request_id, [
+        (SYS_UPTIME_OID, ber.TIMETICKS, 100),
+        (SNMP_TRAP_OID, ber.OBJECT_IDENTIFIER, TRAP_OIDS["highCpuUsage"]),
+        (OIDS["sysName"], ber.OCTET_STRING, agent),
+        (OIDS["cpuUsage"], ber.GAUGE32, cpu),
+    ])
+
+@pytest.fixture
+def receiver(tmp_path):
+    receiver = TrapReceiver(TrapStore(str(tmp_path / "traps.db")))
+    yield receiver
+    receiver.store.close()
+
+def test_flush_stores_traps_in_route_shape(receiver):
+    receiver.queue.append((notification(), ("10.0.0.7", 40000), 1700000000.0))
+    receiver.queue.append((b"\x30\x03garbage", ("10.0.0.8", 40000), 1700000000.0))
+    receiver.flush()
+    assert (receiver.stats.ingested, receiver.stats.malformed) == (1, 1)
+    [trap] = receiver.store.query()
+    assert trap["message"] == "High CPU usage detected on Database Service (93%)"
+    assert (trap["severity"], trap["agentIp"], trap["oid"]) == ("high", "10.0.0.7", OIDS["cpuUsage"])
+    assert trap["timestamp"] == "2023-11-14T22:13:20.000Z"
+
+def test_failed_acknowledgement_does_not_stop_the_writer(receiver):
+    receiver.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.sock.close()
+    receiver.queue.append((notification(ber.INFORM_REQUEST), ("127.0.0.1", 9), 1700000000.0))
+    receiver.flush()
+    assert receiver.stats.ack_errors == 1
+    assert receiver.stats.acknowledged == 0
+    assert receiver.store.count() == 1
+    assert receiver.stats_dict()["ackErrors"] == 1
+
+def test_informs_are_acknowledged(receiver):
+    receiver.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.bind(("127.0.0.1", 0))
+    sender.settimeout(2)
+    try:
+        receiver.queue.append((notification(ber.INFORM_REQUEST, 77), sender.getsockname(), 1700000000.0))
+        receiver.flush()
+        response = ber.decode_message(sender.recv(65535))
+    finally:
+        sender.close()
+        receiver.sock.close()
+    assert (response.pdu_type, response.request_id) == (ber.GET_RESPONSE, 77)
+    assert receiver.stats.acknowledged == 1
+
+def test_query_filters(receiver):
+    for index, agent in enumerate((b"a", b"b", b"a")):
+        receiver.queue.append((notification(agent=agent), ("10.0.0.1", 1), 1000.0 + index))
+    receiver.flush()
+    assert len(receiver.store.query(agent="a")) == 2
+    assert len(receiver.store.query(since=1001.0)) == 2
+    assert len(receiver.store.query(until=1001.0)) == 1
+    assert len(receiver.store.query(oid="." + TRAP_OIDS["highCpuUsage"])) == 3
+    assert receiver.store.query(severity="low") == []
+
+def test_query_args_clamps_limit():
+    assert query_args("limit=-1")["limit"] == 1
+    assert query_args("limit=0")["limit"] == 1
+    assert query_args("limit=999999")["limit"] == MAX_LIMIT
+    assert query_args("")["limit"] == 100
+    with pytest.raises(ValueError):
+        query_args("limit=lots")
+
+def test_api_rejects_bad_arguments(receiver):
+    server = serve_api(receiver, "127.0.0.1", 0)
+    base = "http://127.0.0.1:%d" % server.server_address[1]
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(base + "/traps?limit=lots")
+        assert error.value.code == 400
+        with urllib.request.urlopen(base + "/traps?limit=-1") as response:
+            assert json.load(response) == []
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,149 @@
+"""
+Threshold evaluation and the trap/inform emitter, against a local UDP listener
+"""
+
+import socket
+import time
+
+import pytest
+
+from agentcore import ber
+from agentcore.oids import OIDS
+from agentcore.traps import SNMP_TRAP_OID, TRAP_OIDS, ThresholdMonitor, Threshold, TrapEmitter
+
+CPU_THRESHOLD = Threshold("highCpuUsage", "cpuUsage", 85, 75, True, False)
+
+class FakeAgent:
+    """Just what the monitor and emitter read from an agent"""
+
+    service_name = "Web Server"
+    trap_thresholds = (CPU_THRESHOLD,)
+
+    def __init__(self, cpu=10):
+        self.cpu = cpu
+        self.start_time = time.time()
+        self.oid_handlers = {OIDS["cpuUsage"]: lambda agent: agent.cpu}
+
+class Monitor(ThresholdMonitor):
+    """A monitor evaluated by hand rather than from its thread"""
+
+    def start(self):
+        return self
+
+@pytest.fixture
+def listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.2)
+    yield sock
+    sock.close()
+
+def received(sock):
+    """Trap names received until the listener goes quiet"""
+    names = {oid: name for name, oid in TRAP_OIDS.items()}
+    traps = []
+    while True:
+        try:
+            message = ber.decode_message(sock.recv(65535))
+        except socket.timeout:
+            return traps
+        values = {oid: value for oid, _, value in message.varbinds}
+        traps.append(names[values[SNMP_TRAP_OID]])
+
+def emitter_for(sock, **options):
+    return TrapEmitter("127.0.0.1:%d" % sock.getsockname()[1], **options)
+
+def test_raise_then_clear_with_hysteresis(listener):
+    agent, monitor = FakeAgent(), Monitor(emitter_for(listener))
+    state = {}
+    for cpu in (10, 90, 95, 80, 70, 72):
+        agent.cpu = cpu
+        monitor.evaluate(agent, state)
+    assert received(listener) == ["highCpuUsage", "thresholdCleared"]
+
+def test_dedup_is_per_agent(listener):
+    emitter = emitter_for(listener)
+    first, second = FakeAgent(), FakeAgent()
+    varbinds = [(OIDS["cpuUsage"], ber.GAUGE32, 90)]
+    assert emitter.send(first, TRAP_OIDS["highCpuUsage"], varbinds)
+    assert emitter.send(second, TRAP_OIDS["highCpuUsage"], varbinds)
+    assert not emitter.send(first, TRAP_OIDS["highCpuUsage"], varbinds)
+    assert emitter.deduplicated == 1
+    assert received(listener) == ["highCpuUsage", "highCpuUsage"]
+
+def test_suppressed_raise_is_not_followed_by_a_clear(listener):
+    emitter = emitter_for(listener, rate_limit=1)
+    monitor, busy, other = Monitor(emitter), FakeAgent(90), FakeAgent(90)
+    monitor.evaluate(busy, {})  # takes the only token
+    state = {}
+    monitor.evaluate(other, state)
+    assert emitter.rate_limited == 1
+    assert state["highCpuUsage"][0] is False
+    other.cpu = 10
+    monitor.evaluate(other, state)
+    assert received(listener) == ["highCpuUsage"]
+
+def test_monitor_reads_do_not_count_as_requests(db_agent, listener):
+    monitor = Monitor(emitter_for(listener))
+    monitor.evaluate(db_agent, {})
+    assert db_agent.stats.oids == {}
+    assert db_agent.metric_cache.hits == db_agent.metric_cache.misses == 0
+
+def test_informs_do_not_block_the_monitor(listener):
+    emitter = emitter_for(listener, inform=True, timeout=0.5, retries=1)
+    agent, monitor = FakeAgent(90), Monitor(emitter)
+    started = time.monotonic()
+    monitor.evaluate(agent, {})
+    assert time.monotonic() - started < 0.1
+    # Nobody acknowledges: the sender thread sends twice, then gives up
+    deadline = time.monotonic() + 3
+    while emitter.failed == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert (emitter.sent, emitter.acknowledged, emitter.failed) == (2, 0, 1)
+
+def test_acknowledged_inform(listener):
+    emitter = emitter_for(listener, inform=True, timeout=1.0)
+    emitter.send(FakeAgent(), TRAP_OIDS["serviceDown"], [])
+    data, addr = listener.recvfrom(65535)
+    inform = ber.decode_message(data)
+    listener.sendto(ber.encode_message(inform.community, ber.GET_RESPONSE, inform.request_id, inform.varbinds), addr)
+    deadline = time.monotonic() + 3
+    while emitter.acknowledged == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert emitter.acknowledged == 1
+
+def wait_for(condition, seconds=3):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+def test_unacknowledged_inform_leaves_the_threshold_clear(listener):
+    emitter = emitter_for(listener, inform=True, timeout=0.2, retries=0, dedup_seconds=0)
+    agent, monitor, state = FakeAgent(90), Monitor(emitter), {}
+    monitor.evaluate(agent, state)
+    active, _, pending = state["highCpuUsage"]
+    assert not active and pending is not None
+    assert wait_for(lambda: emitter.failed == 1)
+    # The raise was never acknowledged, so falling back below the clear level sends nothing
+    agent.cpu = 10
+    monitor.evaluate(agent, state)
+    assert state["highCpuUsage"] == (False, 10.0, None)
+    assert received(listener) == ["highCpuUsage"]
+
+def test_acknowledged_inform_raises_the_threshold(listener):
+    emitter = emitter_for(listener, inform=True, timeout=1.0)
+    agent, monitor, state = FakeAgent(90), Monitor(emitter), {}
+    monitor.evaluate(agent, state)
+    data, addr = listener.recvfrom(65535)
+    inform = ber.decode_message(data)
+    # Still waiting for the ack: the next evaluation decides nothing
+    agent.cpu = 10
+    monitor.evaluate(agent, state)
+    assert state["highCpuUsage"][0] is False
+    listener.sendto(ber.encode_message(inform.community, ber.GET_RESPONSE, inform.request_id, []), addr)
+    assert wait_for(lambda: emitter.acknowledged == 1)
+    monitor.evaluate(agent, state)
+    # Raised by the ack, then cleared at once since cpu is already back down
+    assert received(listener) == ["thresholdCleared"]
+    assert state["highCpuUsage"][2] is not None
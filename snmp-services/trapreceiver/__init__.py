@@ -0,0 +1,15 @@
+"""
+Trap receiver and event store for the snmp-services agents
+"""
+
+from .api import serve_api
+from .receiver import TrapReceiver, trap_event
+from .store import TrapEvent, TrapStore
+
+__all__ = [
+    "TrapEvent",
+    "TrapReceiver",
+    "TrapStore",
+    "serve_api",
+    "trap_event",
+]
@@ -0,0 +1,53 @@
+"""
+Run the trap receiver: python3 -m trapreceiver [options]
+
+Stores every notification in a SQLite database, serves it over HTTP and
+prints the ingest counters to stderr every --report seconds.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from .api import serve_api
+from .receiver import BATCH_SIZE, QUEUE_SIZE, TrapReceiver
+from .store import TrapStore
+
+async def receive(args):
+    store = TrapStore(args.db)
+    receiver = await TrapReceiver(store, communities=[c.encode() for c in args.community],
+                                  queue_size=args.queue_size, batch_size=args.batch_size
+                                  ).start(args.host, args.port)
+    server = serve_api(receiver, args.host, args.http_port) if args.http_port else None
+    print(f"receiving traps on {args.host}:{args.port}, API on port {args.http_port}", file=sys.stderr)
+    try:
+        while True:
+            await asyncio.sleep(args.report)
+            print(json.dumps(receiver.stats_dict()), file=sys.stderr, flush=True)
+    finally:
+        if server is not None:
+            server.shutdown()
+        receiver.close()
+        store.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive SNMPv2c traps into an event store")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=162, help="UDP port for notifications")
+    parser.add_argument("--http-port", type=int, default=16180, help="HTTP API port (0 disables it)")
+    parser.add_argument("--db", default="traps.db", help="SQLite database file")
+    parser.add_argument("--community", action="append", default=None,
+                        help="accepted community, repeatable (default: public)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--report", type=float, default=10.0, help="seconds between counter reports")
+    args = parser.parse_args()
+    args.community = args.community or ["public"]
+    try:
+        asyncio.run(receive(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Read-only HTTP/JSON API over the trap store
+
+    GET /traps?agent=&oid=&severity=&since=&until=&limit=
+        Newest-first list in the app/api/v1/snmp/traps/route.ts shape.
+        since/until are epoch seconds; agent is the sysName.
+    GET /stats
+        Receiver counters: received, ingested, dropped, ingestPerSecond, ...
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MAX_LIMIT = 1000
+
+def query_args(query):
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    args = {key: params.get(key) for key in ("agent", "oid", "severity")}
+    for key in ("since", "until"):
+        if params.get(key):
+            args[key] = float(params[key])
+    # SQLite reads a negative LIMIT as no limit
+    args["limit"] = max(1, min(MAX_LIMIT, int(params.get("limit", 100))))
+    return args
+
+def make_handler(receiver):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                if url.path == "/traps":
+                    self.reply(200, receiver.store.query(**query_args(url.query)))
+                elif url.path == "/stats":
+                    self.reply(200, receiver.stats_dict())
+                else:
+                    self.reply(404, {"error": "not found"})
+            except ValueError as error:
+                self.reply(400, {"error": str(error)})
+
+        def reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def serve_api(receiver, host="0.0.0.0", port=16180):
+    """Serve the API from a daemon thread; returns the server"""
+    server = ThreadingHTTPServer((host, port), make_handler(receiver))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="trap-api", daemon=True).start()
+    return server
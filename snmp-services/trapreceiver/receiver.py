@@ -0,0 +1,221 @@
+"""
+UDP trap receiver
+
+The event loop does as little as possible per datagram. Each time the
+socket becomes readable, it drains every waiting datagram; asyncio's
+datagram transport would read only one per wakeup. Each datagram's raw
+bytes go onto a bounded queue, or are counted as a drop when the queue
+is full. A writer thread drains the queue in batches,
+decodes each notification, commits the whole batch to the store in one
+transaction, and only then acknowledges the batch's informs.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from collections import deque
+
+from agentcore import ber
+from agentcore.oids import OIDS
+from agentcore.traps import SNMP_TRAP_OID, TRAP_OIDS
+
+from .store import TrapEvent
+
+QUEUE_SIZE = 65536
+BATCH_SIZE = 2048
+# Longest a received trap waits before its batch is committed
+FLUSH_INTERVAL = 0.05
+# Kernel receive buffer, to absorb bursts while a batch is being written
+RECV_BUFFER = 8 * 1024 * 1024
+# Datagrams read per readiness callback before yielding to the event loop
+RECV_BURST = 256
+RATE_WINDOW = 10.0
+
+TRAP_NAMES = {oid: name for name, oid in TRAP_OIDS.items()}
+METRIC_NAMES = {oid: name for name, oid in OIDS.items()}
+
+SEVERITIES = {
+    "highCpuUsage": "high",
+    "serviceDown": "high",
+    "backendsDegraded": "high",
+    "highMemoryUsage": "medium",
+    "highErrorRate": "medium",
+    "thresholdCleared": "low",
+}
+
+MESSAGES = {
+    "highCpuUsage": "High CPU usage detected on {agent} ({value}%)",
+    "highMemoryUsage": "High memory usage on {agent} ({value} MB)",
+    "serviceDown": "Service down on {agent}",
+    "highErrorRate": "Error rate rising on {agent} ({value} errors)",
+    "backendsDegraded": "Backends degraded on {agent} ({value} active)",
+    "thresholdCleared": "{metric} back to normal on {agent} ({value})",
+}
+
+def trap_event(message, agent_ip, received, pdu=b""):
+    """Build a TrapEvent from a decoded SNMPv2-Trap/InformRequest"""
+    values = {oid: value.decode(errors="replace") if isinstance(value, bytes) else value
+              for oid, _, value in message.varbinds}
+    trap_oid = str(values.get(SNMP_TRAP_OID, ""))
+    name = TRAP_NAMES.get(trap_oid)
+    agent = values.get(OIDS["sysName"], agent_ip)
+    # The first varbind after sysUpTime, snmpTrapOID and sysName is the metric that triggered it
+    subject = message.varbinds[3] if len(message.varbinds) > 3 else None
+    oid = subject[0] if subject else trap_oid
+    value = values.get(oid, "")
+    template = MESSAGES.get(name, "Trap {trap_oid} from {agent}")
+    text = template.format(agent=agent, value=value, trap_oid=trap_oid, metric=METRIC_NAMES.get(oid, oid))
+    return TrapEvent(received, agent, agent_ip, trap_oid, oid, SEVERITIES.get(name, "low"), text, pdu)
+
+class ReceiverStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.received = 0
+        self.dropped = 0
+        self.malformed = 0
+        self.ingested = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.acknowledged = 0
+        self.ack_errors = 0
+        self._commits = deque()  # (monotonic time, events) per batch within RATE_WINDOW
+
+    def committed(self, count):
+        now = time.monotonic()
+        self.ingested += count
+        self.batches += 1
+        self._commits.append((now, count))
+        while self._commits and now - self._commits[0][0] > RATE_WINDOW:
+            self._commits.popleft()
+
+    def ingest_rate(self):
+        """Events per second committed over the last RATE_WINDOW seconds"""
+        window = min(RATE_WINDOW, max(time.monotonic() - self.started, 1e-9))
+        return sum(count for _, count in list(self._commits)) / window
+
+    def as_dict(self, queued=0):
+        return {
+            "received": self.received,
+            "ingested": self.ingested,
+            "dropped": self.dropped,
+            "malformed": self.malformed,
+            "writeErrors": self.write_errors,
+            "acknowledged": self.acknowledged,
+            "ackErrors": self.ack_errors,
+            "batches": self.batches,
+            "queued": queued,
+            "ingestPerSecond": round(self.ingest_rate(), 1),
+            "uptimeSeconds": round(time.monotonic() - self.started, 1),
+        }
+
+class TrapReceiver:
+    def __init__(self, store, communities=(b"public",), queue_size=QUEUE_SIZE,
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.store = store
+        self.communities = set(communities)
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = deque()
+        self.wake = threading.Event()
+        self.stats = ReceiverStats()
+        self.sock = None
+        self._loop = None
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._run, name="trap-writer", daemon=True)
+
+    async def start(self, host="0.0.0.0", port=162):
+        self._loop = asyncio.get_running_loop()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        self.sock.setblocking(False)
+        self.sock.bind((host, port))
+        self._loop.add_reader(self.sock, self._read_ready)
+        self._writer.start()
+        return self
+
+    def _read_ready(self):
+        queue, stats = self.queue, self.stats
+        recvfrom, now = self.sock.recvfrom, time.time()
+        for _ in range(RECV_BURST):
+            try:
+                data, addr = recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                break
+            stats.received += 1
+            if len(queue) >= self.queue_size:
+                stats.dropped += 1
+                continue
+            queue.append((data, addr, now))
+        if len(queue) >= self.batch_size:
+            self.wake.set()
+
+    def close(self):
+        self._stop.set()
+        self.wake.set()
+        if self._writer.is_alive():
+            self._writer.join()
+        if self.sock is not None:
+            self._loop.remove_reader(self.sock)
+            self.sock.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if len(self.queue) < self.batch_size:
+                self.wake.wait(self.flush_interval)
+                self.wake.clear()
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Decode and commit everything queued, in batch_size transactions"""
+        while self.queue:
+            batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+            events, informs = self.decode(batch)
+            if not events:
+                continue
+            try:
+                self.store.append(events)
+            except Exception:
+                self.stats.write_errors += len(events)
+                continue
+            self.stats.committed(len(events))
+            for message, addr in informs:
+                self.acknowledge(message, addr)
+
+    def decode(self, batch):
+        """Return (events, informs awaiting acknowledgement)"""
+        events, informs = [], []
+        for data, addr, received in batch:
+            try:
+                message = ber.decode_message(data)
+            except (IndexError, ValueError):
+                self.stats.malformed += 1
+                continue
+            if (message.community not in self.communities
+                    or message.pdu_type not in (ber.SNMPV2_TRAP, ber.INFORM_REQUEST)):
+                self.stats.malformed += 1
+                continue
+            try:
+                events.append(trap_event(message, addr[0], received, data))
+            except (IndexError, ValueError, TypeError):
+                self.stats.malformed += 1
+                continue
+            if message.pdu_type == ber.INFORM_REQUEST:
+                informs.append((message, addr))
+        return events, informs
+
+    def acknowledge(self, message, addr):
+        """Send an inform's GetResponse; a failed send is counted, the sender will retry"""
+        response = ber.encode_message(message.community, ber.GET_RESPONSE, message.request_id,
+                                      message.varbinds)
+        try:
+            self.sock.sendto(response, addr)
+        except OSError:
+            self.stats.ack_errors += 1
+            return
+        self.stats.acknowledged += 1
+
+    def stats_dict(self):
+        return self.stats.as_dict(len(self.queue))
@@ -0,0 +1,114 @@
+"""
+Append-only trap event store on SQLite (WAL)
+
+Rows are only ever inserted, in batches of one transaction each. WAL
+mode lets the HTTP API read while the receiver writes. Indexes cover
+the query dimensions: agent, OID, severity and time.
+"""
+
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS traps (
+    id INTEGER PRIMARY KEY,
+    received REAL NOT NULL,
+    agent TEXT NOT NULL,
+    agent_ip TEXT NOT NULL,
+    trap_oid TEXT NOT NULL,
+    oid TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    message TEXT NOT NULL,
+    pdu BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS traps_received ON traps (received);
+CREATE INDEX IF NOT EXISTS traps_agent ON traps (agent, received);
+CREATE INDEX IF NOT EXISTS traps_oid ON traps (oid, received);
+CREATE INDEX IF NOT EXISTS traps_trap_oid ON traps (trap_oid, received);
+CREATE INDEX IF NOT EXISTS traps_severity ON traps (severity, received);
+"""
+
+# One stored notification; pdu is the datagram as received, kept for full varbind detail
+TrapEvent = namedtuple("TrapEvent", "received agent agent_ip trap_oid oid severity message pdu")
+
+INSERT = ("INSERT INTO traps (received, agent, agent_ip, trap_oid, oid, severity, message, pdu) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+def connect(path):
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # A crash may lose the last batches but never corrupts the store
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def to_route(row):
+    """Shape a row like the objects served by app/api/v1/snmp/traps/route.ts"""
+    id_, received, agent, agent_ip, trap_oid, oid, severity, message = row
+    return {
+        "id": f"trap-{id_}",
+        "message": message,
+        "severity": severity,
+        "timestamp": datetime.fromtimestamp(received, timezone.utc).isoformat(timespec="milliseconds")
+                             .replace("+00:00", "Z"),
+        "agentIp": agent_ip,
+        "oid": oid,
+        "agent": agent,
+        "trapOid": trap_oid,
+    }
+
+class TrapStore:
+    """Batch writer plus per-thread read connections over one database file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._writer = connect(path)
+        self._writer.executescript(SCHEMA)
+        self._readers = threading.local()
+
+    def append(self, events):
+        """Insert a batch of TrapEvents in one transaction"""
+        self._writer.execute("BEGIN")
+        try:
+            self._writer.executemany(INSERT, events)
+        except Exception:
+            self._writer.execute("ROLLBACK")
+            raise
+        self._writer.execute("COMMIT")
+
+    def _reader(self):
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._readers.conn = connect(self.path)
+        return conn
+
+    def query(self, agent=None, oid=None, severity=None, since=None, until=None, limit=100):
+        """Newest-first events matching every given filter; oid matches the trap or its subject"""
+        clauses, params = [], []
+        if agent:
+            clauses.append("agent = ?")
+            params.append(agent)
+        if oid:
+            clauses.append("(oid = ? OR trap_oid = ?)")
+            params += [oid.strip("."), oid.strip(".")]
+        if severity:
+            clauses.append("severity = ?")
+            params.append(severity)
+        if since is not None:
+            clauses.append("received >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("received < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            "SELECT id, received, agent, agent_ip, trap_oid, oid, severity, message "
+            f"FROM traps {where} ORDER BY received DESC, id DESC LIMIT ?", params + [limit])
+        return [to_route(row) for row in rows]
+
+    def count(self):
+        return self._reader().execute("SELECT COUNT(*) FROM traps").fetchone()[0]
+
+    def close(self):
+        self._writer.close()